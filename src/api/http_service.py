@@ -0,0 +1,447 @@
+"""
+HTTP transcription and Q&A service
+
+Endpoints (JSON unless noted):
+    GET  /health                   Queue depth and worker count
+    GET  /metrics                  Pipeline, LLM and resource metrics (Prometheus text format)
+    POST /jobs                     {"url": ...} -> 202 {"job_id", ...}; 429 when the queue is full
+    GET  /jobs/<id>                Job status
+    GET  /jobs/<id>/events         Status updates as Server-Sent Events until the job finishes
+    GET  /jobs/<id>/transcript     Transcript and timestamped segments of a finished job
+    POST /jobs/<id>/ask            {"question": ...} -> {"answer": ...}
+
+Usage:
+    python -m src.main serve --port 8000 --workers 2
+"""
+
+import itertools
+import json
+import logging
+import queue
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from src.core.batch_processor import BatchProcessor
+from src.core.config import Config, config
+from src.core.exceptions import QueueFullError, YouTubeAssistantError
+from src.core.video_processor import VideoProcessor
+from src.services.downloader import YouTubeDownloader
+from src.services.llm_service import create_llm_service
+from src.utils.metrics import CONTENT_TYPE, JOBS_REJECTED, QUEUE_DEPTH, metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+FINISHED_STATUSES = ("done", "failed")
+
+
+class Job:
+    """One submitted video and its pipeline status"""
+    
+    def __init__(self, job_id: str, url: str):
+        self.id = job_id
+        self.url = url
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.created = time.time()
+        self.updated = self.created
+        self.version = 0
+        self.processor: Optional[VideoProcessor] = None
+        self.lock = threading.Lock()
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Status summary without the transcript"""
+        info = {
+            "job_id": self.id,
+            "url": self.url,
+            "status": self.status,
+            "created": self.created,
+            "updated": self.updated,
+        }
+        if self.error:
+            info["error"] = self.error
+        if self.result is not None:
+            info["duration_s"] = self.result["duration_s"]
+            info["cached"] = self.result["cached"]
+            info["timings"] = self.result["timings"]
+        return info
+
+
+class JobManager:
+    """
+    Bounded job queue served by a fixed pool of pipeline workers
+    
+    All workers share one loaded model set (a ``BatchProcessor`` with one
+    VAD model per worker and a single ASR service), and all jobs share one
+    LLM service and transcript cache. Submissions beyond the queue size are
+    rejected instead of piling up, so callers can back off.
+    """
+    
+    def __init__(self, num_workers: Optional[int] = None, queue_size: Optional[int] = None,
+                 llm_service_type: str = "local", llm_kwargs: Optional[Dict] = None,
+                 downloader: Optional[YouTubeDownloader] = None, settings: Optional[Config] = None):
+        """
+        Load the models and start the pipeline workers
+        
+        Args:
+            num_workers: Jobs processed concurrently (default: config.service_workers)
+            queue_size: Jobs that may wait for a worker (default: config.service_queue_size)
+            llm_service_type: LLM service used for questions ("local" or "openai")
+            llm_kwargs: Additional arguments for the LLM service
+            downloader: Downloader to use instead of ``YouTubeDownloader`` (e.g. a local stub)
+            settings: Configuration to use instead of the global config
+        """
+        self.config = settings or config
+        self.num_workers = max(1, num_workers or self.config.service_workers)
+        self.llm_service = create_llm_service(llm_service_type, **(llm_kwargs or {}))
+        
+        self.pipeline = BatchProcessor(
+            vad_workers=self.num_workers,
+            settings=self.config,
+            downloader=downloader
+        )
+        
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(maxsize=queue_size or self.config.service_queue_size)
+        self._jobs: Dict[str, Job] = {}
+        self._job_ids = itertools.count(1)
+        self._changed = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        QUEUE_DEPTH.labels(queue="jobs").set_function(self._queue.qsize)
+        
+        for worker_index in range(self.num_workers):
+            worker = threading.Thread(target=self._work, args=(worker_index,), name=f"job-worker-{worker_index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+    
+    def submit(self, url: str) -> Job:
+        """
+        Queue a video for transcription
+        
+        Args:
+            url: Video URL
+        
+        Returns:
+            The queued job
+        
+        Raises:
+            QueueFullError: If the job queue is full
+        """
+        with self._changed:
+            job = Job(f"{next(self._job_ids):08d}", url)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                JOBS_REJECTED.inc()
+                raise QueueFullError("Job queue is full, retry later")
+            self._jobs[job.id] = job
+            evicted = self._evict_finished()
+        
+        for old_job in evicted:
+            self._close_processor(old_job)
+        logger.info(f"Queued job {job.id} for {url}")
+        return job
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by ID"""
+        with self._changed:
+            return self._jobs.get(job_id)
+    
+    def wait_for_update(self, job: Job, version: int, timeout: float) -> int:
+        """
+        Block until the job's status changes past ``version`` or the timeout expires
+        
+        Returns:
+            The job's current version
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: job.version != version, timeout=timeout)
+            return job.version
+    
+    def ask(self, job: Job, question: str) -> str:
+        """
+        Answer a question about a finished job's video
+        
+        Each job keeps its own conversation, so follow-up questions see
+        earlier turns.
+        
+        Raises:
+            YouTubeAssistantError: If the job has no transcript or the LLM fails
+        """
+        if job.status != "done":
+            raise YouTubeAssistantError(f"Job {job.id} is {job.status}, not done")
+        
+        with job.lock:
+            if job.processor is None:
+                job.processor = VideoProcessor(
+                    downloader=self.pipeline.downloader,
+                    llm_service=self.llm_service,
+                    transcript_cache=self.pipeline.transcript_cache
+                )
+                job.processor.load_transcript(job.result["segments"])
+            return job.processor.ask_question(question)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, worker count and jobs per status"""
+        with self._changed:
+            statuses: Dict[str, int] = {}
+            for job in self._jobs.values():
+                statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "workers": self.num_workers,
+            "queued": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "jobs": statuses,
+        }
+    
+    def close(self) -> None:
+        """Stop the workers after their current job and release the models and LLM service"""
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        QUEUE_DEPTH.labels(queue="jobs").set(0)
+        with self._changed:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            self._close_processor(job)
+        self.pipeline.close()
+        self.llm_service.close()
+    
+    def _set_status(self, job: Job, status: str, **fields: Any) -> None:
+        """Update a job and wake status watchers"""
+        with self._changed:
+            job.status = status
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.updated = time.time()
+            job.version += 1
+            self._changed.notify_all()
+    
+    def _work(self, worker_index: int) -> None:
+        """Pipeline worker loop (runs in a thread)"""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            
+            try:
+                result = self.pipeline.transcribe(
+                    job.url,
+                    worker_index=worker_index,
+                    on_stage=lambda stage: self._set_status(job, stage)
+                )
+                self._set_status(job, "done", result=result)
+                logger.info(f"Job {job.id} finished")
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {str(e)}")
+                self._set_status(job, "failed", error=str(e))
+    
+    def _evict_finished(self) -> List[Job]:
+        """
+        Drop the oldest finished jobs beyond ``service_max_jobs`` (lock held)
+        
+        Returns:
+            The dropped jobs, whose processors the caller closes after
+            releasing the lock
+        """
+        excess = len(self._jobs) - self.config.service_max_jobs
+        if excess <= 0:
+            return []
+        
+        finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.updated)
+        for job in finished[:excess]:
+            del self._jobs[job.id]
+        return finished[:excess]
+    
+    @staticmethod
+    def _close_processor(job: Job) -> None:
+        """Release a job's Q&A processor (waits for a question in progress)"""
+        with job.lock:
+            if job.processor is not None:
+                job.processor.close()
+                job.processor = None
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """Routes requests to the server's ``JobManager``"""
+    
+    protocol_version = "HTTP/1.1"
+    _job_path = re.compile(r"^/jobs/([^/]+)(?:/(events|transcript|ask))?/?$")
+    
+    @property
+    def manager(self) -> JobManager:
+        return self.server.manager
+    
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            return self._send_json(200, {"status": "ok", **self.manager.stats()})
+        if self.path.split("?", 1)[0] == "/metrics":
+            return self._send_metrics()
+        
+        job, action = self._route()
+        if job is None:
+            return
+        
+        if action is None:
+            self._send_json(200, job.to_dict())
+        elif action == "events":
+            self._stream_events(job)
+        elif action == "transcript":
+            if job.status != "done":
+                return self._send_json(409, {"error": f"Job is {job.status}", **job.to_dict()})
+            self._send_json(200, {
+                "job_id": job.id,
+                "transcript": job.result["transcript"],
+                "segments": job.result["segments"],
+            })
+        else:
+            self._send_json(405, {"error": "Use POST"})
+    
+    def do_POST(self):
+        body = self._read_json()
+        if body is None:
+            return
+        
+        if self.path.rstrip("/") == "/jobs":
+            url = body.get("url")
+            if not isinstance(url, str) or not url.strip():
+                return self._send_json(400, {"error": "Missing 'url'"})
+            try:
+                job = self.manager.submit(url.strip())
+            except QueueFullError as e:
+                return self._send_json(429, {"error": str(e)}, headers={"Retry-After": "5"})
+            return self._send_json(202, job.to_dict(), headers={"Location": f"/jobs/{job.id}"})
+        
+        job, action = self._route()
+        if job is None:
+            return
+        if action != "ask":
+            return self._send_json(405, {"error": "Use GET"})
+        
+        question = body.get("question")
+        if not isinstance(question, str) or not question.strip():
+            return self._send_json(400, {"error": "Missing 'question'"})
+        if job.status != "done":
+            return self._send_json(409, {"error": f"Job is {job.status}", **job.to_dict()})
+        
+        try:
+            answer = self.manager.ask(job, question.strip())
+        except YouTubeAssistantError as e:
+            return self._send_json(502, {"error": str(e)})
+        self._send_json(200, {"job_id": job.id, "question": question, "answer": answer})
+    
+    def _route(self):
+        """Resolve /jobs/<id>[/action]; sends 404 and returns (None, None) when unknown"""
+        match = self._job_path.match(self.path.split("?", 1)[0])
+        job = self.manager.get(match.group(1)) if match else None
+        if job is None:
+            self._send_json(404, {"error": "Not found"})
+            return None, None
+        return job, match.group(2)
+    
+    def _read_json(self) -> Optional[Dict[str, Any]]:
+        """Parse the request body; sends 400 and returns None when invalid"""
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else {}
+        except json.JSONDecodeError:
+            body = None
+        if not isinstance(body, dict):
+            self._send_json(400, {"error": "Body must be a JSON object"})
+            return None
+        return body
+    
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _send_metrics(self) -> None:
+        data = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _stream_events(self, job: Job) -> None:
+        """Send the job's status on every change until it finishes"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        
+        version = -1
+        try:
+            while True:
+                current = self.manager.wait_for_update(job, version, timeout=15.0)
+                if current == version:
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    version = current
+                    data = json.dumps(job.to_dict(), ensure_ascii=False)
+                    self.wfile.write(f"event: status\ndata: {data}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                if job.finished:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+    
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def create_server(manager: JobManager, host: Optional[str] = None, port: Optional[int] = None) -> ThreadingHTTPServer:
+    """
+    Create the HTTP server for a job manager (call ``serve_forever`` to run it)
+    
+    Args:
+        manager: Job manager handling the requests
+        host: Bind address (default: config.service_host)
+        port: Port, 0 for any free port (default: config.service_port)
+    """
+    server = ThreadingHTTPServer(
+        (host or manager.config.service_host, manager.config.service_port if port is None else port),
+        ServiceRequestHandler
+    )
+    server.daemon_threads = True
+    server.manager = manager
+    return server
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None, **manager_kwargs: Any) -> None:
+    """
+    Load the models and serve requests until interrupted
+    
+    Args:
+        host: Bind address
+        port: Port
+        **manager_kwargs: Arguments passed to ``JobManager``
+    """
+    manager = JobManager(**manager_kwargs)
+    server = create_server(manager, host, port)
+    logger.info(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        manager.close()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Compare ASR inference backends on a local audio fixture
+
+Prepares (exports/quantizes) each backend once, transcribes the fixture with
+it and reports load time, real-time factor and word error rate. WER is given
+against the reference text when one is provided, and as a delta against the
+fp32 PyTorch transcript otherwise.
+
+Usage:
+    python -m src.benchmarks.asr_backends fixture.wav
+    python -m src.benchmarks.asr_backends fixture.wav --reference fixture.txt --backends torch onnx
+    python -m src.benchmarks.asr_backends --prepare-only --backends torch-int8 onnx
+"""
+
+import argparse
+import dataclasses
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from src.core.config import config
+from src.services.asr_backends import BACKENDS
+from src.services.asr_service import ASRService
+from src.utils.audio_utils import AudioStore, pcm16_to_float
+from src.utils.logging_utils import setup_logging
+from src.utils.text_utils import word_error_rate
+
+
+def benchmark_backend(backend: str, audio: Any, reference: Optional[str]) -> Dict[str, Any]:
+    """
+    Load one backend and transcribe the fixture with it
+    
+    Returns:
+        Result dict with timings, transcript and WER
+    """
+    settings = dataclasses.replace(config, asr_backend=backend)
+    
+    start = time.perf_counter()
+    service = ASRService(settings)
+    load_seconds = time.perf_counter() - start
+    
+    # Warm-up pass so one-off allocations do not count against the backend
+    service.transcribe_single(audio[:settings.sample_rate])
+    
+    start = time.perf_counter()
+    transcript = service.transcribe_single(audio)
+    elapsed = time.perf_counter() - start
+    service.close()
+    
+    audio_seconds = len(audio) / settings.sample_rate
+    result = {
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "transcribe_seconds": elapsed,
+        "rtf": elapsed / audio_seconds if audio_seconds else 0.0,
+        "transcript": transcript,
+    }
+    if reference is not None:
+        result["wer"] = word_error_rate(reference, transcript)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare ASR inference backends",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("audio", nargs="?", help="16-bit mono WAV fixture at the configured sample rate")
+    parser.add_argument("--reference", help="Text file with the reference transcript")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--prepare-only", action="store_true", help="Only export/quantize the backends")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+    
+    setup_logging(level="WARNING")
+    
+    if args.prepare_only:
+        for backend in args.backends:
+            ASRService(dataclasses.replace(config, asr_backend=backend)).close()
+            print(f"Prepared backend: {backend}")
+        return 0
+    
+    if not args.audio:
+        parser.error("an audio fixture is required unless --prepare-only is given")
+    
+    audio = pcm16_to_float(AudioStore(args.audio)[:])
+    reference = None
+    if args.reference:
+        with open(args.reference, encoding="utf-8") as f:
+            reference = f.read()
+    
+    results = [benchmark_backend(backend, audio, reference) for backend in args.backends]
+    
+    baseline = next((r for r in results if r["backend"] == "torch"), results[0])
+    for result in results:
+        result["wer_vs_baseline"] = word_error_rate(baseline["transcript"], result["transcript"])
+        if "wer" in result and "wer" in baseline:
+            result["wer_delta"] = result["wer"] - baseline["wer"]
+    
+    print(f"{'backend':<12} {'load s':>8} {'RTF':>8} {'WER':>8} {'dWER':>8} {'vs base':>8}")
+    for result in results:
+        wer = f"{result['wer']:.3f}" if "wer" in result else "-"
+        delta = f"{result['wer_delta']:+.3f}" if "wer_delta" in result else "-"
+        print(
+            f"{result['backend']:<12} {result['load_seconds']:>8.1f} {result['rtf']:>8.3f} "
+            f"{wer:>8} {delta:>8} {result['wer_vs_baseline']:>8.3f}"
+        )
+    
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of the transcription pipeline stages
+
+Synthesizes speech-like audio (voiced bursts separated by pauses) of a given
+length and speech density, then times the stages of
+``VideoProcessor.process_video`` on it without network access:
+    
+    download  local file stand-in (a copy of the synthesized WAV)
+    vad       silero VAD, or an energy-based stand-in with --vad energy
+    shape     merging / splitting speech regions (SEGMENT_SHAPING)
+    extract   speech segment extraction
+    asr       ASR forward passes and decoding, as in the pipeline
+    decode    CTC decoding alone, on logits computed beforehand
+
+ASR uses the configured model (--asr real) or a tiny random-weight Wav2Vec2
+built locally (--asr tiny). Each stage reports its real-time factor,
+segments per second and peak RSS. Results can be saved as JSON and compared
+against a stored baseline.
+
+Usage:
+    python -m src.benchmarks.pipeline --vad energy --asr tiny --json baseline.json
+    python -m src.benchmarks.pipeline --vad energy --asr tiny --baseline baseline.json --threshold 0.2
+    python -m src.benchmarks.pipeline --duration 600 --density 0.8 --asr real
+    python -m src.benchmarks.pipeline --duration 3600 --vad-batch-size 1   # sequential VAD for comparison
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import wave
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+from src.core.config import Config, config
+from src.services.asr_service import ASRService, plan_batches
+from src.services.segment_shaper import SegmentShaper
+from src.services.vad_service import VADService
+from src.utils.logging_utils import setup_logging
+
+
+STAGES = ("download", "vad", "shape", "extract", "asr", "decode")
+
+
+def synthesize_speech(duration_s: float, speech_density: float, sample_rate: int = 16000,
+                      seed: int = 0) -> np.ndarray:
+    """
+    Generate speech-like int16 audio
+    
+    Voiced bursts (a few harmonics of a drifting pitch, amplitude-modulated at
+    a syllable rate, plus breath noise) alternate with near-silent pauses so
+    that roughly ``speech_density`` of the audio is "speech".
+    
+    Args:
+        duration_s: Length of the audio in seconds
+        speech_density: Fraction of the audio that is speech (0-1)
+        sample_rate: Sample rate
+        seed: Random seed
+    
+    Returns:
+        Mono int16 samples
+    """
+    rng = np.random.default_rng(seed)
+    total = int(duration_s * sample_rate)
+    audio = rng.normal(0, 20, total)  # Background noise around -64 dBFS
+    
+    speech_density = min(max(speech_density, 0.01), 1.0)
+    mean_speech = 3.0
+    mean_pause = mean_speech * (1 - speech_density) / speech_density
+    
+    position = 0
+    while position < total:
+        length = int(rng.uniform(0.5, 2 * mean_speech - 0.5) * sample_rate)
+        end = min(position + length, total)
+        t = np.arange(end - position) / sample_rate
+        
+        pitch = rng.uniform(90, 220) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.2, 1.0) * t))
+        phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+        syllables = 0.2 + 0.2 * (1 + np.sin(2 * np.pi * rng.uniform(3, 6) * t)) ** 2
+        audio[position:end] += 4000 * syllables * voiced + rng.normal(0, 300, end - position)
+        
+        position = end + int(rng.exponential(mean_pause) * sample_rate)
+    
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int) -> None:
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+
+
+class EnergyVADModel:
+    """
+    Stand-in for the silero model: speech probability from window loudness
+    
+    Maps -50..-20 dBFS linearly onto 0..1, which is enough to exercise the
+    VAD segmentation and everything after it without downloading silero.
+    """
+    
+    def __call__(self, windows: torch.Tensor, sample_rate: int) -> torch.Tensor:
+        windows = windows.reshape(-1, windows.shape[-1])
+        rms = torch.sqrt(torch.mean(windows * windows, dim=-1)) + 1e-9
+        level = 20 * torch.log10(rms)
+        return torch.clamp((level + 50) / 30, 0.0, 1.0).unsqueeze(-1)
+    
+    def reset_states(self, batch_size: int = 1) -> None:
+        pass
+
+
+def build_tiny_asr_model(directory: str, seed: int = 0) -> str:
+    """
+    Save a small random-weight Wav2Vec2 CTC model and processor
+    
+    Its output is gibberish, but its forward pass and decoding exercise the
+    same code paths as a real model at a fraction of the cost.
+    
+    Returns:
+        The model directory, usable as ``asr_model``
+    """
+    from transformers import (
+        Wav2Vec2Config, Wav2Vec2CTCTokenizer, Wav2Vec2FeatureExtractor, Wav2Vec2ForCTC, Wav2Vec2Processor
+    )
+    
+    os.makedirs(directory, exist_ok=True)
+    vocab = {"<pad>": 0, "<s>": 1, "</s>": 2, "<unk>": 3, "|": 4}
+    vocab.update({letter: len(vocab) + i for i, letter in enumerate("abcdefghijklmnopqrstuvwxyz'")})
+    vocab_path = os.path.join(directory, "vocab.json")
+    with open(vocab_path, "w", encoding="utf-8") as f:
+        json.dump(vocab, f)
+    
+    tokenizer = Wav2Vec2CTCTokenizer(vocab_path, unk_token="<unk>", pad_token="<pad>", word_delimiter_token="|")
+    feature_extractor = Wav2Vec2FeatureExtractor(
+        feature_size=1, sampling_rate=16000, padding_value=0.0, do_normalize=True, return_attention_mask=True
+    )
+    Wav2Vec2Processor(feature_extractor=feature_extractor, tokenizer=tokenizer).save_pretrained(directory)
+    
+    torch.manual_seed(seed)
+    model_config = Wav2Vec2Config(
+        vocab_size=len(vocab),
+        hidden_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=128,
+        conv_dim=(32,) * 7,
+        num_conv_pos_embeddings=16,
+        num_conv_pos_embedding_groups=4,
+        pad_token_id=vocab["<pad>"],
+        feat_extract_norm="layer",
+        do_stable_layer_norm=True
+    )
+    Wav2Vec2ForCTC(model_config).eval().save_pretrained(directory)
+    return directory
+
+
+def _current_rss() -> int:
+    """Resident set size of this process in bytes (0 where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class PeakRSS:
+    """Sample the process RSS in a thread and keep the peak seen"""
+    
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+    
+    def __enter__(self) -> "PeakRSS":
+        self.peak = _current_rss()
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _current_rss())
+        if self.peak == 0:
+            # No /proc: fall back to the process-wide peak (KiB on Linux, bytes on macOS)
+            scale = 1 if sys.platform == "darwin" else 1024
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _current_rss())
+
+
+def time_stage(function: Callable[[], Any], audio_seconds: float, segments: int,
+               repeat: int) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Run one stage ``repeat`` times and report the median
+    
+    Returns:
+        Tuple of (stage result, metrics dict)
+    """
+    durations = []
+    peak = 0
+    result = None
+    for _ in range(repeat):
+        with PeakRSS() as rss:
+            start = time.perf_counter()
+            result = function()
+            durations.append(time.perf_counter() - start)
+        peak = max(peak, rss.peak)
+    
+    seconds = statistics.median(durations)
+    return result, {
+        "seconds": seconds,
+        "rtf": seconds / audio_seconds if audio_seconds else 0.0,
+        "segments_per_s": segments / seconds if seconds > 0 and segments else 0.0,
+        "peak_rss_mb": peak / 2 ** 20,
+    }
+
+
+def run_benchmark(settings: Config, duration_s: float, speech_density: float, vad: str, asr: str,
+                  repeat: int = 1, seed: int = 0) -> Dict[str, Any]:
+    """
+    Synthesize a fixture and time every pipeline stage on it
+    
+    Returns:
+        JSON-serializable results with per-stage metrics
+    """
+    with tempfile.TemporaryDirectory(prefix="pipeline-bench-") as workdir:
+        fixture = os.path.join(workdir, "fixture.wav")
+        write_wav(fixture, synthesize_speech(duration_s, speech_density, settings.sample_rate, seed), settings.sample_rate)
+        
+        if asr == "tiny":
+            settings = dataclasses.replace(
+                settings,
+                asr_model=build_tiny_asr_model(os.path.join(workdir, "tiny-asr"), seed),
+                asr_backend="torch"
+            )
+        
+        start = time.perf_counter()
+        vad_service = VADService(model=EnergyVADModel() if vad == "energy" else None, settings=settings)
+        asr_service = ASRService(settings)
+        load_seconds = time.perf_counter() - start
+        
+        audio_file = os.path.join(workdir, "download.wav")
+        stages: Dict[str, Dict[str, Any]] = {}
+        try:
+            _, stages["download"] = time_stage(
+                lambda: shutil.copyfile(fixture, audio_file), duration_s, 0, repeat
+            )
+            (audio, timestamps), stages["vad"] = time_stage(
+                lambda: vad_service.process_audio(audio_file), duration_s, 0, repeat
+            )
+            stages["vad"]["segments_per_s"] = len(timestamps) / stages["vad"]["seconds"] if stages["vad"]["seconds"] else 0.0
+            
+            raw_timestamps = timestamps
+            shaper = SegmentShaper(settings) if settings.segment_shaping else None
+            timestamps, stages["shape"] = time_stage(
+                lambda: shaper.shape(audio, raw_timestamps) if shaper else raw_timestamps,
+                duration_s, len(raw_timestamps), repeat
+            )
+            
+            speech_segments, stages["extract"] = time_stage(
+                lambda: vad_service.extract_speech_segments(audio, timestamps), duration_s, len(timestamps), repeat
+            )
+            speech_seconds = sum(duration for _, duration in speech_segments)
+            
+            _, stages["asr"] = time_stage(
+                lambda: asr_service.transcribe_batch(speech_segments), speech_seconds, len(speech_segments), repeat
+            )
+            
+            # Logits for the decode-only stage, computed once outside the timing
+            batches = plan_batches(
+                [len(segment) for segment, _ in speech_segments],
+                max_samples=settings.asr_batch_max_samples,
+                max_size=settings.asr_batch_max_size
+            )
+            logits = []
+            for batch in batches:
+                batch_audio = [speech_segments[i][0] for i in batch]
+                batch_logits = asr_service._forward(batch_audio)
+                logits.append((batch_logits, asr_service._frame_lengths(batch_audio, batch_logits.shape[1])))
+            
+            _, stages["decode"] = time_stage(
+                lambda: [asr_service._submit_decode(batch_logits, lengths).result() for batch_logits, lengths in logits],
+                speech_seconds,
+                len(speech_segments),
+                repeat
+            )
+        finally:
+            asr_service.close()
+        
+        return {
+            "config": {
+                "duration_s": duration_s,
+                "speech_density": speech_density,
+                "seed": seed,
+                "vad": vad,
+                "vad_batch_size": settings.vad_batch_size,
+                "segment_shaping": (
+                    [settings.segment_min_s, settings.segment_max_s] if settings.segment_shaping else None
+                ),
+                "asr": asr,
+                "asr_model": settings.asr_model if asr == "real" else "tiny-random",
+                "asr_backend": settings.asr_backend,
+                "asr_decoder": settings.asr_decoder,
+                "repeat": repeat,
+            },
+            "audio_seconds": duration_s,
+            "speech_seconds": speech_seconds,
+            "segments": len(speech_segments),
+            "segment_lengths": shaper.last_stats if shaper else {},
+            "load_seconds": load_seconds,
+            "stages": stages,
+        }
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Find stages whose RTF or peak RSS grew by more than ``threshold``
+    
+    Returns:
+        Human-readable regression descriptions (empty when none)
+    """
+    regressions = []
+    for stage, metrics in results["stages"].items():
+        reference = baseline.get("stages", {}).get(stage)
+        if not reference:
+            continue
+        for metric in ("rtf", "peak_rss_mb"):
+            old, new = reference.get(metric, 0.0), metrics[metric]
+            if old > 0 and new > old * (1 + threshold):
+                regressions.append(f"{stage} {metric}: {old:.4f} -> {new:.4f} (+{new / old - 1:.0%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the transcription pipeline offline",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--duration", type=float, default=120.0, help="Synthetic audio length in seconds")
+    parser.add_argument("--density", type=float, default=0.6, help="Fraction of the audio that is speech")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--vad", choices=["silero", "energy"], default="energy")
+    parser.add_argument("--asr", choices=["real", "tiny"], default="tiny")
+    parser.add_argument(
+        "--vad-batch-size", type=int, help="Streams/shards per batched VAD step, 1 for sequential (default: VAD_BATCH_SIZE)"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage (median is reported)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results stored by an earlier --json run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    
+    setup_logging(level="WARNING")
+    
+    settings = config
+    if args.vad_batch_size is not None:
+        settings = dataclasses.replace(config, vad_batch_size=args.vad_batch_size)
+    
+    results = run_benchmark(
+        settings,
+        duration_s=args.duration,
+        speech_density=args.density,
+        vad=args.vad,
+        asr=args.asr,
+        repeat=max(1, args.repeat),
+        seed=args.seed
+    )
+    
+    print(
+        f"{results['audio_seconds']:.0f}s audio, {results['speech_seconds']:.0f}s speech in "
+        f"{results['segments']} segments (models loaded in {results['load_seconds']:.1f}s)"
+    )
+    print(f"{'stage':<10} {'seconds':>9} {'RTF':>9} {'seg/s':>9} {'peak RSS MB':>12}")
+    for stage in STAGES:
+        metrics = results["stages"][stage]
+        print(
+            f"{stage:<10} {metrics['seconds']:>9.3f} {metrics['rtf']:>9.4f} "
+            f"{metrics['segments_per_s']:>9.1f} {metrics['peak_rss_mb']:>12.0f}"
+        )
+    
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != results["config"]:
+            print("⚠️  Baseline was recorded with different settings")
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ Regressions beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1
+        print(f"✅ No regressions beyond {args.threshold:.0%}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
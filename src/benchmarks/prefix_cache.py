@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Measure prompt-processing time per turn with and without prefix caching
+
+Runs a short conversation about one transcript against a local LLM server
+twice, once with the stable-prefix / slot-pinned layout and once without,
+and reports the server's prompt-processing time for every turn. With prefix
+reuse, turns after the first only pay for the new tokens.
+
+Use --stub to run against a built-in stub server that models a KV cache:
+it charges prompt time only for the part of the prompt that does not match
+the previous prompt in the same slot.
+
+Usage:
+    python -m src.benchmarks.prefix_cache --stub
+    python -m src.benchmarks.prefix_cache --base-url http://localhost:8080 --transcript transcript.txt
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from src.services.llm_service import LocalLLMService
+
+
+DEFAULT_QUESTIONS = [
+    "What is the video about?",
+    "Who is speaking?",
+    "What are the main points?",
+    "Is there a conclusion?",
+]
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    """OpenAI-style chat endpoint that simulates llama.cpp prompt caching"""
+    
+    seconds_per_char = 2e-6
+    slots: Dict[int, str] = {}
+    lock = threading.Lock()
+    
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = "".join(f"<{m['role']}>{m['content']}" for m in body["messages"])
+        
+        cached = 0
+        with self.lock:
+            if body.get("cache_prompt"):
+                previous = self.slots.get(body.get("id_slot", -1), "")
+                while cached < min(len(previous), len(prompt)) and previous[cached] == prompt[cached]:
+                    cached += 1
+            self.slots[body.get("id_slot", -1)] = prompt
+        
+        prompt_ms = (len(prompt) - cached) * self.seconds_per_char * 1000
+        time.sleep(prompt_ms / 1000)
+        
+        payload = json.dumps({
+            "choices": [{"message": {"role": "assistant", "content": "Stub answer."}}],
+            "timings": {"prompt_n": len(prompt) - cached, "cache_n": cached, "prompt_ms": prompt_ms},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    """Start the stub server on a free local port"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_conversation(base_url: str, transcript: str, questions: List[str], prefix_cache: bool,
+                     slot_id: int) -> List[Dict[str, Any]]:
+    """Ask each question in turn and collect per-turn timings"""
+    service = LocalLLMService(base_url=base_url, prefix_cache=prefix_cache, slot_id=slot_id)
+    history: List[Dict[str, str]] = []
+    turns = []
+    for question in questions:
+        start = time.perf_counter()
+        _, history = service.chat(question, transcript, history)
+        timings = service.last_server_timings
+        turns.append({
+            "question": question,
+            "wall_ms": (time.perf_counter() - start) * 1000,
+            "prompt_ms": timings.get("prompt_ms"),
+            "prompt_tokens": timings.get("prompt_n"),
+            "cached_tokens": timings.get("cache_n"),
+        })
+    return turns
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure KV-cache prefix reuse on a local LLM server",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--base-url", help="Local LLM server base URL")
+    parser.add_argument("--stub", action="store_true", help="Use the built-in stub server")
+    parser.add_argument("--transcript", help="Transcript text file (default: synthetic)")
+    parser.add_argument("--turns", type=int, default=len(DEFAULT_QUESTIONS))
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+    
+    if not args.stub and not args.base_url:
+        parser.error("either --stub or --base-url is required")
+    
+    server = start_stub_server() if args.stub else None
+    base_url = f"http://127.0.0.1:{server.server_address[1]}" if server else args.base_url
+    
+    if args.transcript:
+        with open(args.transcript, encoding="utf-8") as f:
+            transcript = f.read()
+    else:
+        transcript = " ".join(f"sentence number {i} of the synthetic transcript." for i in range(3000))
+    
+    questions = [DEFAULT_QUESTIONS[i % len(DEFAULT_QUESTIONS)] for i in range(args.turns)]
+    results = {
+        "prefix_cache": run_conversation(base_url, transcript, questions, prefix_cache=True, slot_id=0),
+        "no_prefix_cache": run_conversation(base_url, transcript, questions, prefix_cache=False, slot_id=1),
+    }
+    
+    if server:
+        server.shutdown()
+    
+    print(f"{'turn':>4} {'cached prompt ms':>18} {'uncached prompt ms':>20}")
+    for turn, (cached, uncached) in enumerate(zip(results["prefix_cache"], results["no_prefix_cache"]), start=1):
+        cached_ms = cached["prompt_ms"] if cached["prompt_ms"] is not None else cached["wall_ms"]
+        uncached_ms = uncached["prompt_ms"] if uncached["prompt_ms"] is not None else uncached["wall_ms"]
+        print(f"{turn:>4} {cached_ms:>18.1f} {uncached_ms:>20.1f}")
+    
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
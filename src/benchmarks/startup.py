@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Measure cold and warm start-up time of the entry points
+
+Each mode is started as a fresh process several times. The first run is
+reported as cold (bytecode, OS page cache and model caches may still be
+empty) and the median of the remaining runs as warm.
+
+Modes:
+    help   python -m src.main --help
+    cli    Imports and model loading done by ``cli`` before the first download
+    serve  python -m src.main serve until /health answers
+
+Usage:
+    python -m src.benchmarks.startup
+    python -m src.benchmarks.startup --modes help cli --runs 5
+    MODEL_OFFLINE=1 python -m src.benchmarks.startup --modes cli serve
+"""
+
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+
+MODES = ("help", "cli", "serve")
+
+# Run in the child for the cli mode: everything `cli` does before downloading
+_CLI_STARTUP = """
+import json, time
+start = time.perf_counter()
+from src.core.video_processor import VideoProcessor
+processor = VideoProcessor()
+imported = time.perf_counter()
+processor.vad_service, processor.asr_service
+loaded = time.perf_counter()
+print(json.dumps({"import_s": imported - start, "model_load_s": loaded - imported}))
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_help() -> Dict[str, Any]:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "src.main", "--help"], check=True, capture_output=True)
+    return {"total_s": time.perf_counter() - start}
+
+
+def time_cli() -> Dict[str, Any]:
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", _CLI_STARTUP], check=True, capture_output=True, text=True)
+    return {"total_s": time.perf_counter() - start, **json.loads(completed.stdout.strip().splitlines()[-1])}
+
+
+def time_serve(timeout: float = 600.0) -> Dict[str, Any]:
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.main", "serve", "--host", "127.0.0.1", "--port", str(port), "--log-level", "WARNING"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"serve exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return {"total_s": time.perf_counter() - start}
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError("serve did not become healthy in time")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+TIMERS = {"help": time_help, "cli": time_cli, "serve": time_serve}
+
+
+def benchmark_mode(mode: str, runs: int) -> Dict[str, Any]:
+    """Start one mode ``runs`` times and summarize cold vs warm"""
+    samples = [TIMERS[mode]() for _ in range(runs)]
+    warm = samples[1:] or samples
+    return {
+        "mode": mode,
+        "cold_s": samples[0]["total_s"],
+        "warm_s": statistics.median(sample["total_s"] for sample in warm),
+        "runs": samples,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure entry point start-up time",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--runs", type=int, default=3, help="Starts per mode (first one is cold)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+    
+    results = []
+    for mode in args.modes:
+        try:
+            results.append(benchmark_mode(mode, max(1, args.runs)))
+        except (subprocess.CalledProcessError, RuntimeError) as e:
+            print(f"{mode}: failed ({e})", file=sys.stderr)
+    
+    print(f"{'mode':<8} {'cold s':>8} {'warm s':>8}")
+    for result in results:
+        print(f"{result['mode']:<8} {result['cold_s']:>8.2f} {result['warm_s']:>8.2f}")
+    
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    
+    return 0 if len(results) == len(args.modes) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
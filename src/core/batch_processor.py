@@ -0,0 +1,454 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.services.downloader import YouTubeDownloader
+from src.services.segment_shaper import SegmentShaper
+from src.services.transcript_cache import TranscriptCache, extract_video_id, is_video_url
+from src.utils.audio_utils import AudioStore
+from src.utils.metrics import (
+    AUDIO_SECONDS, PIPELINE_RUNS, QUEUE_DEPTH, SEGMENTS, SPEECH_SECONDS, STAGE_SECONDS
+)
+from src.utils.segment_store import SegmentStore
+from .config import Config, config
+from .model_registry import acquire_asr_service, acquire_vad_service, release_asr_service, release_vad_service
+from .exceptions import VADError, YouTubeAssistantError
+
+
+logger = logging.getLogger(__name__)
+
+
+_END_OF_STAGE = object()
+
+
+class BatchManifest:
+    """
+    Append-only record of per-video batch status
+    
+    Every status change is appended as one JSON line, so an interrupted run
+    loses at most the line being written. On load the last line for each
+    video wins.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn last line from an interrupted run
+                    self.entries[entry["video_id"]] = entry
+    
+    def status(self, url: str) -> Optional[str]:
+        """Last recorded status of a video ("done", "failed"), or None"""
+        entry = self.entries.get(extract_video_id(url))
+        return entry["status"] if entry else None
+    
+    def mark(self, url: str, status: str, **info: Any) -> None:
+        """Record a status change for a video"""
+        entry = {"video_id": extract_video_id(url), "url": url, "status": status, "time": time.time(), **info}
+        with self._lock:
+            self.entries[entry["video_id"]] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class BatchProcessor:
+    """
+    Transcribe many videos with the models loaded once
+    
+    Videos flow through download, VAD and ASR stages connected by bounded
+    queues, each stage with its own worker count, so one video is being
+    downloaded while another is in VAD and a third in ASR. Results are
+    written as JSONL and every video's status goes to a manifest, so a rerun
+    with the same manifest skips finished videos.
+    """
+    
+    def __init__(self, download_workers: Optional[int] = None, vad_workers: Optional[int] = None,
+                 asr_jobs: Optional[int] = None, settings: Optional[Config] = None,
+                 downloader: Optional[YouTubeDownloader] = None):
+        """
+        Load the models and set up the stage worker counts
+        
+        Args:
+            download_workers: Concurrent downloads (default: config.batch_download_workers)
+            vad_workers: Concurrent VAD passes, each with its own model (default: config.batch_vad_workers)
+            asr_jobs: Videos handed to ASR concurrently (default: config.batch_asr_jobs)
+            settings: Configuration to use instead of the global config
+            downloader: Downloader to use instead of ``YouTubeDownloader`` (e.g. a local stub)
+        """
+        self.config = settings or config
+        self.download_workers = max(1, download_workers or self.config.batch_download_workers)
+        self.vad_workers = max(1, vad_workers or self.config.batch_vad_workers)
+        self.asr_jobs = max(1, asr_jobs or self.config.batch_asr_jobs)
+        
+        self.downloader = downloader or YouTubeDownloader()
+        # Leased from the model registry; each VAD worker gets its own
+        # (stateful) silero instance, ASR is shared
+        self.vad_services = [acquire_vad_service(self.config) for _ in range(self.vad_workers)]
+        self.asr_service = acquire_asr_service(self.config)
+        self.transcript_cache = TranscriptCache() if self.config.transcript_cache_enabled else None
+        self.segment_shaper = SegmentShaper(self.config) if self.config.segment_shaping else None
+        
+        # The worker pool interleaves concurrent calls; an in-process model runs one batch at a time
+        self._asr_lock = threading.Lock() if self.config.asr_workers <= 0 else None
+    
+    def expand(self, sources: Iterable[str]) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Expand playlist URLs and drop duplicate videos
+        
+        Plain video URLs are taken as-is without asking yt-dlp. A source that
+        cannot be expanded is reported instead of aborting the batch.
+        
+        Args:
+            sources: Video or playlist URLs
+        
+        Returns:
+            Video URLs in input order, one per video ID, and the error of
+            every source that could not be expanded
+        """
+        urls: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        for source in sources:
+            try:
+                expanded = [source] if is_video_url(source) else self.downloader.expand_playlist(source)
+            except Exception as e:
+                logger.error(f"Batch: cannot expand {source}: {str(e)}")
+                errors[source] = str(e)
+                continue
+            for url in expanded:
+                urls.setdefault(extract_video_id(url), url)
+        return list(urls.values()), errors
+    
+    def run(self, urls: Iterable[str], output_path: str, manifest_path: Optional[str] = None,
+            retry_failed: bool = True, source_errors: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Process videos and append their transcripts to a JSONL file
+        
+        Args:
+            urls: Video URLs (expand playlists first with ``expand``)
+            output_path: JSONL file results are appended to
+            manifest_path: Status manifest (default: ``<output_path>.manifest.jsonl``)
+            retry_failed: Whether to reprocess videos that failed in a previous run
+            source_errors: Sources that could not be expanded (from ``expand``),
+                recorded as failed
+        
+        Returns:
+            Summary with done / failed / skipped counts, audio seconds and elapsed time
+        """
+        manifest = BatchManifest(manifest_path or f"{output_path}.manifest.jsonl")
+        skip = {"done"} if retry_failed else {"done", "failed"}
+        
+        pending, skipped = [], 0
+        for url in dict.fromkeys(urls):
+            if manifest.status(url) in skip:
+                skipped += 1
+            else:
+                pending.append(url)
+        
+        logger.info(f"Batch: {len(pending)} videos to process, {skipped} already finished")
+        summary = {"done": 0, "failed": 0, "skipped": skipped, "audio_seconds": 0.0}
+        start = time.perf_counter()
+        for source, error in (source_errors or {}).items():
+            summary["failed"] += 1
+            manifest.mark(source, "failed", error=error)
+        
+        download_queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.config.batch_queue_size)
+        vad_queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.config.batch_queue_size)
+        asr_queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.config.batch_queue_size)
+        results: "queue.Queue[Any]" = queue.Queue()
+        for name, stage_queue in (("download", download_queue), ("vad", vad_queue), ("asr", asr_queue)):
+            QUEUE_DEPTH.labels(queue=f"batch_{name}").set_function(stage_queue.qsize)
+        
+        threads = [threading.Thread(target=self._feed, args=(pending, download_queue), name="batch-feed", daemon=True)]
+        threads += self._start_stage("download", self.download_workers, self._download, download_queue, vad_queue, results)
+        threads += self._start_stage(
+            "vad", self.vad_workers, self._vad_batch, vad_queue, asr_queue, results,
+            batch_size=max(1, self.config.vad_batch_size)
+        )
+        threads += self._start_stage("asr", self.asr_jobs, self._asr, asr_queue, results, results)
+        threads[0].start()
+        
+        with open(output_path, "a", encoding="utf-8") as output:
+            while True:
+                job = results.get()
+                if job is _END_OF_STAGE:
+                    break
+                
+                self._count_run(job)
+                if "error" in job:
+                    summary["failed"] += 1
+                    manifest.mark(job["url"], "failed", error=job["error"], timings=job["timings"])
+                    logger.error(f"Batch: {job['url']} failed: {job['error']}")
+                    continue
+                
+                output.write(json.dumps(job["result"], ensure_ascii=False) + "\n")
+                output.flush()
+                summary["done"] += 1
+                summary["audio_seconds"] += job["result"]["duration_s"]
+                manifest.mark(job["url"], "done", timings=job["timings"])
+                logger.info(
+                    f"Batch: finished {job['url']} "
+                    f"({summary['done'] + summary['failed']}/{len(pending)})"
+                )
+        
+        for thread in threads:
+            thread.join()
+        for name in ("download", "vad", "asr"):
+            QUEUE_DEPTH.labels(queue=f"batch_{name}").set(0)
+        
+        summary["elapsed_s"] = time.perf_counter() - start
+        return summary
+    
+    def transcribe(self, url: str, worker_index: int = 0,
+                   on_stage: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Run one video through all stages on the calling thread
+        
+        Args:
+            url: Video URL
+            worker_index: Which VAD model to use; concurrent callers need distinct indices
+            on_stage: Called with "download", "vad" and "asr" as each stage starts
+            
+        Returns:
+            The video's result record (as written to the JSONL output) with stage timings
+            
+        Raises:
+            YouTubeAssistantError: If a stage fails
+        """
+        job: Dict[str, Any] = {"url": url, "timings": {}}
+        try:
+            for name, handler in (("download", self._download), ("vad", self._vad), ("asr", self._asr)):
+                if "result" in job:
+                    break
+                if on_stage is not None:
+                    on_stage(name)
+                started = time.perf_counter()
+                handler(worker_index, job)
+                job["timings"][f"{name}_s"] = time.perf_counter() - started
+        except Exception as e:
+            job["error"] = str(e)
+            raise
+        finally:
+            self._count_run(job)
+            self._discard_audio(job)
+        
+        return {**job["result"], "timings": job["timings"]}
+    
+    def close(self) -> None:
+        """Return the models to the registry and remove leftover downloads"""
+        for vad_service in self.vad_services:
+            release_vad_service(vad_service, self.config)
+        self.vad_services = []
+        release_asr_service(self.asr_service, self.config)
+        self.downloader.cleanup()
+    
+    def _feed(self, urls: List[str], download_queue: "queue.Queue[Any]") -> None:
+        """Put jobs on the first stage's queue (runs in a thread)"""
+        for url in urls:
+            download_queue.put({"url": url, "timings": {}})
+        download_queue.put(_END_OF_STAGE)
+    
+    @staticmethod
+    def _count_run(job: Dict[str, Any]) -> None:
+        """Count a finished job in the pipeline run metrics"""
+        if "error" in job:
+            result = "error"
+        elif job.get("result", {}).get("cached"):
+            result = "cached"
+        else:
+            result = "ok"
+        PIPELINE_RUNS.labels(result=result).inc()
+    
+    def _start_stage(self, name: str, num_workers: int, handler: Callable[[int, Any], None],
+                     inbox: "queue.Queue[Any]", outbox: "queue.Queue[Any]",
+                     results: "queue.Queue[Any]", batch_size: Optional[int] = None) -> List[threading.Thread]:
+        """
+        Start the worker threads of one stage
+        
+        Each worker passes the end marker on to its siblings; the last worker
+        to exit forwards it downstream. A job whose handler raises, or that
+        the handler finishes early, goes straight to ``results``. With a
+        ``batch_size`` a worker takes up to that many already queued jobs at
+        once and ``handler`` always receives a list (of one job when nothing
+        else is queued); without one it receives each job on its own.
+        """
+        remaining = [num_workers]
+        lock = threading.Lock()
+        
+        def work(worker_index: int):
+            finished = False
+            while not finished:
+                jobs = [inbox.get()]
+                while len(jobs) < (batch_size or 1) and jobs[-1] is not _END_OF_STAGE:
+                    try:
+                        jobs.append(inbox.get_nowait())
+                    except queue.Empty:
+                        break
+                if jobs[-1] is _END_OF_STAGE:
+                    inbox.put(_END_OF_STAGE)
+                    jobs.pop()
+                    finished = True
+                if not jobs:
+                    continue
+                
+                started = time.perf_counter()
+                try:
+                    handler(worker_index, jobs if batch_size is not None else jobs[0])
+                except Exception as e:
+                    for job in jobs:
+                        job.setdefault("error", str(e))
+                        self._discard_audio(job)
+                elapsed = time.perf_counter() - started
+                
+                for job in jobs:
+                    job["timings"][f"{name}_s"] = elapsed
+                    (results if "error" in job or "result" in job else outbox).put(job)
+            
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                outbox.put(_END_OF_STAGE)
+        
+        threads = []
+        for worker_index in range(num_workers):
+            thread = threading.Thread(target=work, args=(worker_index,), name=f"batch-{name}-{worker_index}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        return threads
+    
+    def _download(self, worker_index: int, job: Dict[str, Any]) -> None:
+        """Download stage; answers from the transcript cache when possible"""
+        if self.transcript_cache is not None:
+            cached = self.transcript_cache.get(job["url"])
+            if cached is not None:
+                job["result"] = self._result(job["url"], cached, cached=True)
+                return
+        
+        with STAGE_SECONDS.labels(stage="download").time():
+            job["audio_file"] = self.downloader.download(job["url"])
+    
+    def _vad(self, worker_index: int, job: Dict[str, Any]) -> None:
+        """VAD stage for a single job"""
+        self._vad_batch(worker_index, [job])
+        if "error" in job:
+            raise VADError(job.pop("error"))
+    
+    def _vad_batch(self, worker_index: int, jobs: List[Dict[str, Any]]) -> None:
+        """
+        VAD stage on this worker's own model
+        
+        The audio of all jobs goes through one batched model pass; a job whose
+        audio cannot be read fails on its own.
+        """
+        vad_service = self.vad_services[worker_index]
+        audios, ready = [], []
+        for job in jobs:
+            try:
+                audios.append(AudioStore(job["audio_file"]))
+                ready.append(job)
+            except Exception as e:
+                job["error"] = f"VAD processing failed: {str(e)}"
+                self._discard_audio(job)
+        if not ready:
+            return
+        
+        with STAGE_SECONDS.labels(stage="vad").time():
+            all_timestamps = vad_service.detect_speech_batch(audios)
+        
+        for job, audio, timestamps in zip(ready, audios, all_timestamps):
+            if self.segment_shaper is not None:
+                with STAGE_SECONDS.labels(stage="shape").time():
+                    timestamps = self.segment_shaper.shape(audio, timestamps)
+            job["timestamps"] = timestamps
+            with STAGE_SECONDS.labels(stage="extract").time():
+                job["speech_segments"] = vad_service.extract_speech_segments(audio, timestamps)
+            job["duration_s"] = len(audio) / self.config.sample_rate
+            AUDIO_SECONDS.inc(job["duration_s"])
+    
+    def _asr(self, worker_index: int, job: Dict[str, Any]) -> None:
+        """ASR stage; frees the downloaded audio once transcribed"""
+        speech_segments = job["speech_segments"]
+        try:
+            if self._asr_lock is not None:
+                with self._asr_lock, STAGE_SECONDS.labels(stage="asr").time():
+                    transcripts = self.asr_service.transcribe_batch(speech_segments)
+            else:
+                with STAGE_SECONDS.labels(stage="asr").time():
+                    transcripts = self.asr_service.transcribe_batch(speech_segments)
+            SEGMENTS.inc(len(speech_segments))
+            SPEECH_SECONDS.inc(sum(duration for _, duration in speech_segments))
+        finally:
+            job.pop("speech_segments", None)
+            self._discard_audio(job)
+        
+        segments = SegmentStore.from_segments(
+            (
+                {"start": ts["start"], "end": ts["end"], "text": text}
+                for ts, text in zip(job.pop("timestamps"), transcripts)
+            ),
+            self.config.sample_rate
+        )
+        if len(segments) and self.transcript_cache is not None:
+            try:
+                self.transcript_cache.put(job["url"], segments)
+            except Exception as e:
+                # A cache failure must never fail the batch
+                logger.warning(f"Failed to cache transcript: {str(e)}")
+        
+        job["result"] = self._result(job["url"], segments, duration_s=job["duration_s"])
+    
+    def _discard_audio(self, job: Dict[str, Any]) -> None:
+        """Delete a job's downloaded audio file"""
+        audio_file = job.pop("audio_file", None)
+        if audio_file:
+            self.downloader.cleanup(audio_file)
+    
+    def _result(self, url: str, segments: SegmentStore, duration_s: Optional[float] = None,
+                cached: bool = False) -> Dict[str, Any]:
+        """Build the JSONL record for a finished video"""
+        return {
+            "video_id": extract_video_id(url),
+            "url": url,
+            "duration_s": segments.duration if duration_s is None else duration_s,
+            "cached": cached,
+            "transcript": segments.transcript(),
+            "segments": segments.to_list(),
+        }
+
+
+def run_batch(sources: Iterable[str], output_path: str, manifest_path: Optional[str] = None,
+              **kwargs: Any) -> Dict[str, Any]:
+    """
+    Expand sources, process every video and release the models
+    
+    Args:
+        sources: Video or playlist URLs
+        output_path: JSONL results file
+        manifest_path: Status manifest path
+        **kwargs: Stage worker counts passed to ``BatchProcessor``
+    
+    Returns:
+        Batch summary from ``BatchProcessor.run``
+    
+    Raises:
+        YouTubeAssistantError: If the models cannot be loaded or there are no sources
+    """
+    processor = BatchProcessor(**kwargs)
+    try:
+        urls, errors = processor.expand(sources)
+        if not urls and not errors:
+            raise YouTubeAssistantError("No videos to process")
+        return processor.run(urls, output_path, manifest_path, source_errors=errors)
+    finally:
+        processor.close()
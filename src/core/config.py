@@ -3,6 +3,13 @@ from dataclasses import dataclass
 from typing import Optional
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 @dataclass
 class Config:
     # Audio settings
@@ -18,16 +25,104 @@ class Config:
     vad_model: str = "snakers4/silero-vad"
     asr_model: str = "facebook/mms-1b-all"
     asr_language: str = "eng"
+    asr_backend: str = "torch"  # "torch", "torch-int8" or "onnx"
+    
+    # Two-tier transcription: a small CTC model drafts, asr_model refines in the background
+    asr_draft_model: str = ""  # empty transcribes with asr_model only
+    
+    # Offline model snapshots (see src/services/model_snapshot.py)
+    model_snapshot_dir: str = os.path.join(".cache", "snapshots")
+    model_offline: bool = False
+    
+    # Model registry (shared, lazily loaded models)
+    model_idle_timeout_s: float = 900.0  # 0 keeps models loaded
+    model_memory_budget_bytes: int = 0  # 0 is unlimited
     
     # LLM settings
     llm_model: Optional[str] = None
     llm_api_key: Optional[str] = None
     llm_base_url: Optional[str] = None
+    llm_pool_size: int = 4
+    
+    # KV-cache reuse on local servers (llama.cpp cache_prompt / id_slot)
+    llm_prefix_cache: bool = True
+    llm_prefix_max_tokens: int = 6000
+    llm_slot_id: int = -1  # -1 gives each transcript its own slot (up to llm_num_slots)
+    llm_num_slots: int = 4
     
     # Processing settings
     beam_width: int = 50
     num_processes: int = 4
     
+    # CTC decoding ("greedy" or "beam") and optional n-gram LM for beam search
+    asr_decoder: str = "greedy"
+    lm_path: Optional[str] = None
+    lm_unigrams_path: Optional[str] = None
+    lm_alpha: float = 0.5
+    lm_beta: float = 1.0
+    
+    # ASR batching settings
+    asr_batch_max_samples: int = 16000 * 320  # padded samples per forward pass
+    asr_batch_max_size: int = 32
+    
+    # CPU parallelism (0 = library default / in-process ASR)
+    torch_num_threads: int = 0
+    asr_workers: int = 0
+    asr_threads_per_worker: int = 0
+    asr_pin_workers: bool = True
+    
+    # Strided windowing for long segments (0 disables)
+    asr_chunk_length_s: float = 20.0
+    asr_stride_left_s: float = 4.0
+    asr_stride_right_s: float = 4.0
+    
+    # Streaming pipeline settings
+    pipeline_queue_size: int = 32
+    vad_stream_chunk_samples: int = 8192
+    vad_batch_size: int = 16  # streams / shards per batched VAD step, 1 runs VAD sequentially
+    vad_shard_s: float = 0.0  # > 0 splits longer files into shards run side by side (inexact)
+    vad_shard_warmup_s: float = 5.0
+    
+    # Segment shaping between VAD and ASR (merge short, split long regions)
+    segment_shaping: bool = False  # changes segment boundaries, timestamps and text
+    segment_min_s: float = 4.0
+    segment_max_s: float = 20.0  # keep at or below asr_chunk_length_s to avoid strided windows
+    segment_merge_gap_s: float = 0.8
+    
+    # Batch processing (per-stage worker counts)
+    batch_download_workers: int = 4
+    batch_vad_workers: int = 2
+    batch_asr_jobs: int = 1
+    batch_queue_size: int = 4
+    
+    # HTTP service
+    service_host: str = "127.0.0.1"
+    service_port: int = 8000
+    service_workers: int = 2
+    service_queue_size: int = 16
+    service_max_jobs: int = 1000  # finished jobs kept for transcript / Q&A
+    
+    # Transcript retrieval for Q&A
+    retrieval_enabled: bool = True
+    retrieval_top_k: int = 8
+    retrieval_token_budget: int = 2000
+    retrieval_chunk_tokens: int = 200
+    retrieval_chunk_overlap: int = 40
+    
+    # Conversation memory
+    memory_token_budget: int = 1500
+    memory_recent_turns: int = 4
+    memory_summary_max_tokens: int = 300
+    
+    # Cache settings
+    cache_dir: str = ".cache"
+    transcript_cache_enabled: bool = True
+    transcript_cache_max_bytes: int = 512 * 1024 * 1024
+    llm_cache_enabled: bool = True
+    llm_cache_max_bytes: int = 64 * 1024 * 1024
+    llm_cache_ttl_s: float = 7 * 24 * 3600
+    llm_cache_similarity: float = 0.0  # near-duplicate threshold, 0 disables
+    
     @classmethod
     def from_env(cls) -> "Config":
         return cls(
@@ -39,11 +134,71 @@ class Config:
             vad_model=os.getenv("VAD_MODEL", "snakers4/silero-vad"),
             asr_model=os.getenv("ASR_MODEL", "nguyenvulebinh/wav2vec2-base-vietnamese-250h"),
             asr_language=os.getenv("ASR_LANGUAGE", "eng"),
+            asr_backend=os.getenv("ASR_BACKEND", "torch"),
+            asr_draft_model=os.getenv("ASR_DRAFT_MODEL", ""),
+            model_snapshot_dir=os.getenv(
+                "MODEL_SNAPSHOT_DIR", os.path.join(os.getenv("CACHE_DIR", ".cache"), "snapshots")
+            ),
+            model_offline=_env_bool("MODEL_OFFLINE", False),
+            model_idle_timeout_s=float(os.getenv("MODEL_IDLE_TIMEOUT_S", 900.0)),
+            model_memory_budget_bytes=int(os.getenv("MODEL_MEMORY_BUDGET_BYTES", 0)),
             llm_model=os.getenv("LLM_MODEL"),
             llm_api_key=os.getenv("LLM_API_KEY"),
             llm_base_url=os.getenv("LLM_BASE_URL"),
+            llm_pool_size=int(os.getenv("LLM_POOL_SIZE", 4)),
+            llm_prefix_cache=_env_bool("LLM_PREFIX_CACHE", True),
+            llm_prefix_max_tokens=int(os.getenv("LLM_PREFIX_MAX_TOKENS", 6000)),
+            llm_slot_id=int(os.getenv("LLM_SLOT_ID", -1)),
+            llm_num_slots=int(os.getenv("LLM_NUM_SLOTS", 4)),
             beam_width=int(os.getenv("BEAM_WIDTH", 50)),
             num_processes=int(os.getenv("NUM_PROCESSES", 4)),
+            asr_decoder=os.getenv("ASR_DECODER", "greedy"),
+            lm_path=os.getenv("LM_PATH"),
+            lm_unigrams_path=os.getenv("LM_UNIGRAMS_PATH"),
+            lm_alpha=float(os.getenv("LM_ALPHA", 0.5)),
+            lm_beta=float(os.getenv("LM_BETA", 1.0)),
+            asr_batch_max_samples=int(os.getenv("ASR_BATCH_MAX_SAMPLES", 16000 * 320)),
+            asr_batch_max_size=int(os.getenv("ASR_BATCH_MAX_SIZE", 32)),
+            torch_num_threads=int(os.getenv("TORCH_NUM_THREADS", 0)),
+            asr_workers=int(os.getenv("ASR_WORKERS", 0)),
+            asr_threads_per_worker=int(os.getenv("ASR_THREADS_PER_WORKER", 0)),
+            asr_pin_workers=_env_bool("ASR_PIN_WORKERS", True),
+            asr_chunk_length_s=float(os.getenv("ASR_CHUNK_LENGTH_S", 20.0)),
+            asr_stride_left_s=float(os.getenv("ASR_STRIDE_LEFT_S", 4.0)),
+            asr_stride_right_s=float(os.getenv("ASR_STRIDE_RIGHT_S", 4.0)),
+            pipeline_queue_size=int(os.getenv("PIPELINE_QUEUE_SIZE", 32)),
+            vad_stream_chunk_samples=int(os.getenv("VAD_STREAM_CHUNK_SAMPLES", 8192)),
+            vad_batch_size=int(os.getenv("VAD_BATCH_SIZE", 16)),
+            vad_shard_s=float(os.getenv("VAD_SHARD_S", 0.0)),
+            vad_shard_warmup_s=float(os.getenv("VAD_SHARD_WARMUP_S", 5.0)),
+            segment_shaping=_env_bool("SEGMENT_SHAPING", False),
+            segment_min_s=float(os.getenv("SEGMENT_MIN_S", 4.0)),
+            segment_max_s=float(os.getenv("SEGMENT_MAX_S", 20.0)),
+            segment_merge_gap_s=float(os.getenv("SEGMENT_MERGE_GAP_S", 0.8)),
+            batch_download_workers=int(os.getenv("BATCH_DOWNLOAD_WORKERS", 4)),
+            batch_vad_workers=int(os.getenv("BATCH_VAD_WORKERS", 2)),
+            batch_asr_jobs=int(os.getenv("BATCH_ASR_JOBS", 1)),
+            batch_queue_size=int(os.getenv("BATCH_QUEUE_SIZE", 4)),
+            service_host=os.getenv("SERVICE_HOST", "127.0.0.1"),
+            service_port=int(os.getenv("SERVICE_PORT", 8000)),
+            service_workers=int(os.getenv("SERVICE_WORKERS", 2)),
+            service_queue_size=int(os.getenv("SERVICE_QUEUE_SIZE", 16)),
+            service_max_jobs=int(os.getenv("SERVICE_MAX_JOBS", 1000)),
+            retrieval_enabled=_env_bool("RETRIEVAL_ENABLED", True),
+            retrieval_top_k=int(os.getenv("RETRIEVAL_TOP_K", 8)),
+            retrieval_token_budget=int(os.getenv("RETRIEVAL_TOKEN_BUDGET", 2000)),
+            retrieval_chunk_tokens=int(os.getenv("RETRIEVAL_CHUNK_TOKENS", 200)),
+            retrieval_chunk_overlap=int(os.getenv("RETRIEVAL_CHUNK_OVERLAP", 40)),
+            memory_token_budget=int(os.getenv("MEMORY_TOKEN_BUDGET", 1500)),
+            memory_recent_turns=int(os.getenv("MEMORY_RECENT_TURNS", 4)),
+            memory_summary_max_tokens=int(os.getenv("MEMORY_SUMMARY_MAX_TOKENS", 300)),
+            cache_dir=os.getenv("CACHE_DIR", ".cache"),
+            transcript_cache_enabled=_env_bool("TRANSCRIPT_CACHE", True),
+            transcript_cache_max_bytes=int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+            llm_cache_enabled=_env_bool("LLM_CACHE", True),
+            llm_cache_max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+            llm_cache_ttl_s=float(os.getenv("LLM_CACHE_TTL_S", 7 * 24 * 3600)),
+            llm_cache_similarity=float(os.getenv("LLM_CACHE_SIMILARITY", 0.0)),
         )
 
 
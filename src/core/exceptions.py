@@ -25,4 +25,9 @@ class LLMError(YouTubeAssistantError):
 
 class AudioProcessingError(YouTubeAssistantError):
     """Raised when audio processing fails"""
-    pass
\ No newline at end of file
+    pass
+
+
+class QueueFullError(YouTubeAssistantError):
+    """Raised when a job queue cannot accept more work"""
+    pass
@@ -0,0 +1,313 @@
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+from src.utils.metrics import MODEL_MEMORY_BYTES, MODELS_LOADED
+from .config import Config, config
+
+
+logger = logging.getLogger(__name__)
+
+
+def model_nbytes(value: Any) -> int:
+    """
+    Estimate the in-process memory held by a loaded model or service
+    
+    Counts parameters and buffers of the first torch module found on the
+    value itself, its ``model`` or its ``backend.model``. Values without one
+    (ONNX sessions, out-of-process worker pools) count as 0.
+    """
+    candidates = [value, getattr(value, "model", None), getattr(getattr(value, "backend", None), "model", None)]
+    for candidate in candidates:
+        if candidate is not None and hasattr(candidate, "parameters") and hasattr(candidate, "buffers"):
+            tensors = itertools.chain(candidate.parameters(), candidate.buffers())
+            return sum(t.numel() * t.element_size() for t in tensors)
+    return 0
+
+
+class _Entry:
+    """One loaded instance of a model"""
+    
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.value: Any = None
+        self.nbytes = 0
+        self.refs = 0
+        self.last_used = time.monotonic()
+        self.ready = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class ModelRegistry:
+    """
+    Process-wide, thread-safe cache of loaded models
+    
+    Each key, e.g. ("asr", model name, backend), is loaded once on first use
+    and handed out as a shared reference. Callers hold a lease while they
+    use the model (``acquire`` / ``release`` or ``lease``). Models nobody
+    holds are unloaded after ``idle_timeout_s``, and the least recently used
+    idle models are unloaded as soon as the loaded total exceeds
+    ``memory_budget_bytes``.
+    
+    Stateful models that cannot serve two callers at once are acquired with
+    ``exclusive=True``: each concurrent lease gets its own instance, and
+    released instances are reused.
+    """
+    
+    def __init__(self, idle_timeout_s: Optional[float] = None, memory_budget_bytes: Optional[int] = None,
+                 settings: Optional[Config] = None):
+        """
+        Args:
+            idle_timeout_s: Unload models unused for this long, 0 never (default: config.model_idle_timeout_s)
+            memory_budget_bytes: Loaded-model budget, 0 unlimited (default: config.model_memory_budget_bytes)
+            settings: Configuration to use instead of the global config
+        """
+        self.config = settings or config
+        self.idle_timeout_s = self.config.model_idle_timeout_s if idle_timeout_s is None else idle_timeout_s
+        self.memory_budget_bytes = (
+            self.config.model_memory_budget_bytes if memory_budget_bytes is None else memory_budget_bytes
+        )
+        self._entries: Dict[Hashable, List[_Entry]] = {}
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+    
+    def acquire(self, key: Hashable, loader: Callable[[], Any], exclusive: bool = False) -> Any:
+        """
+        Lease a model, loading it on first use
+        
+        Concurrent first calls for a shared model wait for a single load.
+        
+        Args:
+            key: Identity of the model (everything that changes the loaded object)
+            loader: Builds the model when it is not loaded
+            exclusive: Give this lease an instance no one else holds
+        
+        Returns:
+            The loaded model; pass it back to ``release`` when done
+        
+        Raises:
+            Whatever ``loader`` raises
+        """
+        with self._lock:
+            entries = self._entries.setdefault(key, [])
+            entry = next((e for e in entries if e.refs == 0 or not exclusive), None)
+            created = entry is None
+            if created:
+                entry = _Entry(key)
+                entries.append(entry)
+            entry.refs += 1
+            entry.last_used = time.monotonic()
+        
+        if created:
+            self._load(entry, loader)
+        else:
+            entry.ready.wait()
+            if entry.error is not None:
+                self._drop_reference(entry)
+                raise entry.error
+        
+        self._start_reaper()
+        return entry.value
+    
+    def release(self, key: Hashable, value: Any) -> None:
+        """
+        End a lease taken with ``acquire``
+        
+        The model stays loaded for reuse until it idles out or is evicted.
+        """
+        with self._lock:
+            for entry in self._entries.get(key, []):
+                if entry.value is value and entry.refs > 0:
+                    entry.refs -= 1
+                    entry.last_used = time.monotonic()
+                    break
+        self._enforce_budget()
+    
+    @contextmanager
+    def lease(self, key: Hashable, loader: Callable[[], Any], exclusive: bool = False) -> Iterator[Any]:
+        """Context manager form of ``acquire`` / ``release``"""
+        value = self.acquire(key, loader, exclusive=exclusive)
+        try:
+            yield value
+        finally:
+            self.release(key, value)
+    
+    def unload_idle(self, max_idle_s: Optional[float] = None) -> int:
+        """
+        Unload models nobody holds that have been unused for ``max_idle_s``
+        
+        Args:
+            max_idle_s: Idle time before unloading (default: idle_timeout_s; 0 unloads every idle model)
+        
+        Returns:
+            Number of instances unloaded
+        """
+        max_idle_s = self.idle_timeout_s if max_idle_s is None else max_idle_s
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                entry for entries in self._entries.values() for entry in entries
+                if entry.refs == 0 and entry.ready.is_set() and now - entry.last_used >= max_idle_s
+            ]
+            self._remove(idle)
+        self._close(idle)
+        return len(idle)
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        """Loaded instances with their size, lease count and idle time"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "key": entry.key,
+                    "nbytes": entry.nbytes,
+                    "refs": entry.refs,
+                    "idle_s": now - entry.last_used if entry.refs == 0 else 0.0,
+                }
+                for entries in self._entries.values() for entry in entries
+                if entry.ready.is_set() and entry.error is None
+            ]
+    
+    def total_bytes(self) -> int:
+        """Estimated memory of all loaded instances"""
+        with self._lock:
+            return sum(entry.nbytes for entries in self._entries.values() for entry in entries)
+    
+    def _load(self, entry: _Entry, loader: Callable[[], Any]) -> None:
+        """Run the loader for a new entry outside the registry lock"""
+        started = time.perf_counter()
+        try:
+            entry.value = loader()
+            entry.nbytes = model_nbytes(entry.value)
+        except BaseException as e:
+            entry.error = e
+            with self._lock:
+                self._remove([entry])
+            raise
+        finally:
+            entry.ready.set()
+        
+        logger.info(
+            f"Loaded model {entry.key} in {time.perf_counter() - started:.1f}s "
+            f"({entry.nbytes / 2 ** 20:.0f} MiB)"
+        )
+        self._enforce_budget()
+    
+    def _drop_reference(self, entry: _Entry) -> None:
+        with self._lock:
+            entry.refs -= 1
+    
+    def _enforce_budget(self) -> None:
+        """Unload least recently used idle models while over the memory budget"""
+        if self.memory_budget_bytes <= 0:
+            return
+        
+        with self._lock:
+            entries = [entry for group in self._entries.values() for entry in group if entry.ready.is_set()]
+            total = sum(entry.nbytes for entry in entries)
+            evicted = []
+            for entry in sorted((e for e in entries if e.refs == 0), key=lambda e: e.last_used):
+                if total <= self.memory_budget_bytes:
+                    break
+                evicted.append(entry)
+                total -= entry.nbytes
+            self._remove(evicted)
+        
+        self._close(evicted)
+        if total > self.memory_budget_bytes:
+            logger.warning(
+                f"Models in use take {total / 2 ** 20:.0f} MiB, over the "
+                f"{self.memory_budget_bytes / 2 ** 20:.0f} MiB budget"
+            )
+    
+    def _remove(self, entries: List[_Entry]) -> None:
+        """Forget entries (lock held)"""
+        for entry in entries:
+            group = self._entries.get(entry.key, [])
+            if entry in group:
+                group.remove(entry)
+            if not group:
+                self._entries.pop(entry.key, None)
+    
+    def _close(self, entries: List[_Entry]) -> None:
+        """Release resources of unloaded entries (lock not held)"""
+        for entry in entries:
+            logger.info(f"Unloading model {entry.key}")
+            close = getattr(entry.value, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    logger.warning(f"Failed to close model {entry.key}: {str(e)}")
+            entry.value = None
+    
+    def _start_reaper(self) -> None:
+        """Start the idle-unload thread once a model is loaded"""
+        if self.idle_timeout_s <= 0 or self._reaper is not None:
+            return
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap, name="model-registry-reaper", daemon=True)
+        self._reaper.start()
+    
+    def _reap(self) -> None:
+        interval = max(1.0, min(60.0, self.idle_timeout_s / 4))
+        while True:
+            time.sleep(interval)
+            self.unload_idle()
+
+
+def vad_model_key(settings: Config) -> Hashable:
+    return ("vad", settings.vad_model, settings.vad_batch_size, settings.vad_shard_s, settings.vad_shard_warmup_s)
+
+
+def asr_model_key(settings: Config) -> Hashable:
+    # Deferred: transcript_cache pulls in the services package
+    from src.services.transcript_cache import config_fingerprint
+    kind = "asr-pool" if settings.asr_workers > 0 else "asr"
+    return (kind, settings.asr_model, settings.asr_backend, config_fingerprint(settings))
+
+
+def acquire_vad_service(settings: Optional[Config] = None) -> Any:
+    """
+    Lease a VAD service of your own from the registry
+    
+    The silero model carries streaming state, so every lease gets an
+    instance no other caller holds. Release it with ``release_vad_service``.
+    """
+    from src.services.vad_service import VADService
+    settings = settings or config
+    return registry.acquire(vad_model_key(settings), lambda: VADService(settings=settings), exclusive=True)
+
+
+def release_vad_service(service: Any, settings: Optional[Config] = None) -> None:
+    registry.release(vad_model_key(settings or config), service)
+
+
+def acquire_asr_service(settings: Optional[Config] = None) -> Any:
+    """
+    Lease the shared ASR service (in-process or worker pool) for a configuration
+    
+    Release it with ``release_asr_service``.
+    """
+    settings = settings or config
+    
+    def load():
+        from src.services.asr_service import ASRService
+        from src.services.asr_pool import ASRWorkerPool
+        return ASRWorkerPool(settings=settings) if settings.asr_workers > 0 else ASRService(settings)
+    
+    return registry.acquire(asr_model_key(settings), load)
+
+
+def release_asr_service(service: Any, settings: Optional[Config] = None) -> None:
+    registry.release(asr_model_key(settings or config), service)
+
+
+registry = ModelRegistry()
+MODEL_MEMORY_BYTES.set_function(registry.total_bytes)
+MODELS_LOADED.set_function(lambda: len(registry.stats()))
@@ -1,97 +1,680 @@
+import dataclasses
 import logging
-from typing import List, Dict, Optional, Any
+import queue
+import threading
+import time
+from typing import List, Dict, Iterator, Optional, Any, Tuple, Union
 import numpy as np
 
 from src.services.downloader import YouTubeDownloader
-from src.services.vad_service import VADService
-from src.services.asr_service import ASRService
 from src.services.llm_service import BaseLLMService, create_llm_service
+from src.services.transcript_cache import TranscriptCache
+from src.services.retrieval import TranscriptIndex
+from src.services.segment_shaper import SegmentShaper
+from src.services.conversation_memory import ConversationMemory
 from .config import config
+from .model_registry import acquire_asr_service, acquire_vad_service, release_asr_service, release_vad_service
 from .exceptions import YouTubeAssistantError, DownloadError, VADError, ASRError, LLMError
+from src.utils.audio_utils import iter_pcm_chunks
+from src.utils.metrics import (
+    AUDIO_SECONDS, PIPELINE_RUNS, SEGMENTS, SPEECH_SECONDS, STAGE_SECONDS, TRANSCRIPT_READY_SECONDS
+)
+from src.utils.segment_store import SegmentStore
+from src.utils.text_utils import count_tokens
 
 
 logger = logging.getLogger(__name__)
 
 
+_END_OF_STREAM = object()
+
+
 class VideoProcessor:
     """Main processor class that orchestrates the entire pipeline"""
     
-    def __init__(self, llm_service_type: str = "local", llm_kwargs: Optional[Dict] = None):
+    def __init__(self, llm_service_type: str = "local", llm_kwargs: Optional[Dict] = None,
+                 downloader: Optional[YouTubeDownloader] = None, vad_service: Optional[Any] = None,
+                 asr_service: Optional[Any] = None, llm_service: Optional[BaseLLMService] = None,
+                 draft_asr_service: Optional[Any] = None, transcript_cache: Optional[TranscriptCache] = None):
         """
         Initialize the video processor
         
         Args:
             llm_service_type: Type of LLM service to use ("local" or "openai")
             llm_kwargs: Additional arguments for LLM service
+            downloader: Shared downloader to use instead of creating one
+            vad_service: Shared, already loaded VAD service
+            asr_service: Shared, already loaded ASRService or ASRWorkerPool
+            llm_service: LLM service to use instead of creating one
+            draft_asr_service: Shared, already loaded service of the draft model
+                (used when ``asr_draft_model`` is set)
+            transcript_cache: Shared transcript cache to use instead of opening one
         """
         self.config = config
         
-        # Initialize services
-        self.downloader = YouTubeDownloader()
-        self.vad_service = VADService()
-        self.asr_service = ASRService()
+        # Injected services are used as-is; otherwise VAD and ASR are leased from
+        # the process-wide model registry on first use (see release_models)
+        self.downloader = downloader or YouTubeDownloader()
+        self._vad_service = vad_service
+        self._asr_service = asr_service
+        self._draft_asr_service = draft_asr_service
+        self._leased: Dict[str, Any] = {}
+        # The draft model is leased like asr_model, under its own registry key
+        self.draft_config = dataclasses.replace(
+            self.config, asr_model=self.config.asr_draft_model, asr_workers=0, asr_decoder="greedy"
+        ) if self.config.asr_draft_model else None
+        self.transcript_cache = transcript_cache or (
+            TranscriptCache() if self.config.transcript_cache_enabled else None
+        )
+        self.segment_shaper = SegmentShaper(self.config) if self.config.segment_shaping else None
         
         # Initialize LLM service
         llm_kwargs = llm_kwargs or {}
-        self.llm_service = create_llm_service(llm_service_type, **llm_kwargs)
+        self._owns_llm_service = llm_service is None
+        self.llm_service = llm_service or create_llm_service(llm_service_type, **llm_kwargs)
         
         # Store processed data
-        self.transcript = ""
-        self.conversation_history: List[Dict[str, str]] = []
+        self.segments = SegmentStore.empty(self.config.sample_rate)
+        self.segment_final = np.zeros(0, dtype=bool)  # per segment: refined (True) or draft text
+        self.timings: Dict[str, float] = {}
+        self._transcript: Optional[str] = None
+        self._segments_lock = threading.Lock()
+        self._index_stale = False
+        # A cancelled refiner finishes its running batch; the next one waits for it
+        self._refine_asr_lock = threading.Lock()
+        self._refiner: Optional[threading.Thread] = None
+        self._refine_stop = threading.Event()
+        self._refine_error: Optional[str] = None
+        self.retrieval_index: Optional[TranscriptIndex] = None
+        self.last_context_stats: Dict[str, int] = {}
+        self.memory = ConversationMemory(self.llm_service)
+    
+    @property
+    def vad_service(self) -> Any:
+        """VAD service, leased from the model registry on first use"""
+        if self._vad_service is None:
+            self._vad_service = acquire_vad_service(self.config)
+            self._leased["vad"] = self._vad_service
+        return self._vad_service
+    
+    @property
+    def asr_service(self) -> Any:
+        """ASR service (in-process or worker pool), leased from the model registry on first use"""
+        if self._asr_service is None:
+            self._asr_service = acquire_asr_service(self.config)
+            self._leased["asr"] = self._asr_service
+        return self._asr_service
+    
+    @property
+    def draft_asr_service(self) -> Any:
+        """ASR service of the draft model, leased from the model registry on first use"""
+        if self._draft_asr_service is None:
+            self._draft_asr_service = acquire_asr_service(self.draft_config)
+            self._leased["draft"] = self._draft_asr_service
+        return self._draft_asr_service
+    
+    def release_models(self) -> None:
+        """
+        Return leased models to the registry
+        
+        They stay loaded for other sessions until they idle out; the next
+        pipeline run leases them again.
+        """
+        if "vad" in self._leased:
+            release_vad_service(self._leased.pop("vad"), self.config)
+            self._vad_service = None
+        if "asr" in self._leased:
+            release_asr_service(self._leased.pop("asr"), self.config)
+            self._asr_service = None
+        if "draft" in self._leased:
+            release_asr_service(self._leased.pop("draft"), self.draft_config)
+            self._draft_asr_service = None
+    
+    @property
+    def transcript(self) -> str:
+        """Combined transcript text, derived from the segment store on first use"""
+        if self._transcript is None:
+            self._transcript = self.segments.transcript()
+        return self._transcript
+    
+    @transcript.setter
+    def transcript(self, text: str) -> None:
+        self._transcript = text
+    
+    @property
+    def conversation_history(self) -> List[Dict[str, str]]:
+        """History sent with the next question (summary plus recent turns)"""
+        return self.memory.messages()
         
     def process_video(self, youtube_url: str) -> str:
         """
         Process a YouTube video through the complete pipeline
         
+        With ``asr_draft_model`` set, the speech segments are transcribed by
+        the small draft model and this returns as soon as that draft is
+        ready, so questions can be asked right away. ``asr_model`` then
+        re-transcribes the segments in a background thread and swaps its text
+        in batch by batch (see ``transcript_status`` and ``wait_until_final``).
+        
         Args:
             youtube_url: YouTube video URL
             
         Returns:
-            Complete transcript of the video
+            Complete transcript of the video (the draft in two-tier mode)
             
         Raises:
             YouTubeAssistantError: If any step in the pipeline fails
         """
+        self._cancel_refinement()
+        self.timings = {}
+        self._refine_error = None
+        cached = self._load_cached(youtube_url)
+        if cached is not None:
+            PIPELINE_RUNS.labels(result="cached").inc()
+            return self.transcript
+        
+        started = time.perf_counter()
+        audio_file = None
         try:
             logger.info(f"Starting video processing for: {youtube_url}")
             
             # Step 1: Download video
             logger.info("Downloading video...")
-            audio_file = self.downloader.download(youtube_url)
+            with STAGE_SECONDS.labels(stage="download").time():
+                audio_file = self.downloader.download(youtube_url)
             
             # Step 2: Voice Activity Detection
             logger.info("Performing voice activity detection...")
-            wav, speech_timestamps = self.vad_service.process_audio(audio_file)
+            with STAGE_SECONDS.labels(stage="vad").time():
+                audio, speech_timestamps = self.vad_service.process_audio(audio_file)
+            AUDIO_SECONDS.inc(len(audio) / self.config.sample_rate)
+            
+            # Step 3: Merge short and split long speech regions to suit ASR
+            if self.segment_shaper is not None:
+                with STAGE_SECONDS.labels(stage="shape").time():
+                    speech_timestamps = self.segment_shaper.shape(audio, speech_timestamps)
             
-            # Step 3: Extract speech segments
+            # Step 4: Extract speech segments
             logger.info("Extracting speech segments...")
-            speech_segments = self.vad_service.extract_speech_segments(wav, speech_timestamps)
+            with STAGE_SECONDS.labels(stage="extract").time():
+                speech_segments = self.vad_service.extract_speech_segments(audio, speech_timestamps)
             
             if not speech_segments:
                 logger.warning("No speech segments found in the audio")
+                self.downloader.cleanup(audio_file)
+                PIPELINE_RUNS.labels(result="no_speech").inc()
                 return "No speech detected in the video."
             
-            # Step 4: Automatic Speech Recognition
+            # Step 5: Automatic Speech Recognition
+            if self.draft_config is not None:
+                self._transcribe_draft(speech_timestamps, speech_segments, started)
+                # The refiner still reads the segments; it removes the file when done
+                self._start_refinement(youtube_url, audio_file, speech_segments, started)
+                audio_file = None
+                return self.transcript
+            
             logger.info(f"Transcribing {len(speech_segments)} speech segments...")
-            transcripts = self.asr_service.transcribe_batch(speech_segments)
+            with STAGE_SECONDS.labels(stage="asr").time():
+                transcripts = self.asr_service.transcribe_batch(speech_segments)
+            SEGMENTS.inc(len(speech_segments))
+            SPEECH_SECONDS.inc(sum(duration for _, duration in speech_segments))
             
-            # Step 5: Combine transcripts
-            self.transcript = self.asr_service.combine_transcripts(transcripts)
+            # Step 6: Combine transcripts
+            self._set_transcript([
+                {"start": ts["start"], "end": ts["end"], "text": text}
+                for ts, text in zip(speech_timestamps, transcripts)
+            ])
+            self._record_ready("final", started)
+            self._store_cached(youtube_url)
             
             # Clean up
-            self.downloader.cleanup()
+            self.downloader.cleanup(audio_file)
             
             logger.info("Video processing completed successfully")
+            PIPELINE_RUNS.labels(result="ok").inc()
             return self.transcript
             
         except (DownloadError, VADError, ASRError) as e:
             logger.error(f"Pipeline error: {str(e)}")
-            self.downloader.cleanup()  # Clean up on error
+            PIPELINE_RUNS.labels(result="error").inc()
+            if audio_file:
+                self.downloader.cleanup(audio_file)  # Clean up on error
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error during video processing: {str(e)}")
+            PIPELINE_RUNS.labels(result="error").inc()
+            if audio_file:
+                self.downloader.cleanup(audio_file)  # Clean up on error
+            raise YouTubeAssistantError(f"Video processing failed: {str(e)}")
+        finally:
+            self.release_models()
+    
+    def process_video_stream(self, youtube_url: str) -> Iterator[Dict[str, Any]]:
+        """
+        Process a YouTube video and yield transcripts as segments are recognized
+        
+        Audio is streamed from the downloader's ffmpeg pipe into VAD in a
+        background thread that feeds speech segments into a bounded queue; ASR
+        consumes that queue in micro-batches on the calling thread.
+        Transcription of the first segments therefore starts while the audio
+        is still being fetched and scanned, and a slow ASR stage throttles VAD
+        and the download (through the pipe) instead of letting segments pile
+        up in memory.
+        
+        Args:
+            youtube_url: YouTube video URL
+            
+        Yields:
+            Dicts with "start" and "end" sample offsets and the segment "text",
+            in audio order
+            
+        Raises:
+            YouTubeAssistantError: If any step in the pipeline fails
+        """
+        self._cancel_refinement()
+        self.timings = {}
+        self._refine_error = None
+        cached = self._load_cached(youtube_url)
+        if cached is not None:
+            PIPELINE_RUNS.labels(result="cached").inc()
+            yield from cached
+            return
+        
+        segment_queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.config.pipeline_queue_size)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._produce_segments,
+            args=(youtube_url, segment_queue, stop),
+            name="vad-producer",
+            daemon=True
+        )
+        
+        segments: List[Dict[str, Any]] = []
+        try:
+            logger.info(f"Starting streaming video processing for: {youtube_url}")
+            producer.start()
+            
+            finished = False
+            while not finished:
+                batch, finished = self._next_segment_batch(segment_queue)
+                if not batch:
+                    continue
+                
+                logger.info(f"Transcribing {len(batch)} streamed speech segments...")
+                speech_segments = [
+                    (audio, (ts["end"] - ts["start"]) / self.config.sample_rate) for ts, audio in batch
+                ]
+                with STAGE_SECONDS.labels(stage="asr").time():
+                    transcripts = self.asr_service.transcribe_batch(speech_segments)
+                SEGMENTS.inc(len(batch))
+                SPEECH_SECONDS.inc(sum(duration for _, duration in speech_segments))
+                
+                for (timestamp, _), text in zip(batch, transcripts):
+                    segment = {"start": timestamp["start"], "end": timestamp["end"], "text": text}
+                    segments.append(segment)
+                    yield segment
+            
+            if segments:
+                self._set_transcript(segments)
+                self._store_cached(youtube_url)
+                PIPELINE_RUNS.labels(result="ok").inc()
+            else:
+                self.transcript = "No speech detected in the video."
+                PIPELINE_RUNS.labels(result="no_speech").inc()
+            logger.info("Streaming video processing completed successfully")
+            
+        except (DownloadError, VADError, ASRError) as e:
+            logger.error(f"Pipeline error: {str(e)}")
+            PIPELINE_RUNS.labels(result="error").inc()
             raise
         except Exception as e:
             logger.error(f"Unexpected error during video processing: {str(e)}")
-            self.downloader.cleanup()  # Clean up on error
+            PIPELINE_RUNS.labels(result="error").inc()
             raise YouTubeAssistantError(f"Video processing failed: {str(e)}")
+        finally:
+            stop.set()
+            producer.join()
+            self.release_models()
+    
+    def load_transcript(self, segments: Union[SegmentStore, List[Dict[str, Any]]]) -> None:
+        """
+        Use an already transcribed video for questions
+        
+        Args:
+            segments: Segment store, or dicts with "start" and "end" sample offsets and "text"
+        """
+        self._cancel_refinement()
+        self.timings = {}
+        self._refine_error = None
+        self._set_transcript(segments)
+        self.memory.reset()
+    
+    def get_segments(self, start_s: Optional[float] = None, end_s: Optional[float] = None) -> SegmentStore:
+        """
+        Get the timestamped segments, optionally only those overlapping a time range
+        
+        Args:
+            start_s: Range start in seconds (default: beginning)
+            end_s: Range end in seconds (default: end)
+        """
+        if start_s is None and end_s is None:
+            return self.segments
+        return self.segments.between(start_s or 0.0, self.segments.duration if end_s is None else end_s)
+    
+    def _set_transcript(self, segments: Union[SegmentStore, List[Dict[str, Any]]],
+                        final: Optional[np.ndarray] = None) -> None:
+        """
+        Store the timestamped segments and their retrieval index
+        
+        The index is built before anything is replaced, so a question asked
+        while the refiner swaps text in sees either the old or the new state.
+        
+        Args:
+            segments: Segment store, or dicts with "start" and "end" sample offsets and "text"
+            final: Which segments hold refined text (default: all of them)
+        """
+        if not isinstance(segments, SegmentStore):
+            segments = SegmentStore.from_segments(segments, self.config.sample_rate)
+        retrieval_index = self._index_segments(segments)
+        self.segments = segments
+        self.segment_final = np.ones(len(segments), dtype=bool) if final is None else final
+        self._transcript = None
+        self.retrieval_index = retrieval_index
+        self._index_stale = False
+    
+    def _index_segments(self, segments: SegmentStore) -> Optional[TranscriptIndex]:
+        """Build the retrieval index of a transcript (None when retrieval is off)"""
+        if not self.config.retrieval_enabled:
+            return None
+        return TranscriptIndex.from_segments(
+            segments,
+            sample_rate=self.config.sample_rate,
+            chunk_tokens=self.config.retrieval_chunk_tokens,
+            overlap_tokens=self.config.retrieval_chunk_overlap
+        )
+    
+    def _current_index(self) -> Optional[TranscriptIndex]:
+        """The retrieval index, rebuilt first if refined text came in since it was built"""
+        with self._segments_lock:
+            if self._index_stale:
+                self.retrieval_index = self._index_segments(self.segments)
+                self._index_stale = False
+            return self.retrieval_index
+    
+    def _record_ready(self, tier: str, started: float) -> None:
+        """Note how long the transcript took to reach ``tier`` ("draft" or "final")"""
+        elapsed = time.perf_counter() - started
+        self.timings[tier] = elapsed
+        TRANSCRIPT_READY_SECONDS.labels(tier=tier).observe(elapsed)
+    
+    def _transcribe_draft(self, timestamps: List[Dict[str, int]],
+                          speech_segments: List[Tuple[np.ndarray, float]], started: float) -> None:
+        """Transcribe all segments with the draft model and make that the current transcript"""
+        logger.info(f"Drafting {len(speech_segments)} speech segments with {self.draft_config.asr_model}...")
+        with STAGE_SECONDS.labels(stage="asr_draft").time():
+            transcripts = self.draft_asr_service.transcribe_batch(speech_segments)
+        
+        self._set_transcript(
+            [{"start": ts["start"], "end": ts["end"], "text": text} for ts, text in zip(timestamps, transcripts)],
+            final=np.zeros(len(timestamps), dtype=bool)
+        )
+        self._record_ready("draft", started)
+        logger.info(f"Draft transcript ready after {self.timings['draft']:.1f}s; refining in the background")
+    
+    def _start_refinement(self, youtube_url: str, audio_file: str,
+                          speech_segments: List[Tuple[np.ndarray, float]], started: float) -> None:
+        stop = threading.Event()
+        self._refine_stop = stop
+        self._refiner = threading.Thread(
+            target=self._refine,
+            args=(youtube_url, audio_file, speech_segments, started, stop),
+            name="asr-refiner",
+            daemon=True
+        )
+        self._refiner.start()
+    
+    def _refine(self, youtube_url: str, audio_file: str, speech_segments: List[Tuple[np.ndarray, float]],
+                started: float, stop: threading.Event) -> None:
+        """
+        Re-transcribe the draft with ``asr_model`` and swap the text in (runs in a thread)
+        
+        Segments go in time order, ``asr_batch_max_size`` at a time, so the
+        start of the video turns final first. The refiner holds a lease of
+        its own on the large model; on failure the draft text stays.
+        Refiners of this processor run one batch at a time, so a cancelled
+        refiner's last batch never overlaps the next video's on the same model.
+        """
+        asr_service = self._asr_service
+        leased = asr_service is None
+        try:
+            if leased:
+                asr_service = acquire_asr_service(self.config)
+            
+            batch_size = max(1, self.config.asr_batch_max_size)
+            with STAGE_SECONDS.labels(stage="asr_refine").time():
+                for first in range(0, len(speech_segments), batch_size):
+                    with self._refine_asr_lock:
+                        if stop.is_set():
+                            return
+                        transcripts = asr_service.transcribe_batch(speech_segments[first:first + batch_size])
+                    if not self._swap_text(first, transcripts, stop):
+                        return
+            SEGMENTS.inc(len(speech_segments))
+            SPEECH_SECONDS.inc(sum(duration for _, duration in speech_segments))
+            
+            # Checked together with the snapshot, so another video's segments are never cached here
+            with self._segments_lock:
+                if stop.is_set():
+                    return
+                self._record_ready("final", started)
+                segments = self.segments
+            logger.info(
+                f"Refined transcript ready after {self.timings['final']:.1f}s "
+                f"(draft after {self.timings['draft']:.1f}s)"
+            )
+            self._store_cached(youtube_url, segments)
+            PIPELINE_RUNS.labels(result="ok").inc()
+            
+        except Exception as e:
+            logger.error(f"Refinement failed, keeping the draft transcript: {str(e)}")
+            if not stop.is_set():
+                self._refine_error = str(e)
+            PIPELINE_RUNS.labels(result="error").inc()
+        finally:
+            if leased and asr_service is not None:
+                release_asr_service(asr_service, self.config)
+            self.downloader.cleanup(audio_file)
+    
+    def _swap_text(self, first: int, texts: List[str], stop: threading.Event) -> bool:
+        """
+        Replace the text of segments ``first:first + len(texts)`` with refined text
+        
+        Only the text buffer is spliced; the retrieval index is rebuilt when
+        the next question needs it rather than once per batch.
+        
+        Returns:
+            False if the refinement was cancelled (another video took over)
+        """
+        with self._segments_lock:
+            if stop.is_set():
+                return False
+            final = self.segment_final.copy()
+            final[first:first + len(texts)] = True
+            self.segments = self.segments.replace_texts(first, texts)
+            self.segment_final = final
+            self._transcript = None
+            self._index_stale = True
+        return True
+    
+    def _cancel_refinement(self, wait: bool = False) -> None:
+        """
+        Stop a background refinement before the transcript is replaced
+        
+        A batch already running finishes in the background but is discarded.
+        """
+        with self._segments_lock:
+            self._refine_stop.set()
+        if wait and self._refiner is not None:
+            self._refiner.join()
+    
+    def wait_until_final(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the background refinement finishes
+        
+        Args:
+            timeout: Seconds to wait at most (default: no limit)
+        
+        Returns:
+            True if every segment now holds refined text
+        """
+        if self._refiner is not None:
+            self._refiner.join(timeout)
+        return bool(self.segment_final.all())
+    
+    def transcript_status(self) -> Dict[str, Any]:
+        """
+        Refinement progress of the current transcript
+        
+        Returns:
+            Segment counts by tier ("draft", "final"), whether refinement is
+            still running, its error if it failed, and the seconds from the
+            request until the draft and the final transcript were ready
+            (None when not reached, or without a draft tier)
+        """
+        final = self.segment_final
+        num_final = int(final.sum())
+        return {
+            "segments": len(final),
+            "draft": len(final) - num_final,
+            "final": num_final,
+            "refining": self._refiner is not None and self._refiner.is_alive(),
+            "error": self._refine_error,
+            "time_to_draft_s": self.timings.get("draft"),
+            "time_to_final_s": self.timings.get("final"),
+        }
+    
+    def _build_context(self, question: str) -> str:
+        """
+        Choose the transcript context to send with a question
+        
+        Short transcripts are sent whole. Longer ones are reduced to the
+        top-k retrieved chunks that fit in ``retrieval_token_budget``, unless
+        the LLM server can reuse a stable prompt prefix and the transcript
+        fits ``llm_prefix_max_tokens``: then the whole transcript is sent on
+        every turn, since its prefill is only paid once.
+        """
+        index = self._current_index()
+        if index is None or index.total_tokens <= self.config.retrieval_token_budget:
+            return self.transcript
+        
+        if (getattr(self.llm_service, "prefers_stable_context", False)
+                and index.total_tokens <= self.config.llm_prefix_max_tokens):
+            return self.transcript
+        
+        chunks = index.select(
+            question,
+            top_k=self.config.retrieval_top_k,
+            token_budget=self.config.retrieval_token_budget
+        )
+        context = TranscriptIndex.format_context(chunks)
+        
+        full_tokens = count_tokens(self.transcript)
+        context_tokens = count_tokens(context)
+        self.last_context_stats = {
+            "chunks": len(chunks),
+            "context_tokens": context_tokens,
+            "transcript_tokens": full_tokens,
+            "tokens_saved": full_tokens - context_tokens,
+        }
+        logger.info(
+            f"Retrieved {len(chunks)} transcript chunks ({context_tokens} tokens), "
+            f"saving {full_tokens - context_tokens} of {full_tokens} tokens"
+        )
+        return context
+    
+    def _load_cached(self, youtube_url: str) -> Optional[SegmentStore]:
+        """Restore the transcript from the cache; returns its segments on a hit"""
+        if self.transcript_cache is None:
+            return None
+        
+        cached = self.transcript_cache.get(youtube_url)
+        if cached is None:
+            return None
+        
+        self._set_transcript(cached)
+        return cached
+    
+    def _store_cached(self, youtube_url: str, segments: Optional[SegmentStore] = None) -> None:
+        """Save a transcript (default: the current one) to the cache"""
+        if self.transcript_cache is None:
+            return
+        
+        try:
+            self.transcript_cache.put(youtube_url, self.segments if segments is None else segments)
+        except Exception as e:
+            # A cache failure must never fail the pipeline
+            logger.warning(f"Failed to cache transcript: {str(e)}")
+    
+    def _produce_segments(self, youtube_url: str, segment_queue: "queue.Queue[Any]",
+                          stop: threading.Event) -> None:
+        """Download, decode and VAD stage of the streaming pipeline (runs in a thread)"""
+        def put(item: Any) -> bool:
+            # Block while the queue is full, but give up once the consumer is gone
+            while not stop.is_set():
+                try:
+                    segment_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def counted(chunks: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+            for chunk in chunks:
+                AUDIO_SECONDS.inc(len(chunk) / self.config.sample_rate)
+                yield chunk
+        
+        # Download, VAD and waits on a full queue overlap here, so this is the producer's wall time
+        timer = STAGE_SECONDS.labels(stage="stream_vad").time()
+        try:
+            logger.info("Streaming audio and performing voice activity detection...")
+            with timer, self.downloader.open_stream(youtube_url) as pcm_stream:
+                chunks = counted(iter_pcm_chunks(pcm_stream, self.config.vad_stream_chunk_samples))
+                for timestamp, segment in self.vad_service.iter_speech_segments(chunks):
+                    if not put((timestamp, segment)):
+                        return
+            put(_END_OF_STREAM)
+        except Exception as e:
+            put(e)
+    
+    def _next_segment_batch(self, segment_queue: "queue.Queue[Any]") -> tuple:
+        """
+        Collect the next ASR micro-batch from the segment queue
+        
+        Blocks for the first segment, then takes whatever else is already
+        queued while the batch stays within the ASR sample budget.
+        
+        Returns:
+            Tuple of (batch, finished)
+        """
+        batch = []
+        longest = 0
+        item = segment_queue.get()
+        while True:
+            if item is _END_OF_STREAM:
+                return batch, True
+            if isinstance(item, Exception):
+                raise item
+            
+            batch.append(item)
+            longest = max(longest, len(item[1]))
+            if (len(batch) >= self.config.asr_batch_max_size
+                    or (len(batch) + 1) * longest > self.config.asr_batch_max_samples):
+                return batch, False
+            
+            try:
+                item = segment_queue.get_nowait()
+            except queue.Empty:
+                return batch, False
     
     def ask_question(self, question: str) -> str:
         """
@@ -108,22 +691,63 @@ class VideoProcessor:
         """
         if not self.transcript:
             raise YouTubeAssistantError("No video has been processed yet. Please process a video first.")
-        print("self.transcript",self.transcript)
         try:
-            response, self.conversation_history = self.llm_service.chat(
+            response, _ = self.llm_service.chat(
                 prompt=question,
-                context=self.transcript,
-                conversation_history=self.conversation_history
+                context=self._build_context(question),
+                conversation_history=self.memory.messages()
             )
+            # Summarization of older turns happens in the background
+            self.memory.add_turn(question, response)
             return response
             
         except LLMError as e:
             logger.error(f"LLM error: {str(e)}")
             raise YouTubeAssistantError(f"Failed to generate response: {str(e)}")
     
+    def ask_question_stream(self, question: str) -> Iterator[str]:
+        """
+        Ask a question about the processed video and stream the answer
+        
+        Args:
+            question: User's question
+            
+        Yields:
+            Pieces of the assistant's response as they are generated
+            
+        Raises:
+            YouTubeAssistantError: If no transcript is available or LLM fails
+        """
+        if not self.transcript:
+            raise YouTubeAssistantError("No video has been processed yet. Please process a video first.")
+        
+        pieces: List[str] = []
+        try:
+            for piece in self.llm_service.chat_stream(
+                prompt=question,
+                context=self._build_context(question),
+                conversation_history=self.memory.messages()
+            ):
+                pieces.append(piece)
+                yield piece
+            
+        except LLMError as e:
+            logger.error(f"LLM error: {str(e)}")
+            raise YouTubeAssistantError(f"Failed to generate response: {str(e)}")
+        
+        self.memory.add_turn(question, "".join(pieces))
+    
+    def close(self):
+        """Stop background refinement, return leased models and release the LLM resources this processor owns"""
+        self._cancel_refinement(wait=True)
+        self.release_models()
+        self.memory.close()
+        if self._owns_llm_service:
+            self.llm_service.close()
+    
     def reset_conversation(self):
         """Reset the conversation history"""
-        self.conversation_history = []
+        self.memory.reset()
         logger.info("Conversation history reset")
     
     def get_transcript(self) -> str:
@@ -132,7 +756,7 @@ class VideoProcessor:
     
     def get_conversation_history(self) -> List[Dict[str, str]]:
         """Get the current conversation history"""
-        return self.conversation_history.copy()
+        return self.memory.messages()
     
     def is_ready(self) -> bool:
         """Check if a video has been processed and is ready for questions"""
@@ -8,6 +8,7 @@ from typing import Optional
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from src.core.video_processor import VideoProcessor
+from src.core.model_registry import registry
 from src.core.exceptions import YouTubeAssistantError
 from src.utils.logging_utils import setup_logging
 
@@ -91,8 +92,12 @@ class YouTubeAssistantGUI:
                 llm_kwargs = {"api_key": api_key, "model": model_name}
             
             # Initialize processor button
+            # Models are loaded lazily by the process-wide registry and shared
+            # across sessions, so initializing is cheap
             if st.button("Initialize Assistant", type="primary"):
                 try:
+                    if st.session_state.processor is not None:
+                        st.session_state.processor.close()
                     st.session_state.processor = VideoProcessor(
                         llm_service_type=llm_type,
                         llm_kwargs=llm_kwargs
@@ -108,6 +113,18 @@ class YouTubeAssistantGUI:
                 st.session_state.processor.reset_conversation()
                 st.session_state.messages = []
                 st.success("Conversation reset!")
+            
+            self.render_model_status()
+    
+    def render_model_status(self):
+        """Show the models currently loaded in this server process"""
+        loaded = registry.stats()
+        with st.expander(f"Loaded models ({len(loaded)})", expanded=False):
+            if not loaded:
+                st.caption("Models load on first use and unload when idle.")
+            for model in loaded:
+                state = f"{model['refs']} in use" if model["refs"] else f"idle {model['idle_s']:.0f}s"
+                st.caption(f"{model['key'][0]}: {model['key'][1]} — {model['nbytes'] / 2 ** 20:.0f} MiB, {state}")
     
     def render_main_content(self):
         """Render the main content area"""
@@ -183,17 +200,20 @@ class YouTubeAssistantGUI:
             with st.chat_message("user"):
                 st.markdown(prompt)
             
-            # Generate assistant response
+            # Generate assistant response, rendering tokens as they arrive
             with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    try:
-                        response = st.session_state.processor.ask_question(prompt)
-                        st.markdown(response)
-                        st.session_state.messages.append({"role": "assistant", "content": response})
-                    except YouTubeAssistantError as e:
-                        error_msg = f"Error: {str(e)}"
-                        st.error(error_msg)
-                        st.session_state.messages.append({"role": "assistant", "content": error_msg})
+                placeholder = st.empty()
+                response = ""
+                try:
+                    for piece in st.session_state.processor.ask_question_stream(prompt):
+                        response += piece
+                        placeholder.markdown(response + "▌")
+                    placeholder.markdown(response)
+                    st.session_state.messages.append({"role": "assistant", "content": response})
+                except YouTubeAssistantError as e:
+                    error_msg = f"Error: {str(e)}"
+                    placeholder.error(error_msg)
+                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
     
     def run(self):
         """Run the Streamlit application"""
@@ -16,6 +16,20 @@ Usage:
     # Run CLI
     python -m src.main cli <youtube_url>
     
+    # Transcribe a list of URLs and/or playlists (resumable)
+    python -m src.main batch --input urls.txt --output transcripts.jsonl
+    python -m src.main batch <playlist_url> --output transcripts.jsonl
+    
+    # Run the HTTP transcription / Q&A service
+    python -m src.main serve --port 8000 --workers 2
+    
+    # Save the VAD and ASR models so later starts need no network
+    python -m src.main snapshot
+    
+    # Expose Prometheus metrics while running, or write them on exit
+    python -m src.main batch --input urls.txt --metrics-port 9100
+    python -m src.main cli <youtube_url> --non-interactive --metrics-file metrics.prom
+    
     # Run with custom configuration
     LLM_BASE_URL=http://localhost:8080 python -m src.main gui
 """
@@ -23,9 +37,8 @@ Usage:
 import argparse
 import sys
 import logging
-from typing import Optional
+from typing import List, Optional
 
-from src.core.video_processor import VideoProcessor
 from src.core.exceptions import YouTubeAssistantError
 from src.utils.logging_utils import setup_logging
 
@@ -45,7 +58,7 @@ def run_gui():
         sys.exit(1)
 
 
-def run_cli(youtube_url: str, llm_type: str = "local", interactive: bool = True):
+def run_cli(youtube_url: str, llm_type: str = "local", interactive: bool = True, stream: bool = False):
     """
     Run the CLI version of the application
     
@@ -53,7 +66,11 @@ def run_cli(youtube_url: str, llm_type: str = "local", interactive: bool = True)
         youtube_url: YouTube video URL to process
         llm_type: Type of LLM service to use
         interactive: Whether to run in interactive mode
+        stream: Whether to print transcript segments as they are recognized
     """
+    # Deferred so that --help and other modes skip the pipeline imports
+    from src.core.video_processor import VideoProcessor
+    
     logger = logging.getLogger(__name__)
     
     try:
@@ -63,7 +80,22 @@ def run_cli(youtube_url: str, llm_type: str = "local", interactive: bool = True)
         
         # Process video
         print(f"Processing video: {youtube_url}")
-        transcript = processor.process_video(youtube_url)
+        if stream:
+            for segment in processor.process_video_stream(youtube_url):
+                start = segment["start"] / processor.config.sample_rate
+                print(f"[{start:8.2f}s] {segment['text']}")
+            transcript = processor.get_transcript()
+        else:
+            transcript = processor.process_video(youtube_url)
+            status = processor.transcript_status()
+            if status["draft"]:
+                print(f"📝 Draft transcript ready after {status['time_to_draft_s']:.1f}s, refining in the background")
+                if not interactive:
+                    processor.wait_until_final()
+                    transcript = processor.get_transcript()
+                    status = processor.transcript_status()
+                    if status["time_to_final_s"] is not None:
+                        print(f"📝 Final transcript ready after {status['time_to_final_s']:.1f}s")
         
         print(f"\n✅ Video processed successfully!")
         print(f"📝 Transcript length: {len(transcript)} characters")
@@ -85,9 +117,10 @@ def run_cli(youtube_url: str, llm_type: str = "local", interactive: bool = True)
                 if not question:
                     continue
                 
-                print("🤔 Thinking...")
-                response = processor.ask_question(question)
-                print(f"🤖 Assistant: {response}")
+                print("🤖 Assistant: ", end="", flush=True)
+                for piece in processor.ask_question_stream(question):
+                    print(piece, end="", flush=True)
+                print()
                 
             except KeyboardInterrupt:
                 break
@@ -106,6 +139,103 @@ def run_cli(youtube_url: str, llm_type: str = "local", interactive: bool = True)
         sys.exit(1)
 
 
+def run_batch_cli(sources: List[str], output: str, manifest: Optional[str] = None,
+                  download_workers: Optional[int] = None, vad_workers: Optional[int] = None,
+                  asr_jobs: Optional[int] = None):
+    """
+    Run the batch transcription mode
+    
+    Args:
+        sources: Video or playlist URLs
+        output: JSONL file transcripts are appended to
+        manifest: Status manifest path (rerun with the same one to resume)
+        download_workers: Concurrent downloads
+        vad_workers: Concurrent VAD passes
+        asr_jobs: Videos handed to ASR concurrently
+    """
+    from src.core.batch_processor import run_batch
+    
+    logger = logging.getLogger(__name__)
+    
+    try:
+        print(f"Processing {len(sources)} sources into {output}...")
+        summary = run_batch(
+            sources,
+            output,
+            manifest,
+            download_workers=download_workers,
+            vad_workers=vad_workers,
+            asr_jobs=asr_jobs
+        )
+        
+        print(
+            f"\n✅ Batch finished: {summary['done']} done, {summary['failed']} failed, "
+            f"{summary['skipped']} skipped"
+        )
+        print(
+            f"⏱️  {summary['audio_seconds']:.0f}s of audio in {summary['elapsed_s']:.0f}s"
+        )
+        if summary["failed"]:
+            sys.exit(1)
+        
+    except YouTubeAssistantError as e:
+        logger.error(f"Application error: {str(e)}")
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+
+def run_service(host: Optional[str] = None, port: Optional[int] = None, workers: Optional[int] = None,
+                queue_size: Optional[int] = None, llm_type: str = "local"):
+    """
+    Run the HTTP transcription / Q&A service
+    
+    Args:
+        host: Bind address
+        port: Port to listen on
+        workers: Pipeline workers sharing the loaded models
+        queue_size: Jobs that may wait before submissions get 429
+        llm_type: Type of LLM service used for questions
+    """
+    from src.api.http_service import serve
+    
+    try:
+        print("Loading models...")
+        serve(
+            host=host,
+            port=port,
+            num_workers=workers,
+            queue_size=queue_size,
+            llm_service_type=llm_type
+        )
+    except (YouTubeAssistantError, ValueError, OSError) as e:
+        logging.getLogger(__name__).error(f"Service error: {str(e)}")
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+
+def run_snapshot():
+    """Download the configured VAD and ASR models for offline use"""
+    from src.core.config import config
+    from src.services.model_snapshot import create_snapshot
+    
+    try:
+        print(f"Saving model snapshot to {config.model_snapshot_dir}...")
+        paths = create_snapshot()
+        for kind, path in paths.items():
+            print(f"✅ {kind.upper()}: {path}")
+        print("Models now load from the snapshot without network access.")
+    except YouTubeAssistantError as e:
+        logging.getLogger(__name__).error(f"Snapshot error: {str(e)}")
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+
+def read_url_file(path: str) -> List[str]:
+    """Read one URL per line, ignoring blank lines and # comments"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(
@@ -116,14 +246,51 @@ def main():
     
     parser.add_argument(
         "mode",
-        choices=["gui", "cli"],
-        help="Run mode: gui (Streamlit interface) or cli (command line)"
+        choices=["gui", "cli", "batch", "serve", "snapshot"],
+        help=(
+            "Run mode: gui (Streamlit interface), cli (command line), batch (many videos), "
+            "serve (HTTP API) or snapshot (save models for offline use)"
+        )
     )
     
     parser.add_argument(
         "url",
-        nargs="?",
-        help="YouTube URL (required for CLI mode)"
+        nargs="*",
+        help="YouTube URL (required for CLI mode); video or playlist URLs for batch mode"
+    )
+    
+    parser.add_argument(
+        "--input",
+        help="Batch mode: file with one video or playlist URL per line"
+    )
+    
+    parser.add_argument(
+        "--output",
+        default="transcripts.jsonl",
+        help="Batch mode: JSONL file transcripts are appended to (default: transcripts.jsonl)"
+    )
+    
+    parser.add_argument(
+        "--manifest",
+        help="Batch mode: status manifest used to resume (default: <output>.manifest.jsonl)"
+    )
+    
+    parser.add_argument(
+        "--download-workers",
+        type=int,
+        help="Batch mode: concurrent downloads (default: BATCH_DOWNLOAD_WORKERS)"
+    )
+    
+    parser.add_argument(
+        "--vad-workers",
+        type=int,
+        help="Batch mode: concurrent VAD passes (default: BATCH_VAD_WORKERS)"
+    )
+    
+    parser.add_argument(
+        "--asr-jobs",
+        type=int,
+        help="Batch mode: videos handed to ASR concurrently (default: BATCH_ASR_JOBS)"
     )
     
     parser.add_argument(
@@ -139,6 +306,46 @@ def main():
         help="Run CLI in non-interactive mode (just show transcript)"
     )
     
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print transcript segments as soon as they are recognized"
+    )
+    
+    parser.add_argument(
+        "--host",
+        help="Serve mode: bind address (default: SERVICE_HOST)"
+    )
+    
+    parser.add_argument(
+        "--port",
+        type=int,
+        help="Serve mode: port (default: SERVICE_PORT)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Serve mode: pipeline workers sharing the models (default: SERVICE_WORKERS)"
+    )
+    
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        help="Serve mode: queued jobs before new ones get HTTP 429 (default: SERVICE_QUEUE_SIZE)"
+    )
+    
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on this port at /metrics while running (serve mode also has /metrics)"
+    )
+    
+    parser.add_argument(
+        "--metrics-file",
+        help="Write Prometheus metrics to this file on exit (node_exporter textfile format)"
+    )
+    
     parser.add_argument(
         "--log-level",
         choices=["DEBUG", "INFO", "WARNING", "ERROR"],
@@ -157,18 +364,54 @@ def main():
     setup_logging(level=args.log_level, log_file=args.log_file)
     
     # Validate arguments
-    if args.mode == "cli" and not args.url:
-        parser.error("YouTube URL is required for CLI mode")
+    if args.mode == "cli" and len(args.url) != 1:
+        parser.error("Exactly one YouTube URL is required for CLI mode")
+    
+    if args.mode == "batch":
+        sources = list(args.url)
+        if args.input:
+            sources.extend(read_url_file(args.input))
+        if not sources:
+            parser.error("Batch mode needs URLs or --input")
+    
+    if args.metrics_port:
+        from src.utils.metrics import start_metrics_server
+        start_metrics_server(args.metrics_port)
     
     # Run application
-    if args.mode == "gui":
-        run_gui()
-    else:
-        run_cli(
-            youtube_url=args.url,
-            llm_type=args.llm_type,
-            interactive=not args.non_interactive
-        )
+    try:
+        if args.mode == "gui":
+            run_gui()
+        elif args.mode == "snapshot":
+            run_snapshot()
+        elif args.mode == "serve":
+            run_service(
+                host=args.host,
+                port=args.port,
+                workers=args.workers,
+                queue_size=args.queue_size,
+                llm_type=args.llm_type
+            )
+        elif args.mode == "batch":
+            run_batch_cli(
+                sources=sources,
+                output=args.output,
+                manifest=args.manifest,
+                download_workers=args.download_workers,
+                vad_workers=args.vad_workers,
+                asr_jobs=args.asr_jobs
+            )
+        else:
+            run_cli(
+                youtube_url=args.url[0],
+                llm_type=args.llm_type,
+                interactive=not args.non_interactive,
+                stream=args.stream
+            )
+    finally:
+        if args.metrics_file:
+            from src.utils.metrics import metrics
+            metrics.write_textfile(args.metrics_file)
 
 
 if __name__ == "__main__":
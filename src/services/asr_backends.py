@@ -0,0 +1,161 @@
+import logging
+import os
+import re
+from typing import Any, Dict, Optional
+
+import numpy as np
+import torch
+from transformers import Wav2Vec2ForCTC
+
+from src.core.config import Config
+from src.core.exceptions import ASRError
+from src.services.model_snapshot import resolve_asr_source
+
+
+logger = logging.getLogger(__name__)
+
+
+BACKENDS = ("torch", "torch-int8", "onnx")
+
+
+def artifact_dir(settings: Config) -> str:
+    """Directory holding exported/quantized artifacts for the configured ASR model"""
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "--", settings.asr_model)
+    return os.path.join(settings.cache_dir, "models", slug)
+
+
+def _load_pretrained(settings: Config) -> torch.nn.Module:
+    """Load the fp32 Wav2Vec2 model from its snapshot, the local cache or the hub"""
+    model_source, load_kwargs = resolve_asr_source(settings)
+    return Wav2Vec2ForCTC.from_pretrained(model_source, **load_kwargs)
+
+
+class TorchBackend:
+    """fp32 PyTorch inference (moved to GPU when one is available)"""
+    
+    name = "torch"
+    
+    def __init__(self, model: torch.nn.Module, device: str = "cpu"):
+        self.model = model
+        self.device = device
+    
+    @classmethod
+    def load(cls, settings: Config) -> "TorchBackend":
+        model = _load_pretrained(settings)
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        return cls(model.to(device).eval(), device)
+    
+    def __call__(self, input_values: torch.Tensor, attention_mask: Optional[torch.Tensor] = None) -> torch.Tensor:
+        inputs = {"input_values": input_values.to(self.device)}
+        if attention_mask is not None:
+            inputs["attention_mask"] = attention_mask.to(self.device)
+        with torch.no_grad():
+            return self.model(**inputs).logits
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """PyTorch inference with dynamic int8 quantization of the linear layers (CPU only)"""
+    
+    name = "torch-int8"
+    
+    @classmethod
+    def load(cls, settings: Config) -> "QuantizedTorchBackend":
+        path = os.path.join(artifact_dir(settings), "model-int8.pt")
+        if os.path.exists(path):
+            logger.info(f"Loading quantized ASR model from {path}")
+            model = torch.load(path, weights_only=False)
+        else:
+            logger.info("Quantizing ASR model to int8 (one-time step)...")
+            model = torch.quantization.quantize_dynamic(
+                _load_pretrained(settings).eval(),
+                {torch.nn.Linear},
+                dtype=torch.qint8
+            )
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            torch.save(model, path)
+        return cls(model.eval(), "cpu")
+
+
+class OnnxBackend:
+    """ONNX Runtime inference on an exported graph (CPU)"""
+    
+    name = "onnx"
+    
+    def __init__(self, session: Any):
+        self.session = session
+        self.input_names = {graph_input.name for graph_input in session.get_inputs()}
+    
+    @classmethod
+    def load(cls, settings: Config) -> "OnnxBackend":
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ASRError("onnxruntime package not installed. Please install with: pip install onnxruntime")
+        
+        path = os.path.join(artifact_dir(settings), "onnx", "model.onnx")
+        if not os.path.exists(path):
+            export_onnx(settings, path)
+        
+        options = onnxruntime.SessionOptions()
+        if settings.torch_num_threads > 0:
+            options.intra_op_num_threads = settings.torch_num_threads
+        session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        return cls(session)
+    
+    def __call__(self, input_values: torch.Tensor, attention_mask: Optional[torch.Tensor] = None) -> torch.Tensor:
+        feeds: Dict[str, np.ndarray] = {"input_values": input_values.cpu().numpy()}
+        if "attention_mask" in self.input_names:
+            if attention_mask is None:
+                attention_mask = torch.ones(input_values.shape, dtype=torch.int64)
+            feeds["attention_mask"] = attention_mask.cpu().numpy().astype(np.int64)
+        (logits,) = self.session.run(["logits"], feeds)
+        return torch.from_numpy(logits)
+
+
+def export_onnx(settings: Config, path: str) -> None:
+    """
+    Export the configured Wav2Vec2 model to ONNX with dynamic batch/time axes
+    
+    Args:
+        settings: Configuration naming the ASR model
+        path: Output path of the .onnx file (large weights go next to it)
+    """
+    logger.info(f"Exporting ASR model to ONNX at {path} (one-time step)...")
+    model = _load_pretrained(settings).eval()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    
+    dummy_values = torch.zeros(1, settings.sample_rate, dtype=torch.float32)
+    dummy_mask = torch.ones(1, settings.sample_rate, dtype=torch.int64)
+    torch.onnx.export(
+        model,
+        (dummy_values, dummy_mask),
+        path,
+        input_names=["input_values", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_values": {0: "batch", 1: "samples"},
+            "attention_mask": {0: "batch", 1: "samples"},
+            "logits": {0: "batch", 1: "frames"},
+        },
+        opset_version=14
+    )
+
+
+def load_backend(settings: Config):
+    """
+    Load the ASR inference backend named by ``settings.asr_backend``
+    
+    Exported or quantized artifacts are created on first use and cached under
+    ``cache_dir/models``.
+    
+    Raises:
+        ASRError: If the backend name is unknown
+    """
+    backends = {
+        TorchBackend.name: TorchBackend,
+        QuantizedTorchBackend.name: QuantizedTorchBackend,
+        OnnxBackend.name: OnnxBackend,
+    }
+    if settings.asr_backend not in backends:
+        raise ASRError(f"Unsupported ASR backend: {settings.asr_backend} (choose from {', '.join(BACKENDS)})")
+    return backends[settings.asr_backend].load(settings)
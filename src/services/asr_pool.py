@@ -0,0 +1,264 @@
+import dataclasses
+import itertools
+import logging
+import os
+import queue
+import threading
+import weakref
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.config import Config, config
+from src.core.exceptions import ASRError
+from src.services.asr_service import ASRService, plan_batches
+
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_main(settings: Config, num_threads: int, cpu_set: Optional[List[int]],
+                 tasks: Any, results: Any) -> None:
+    """Entry point of an ASR worker process: load the model once, then serve batches"""
+    try:
+        if cpu_set and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpu_set)
+        
+        import torch
+        torch.set_num_threads(num_threads)
+        
+        service = ASRService(settings)
+        results.put(("ready", os.getpid(), None))
+    except Exception as e:
+        results.put(("failed", os.getpid(), str(e)))
+        return
+    
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        
+        job_id, batch_index, segments = task
+        try:
+            results.put((job_id, batch_index, service.transcribe_batch(segments)))
+        except Exception as e:
+            results.put((job_id, batch_index, ASRError(str(e))))
+
+
+def _shutdown(tasks: Any, processes: List[Any]) -> None:
+    for _ in processes:
+        tasks.put(None)
+    for process in processes:
+        process.join(timeout=10)
+        if process.is_alive():
+            process.terminate()
+
+
+class ASRWorkerPool:
+    """
+    Pool of long-lived ASR worker processes
+    
+    Each worker loads the model once and runs with its own intra-op thread
+    count (optionally pinned to its own cores), so a many-core CPU box runs
+    several forward passes side by side instead of one. Exposes the same
+    transcription interface as ``ASRService``.
+    
+    Waits on the workers are bounded and check that every worker is still
+    alive. A worker that dies (crash, OOM kill) fails the calls in flight and
+    every later call with ``ASRError``; the pool has to be recreated.
+    """
+    
+    # Seconds between worker liveness checks while waiting for results
+    poll_interval_s = 1.0
+    
+    combine_transcripts = staticmethod(ASRService.combine_transcripts)
+    
+    def __init__(self, num_workers: Optional[int] = None, threads_per_worker: Optional[int] = None,
+                 settings: Optional[Config] = None):
+        """
+        Start the worker processes and wait until every model is loaded
+        
+        Args:
+            num_workers: Number of worker processes (default: config.asr_workers)
+            threads_per_worker: Intra-op threads per worker (default: cores / workers)
+            settings: Configuration passed to each worker's ASRService
+            
+        Raises:
+            ASRError: If a worker fails to load the model
+        """
+        self.config = settings or config
+        self.num_workers = num_workers or self.config.asr_workers or 1
+        
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+        self.threads_per_worker = (
+            threads_per_worker
+            or self.config.asr_threads_per_worker
+            or max(1, len(cpus) // self.num_workers)
+        )
+        
+        # ASRService applies torch_num_threads itself, so it must match the worker's share
+        worker_settings = dataclasses.replace(self.config, torch_num_threads=self.threads_per_worker)
+        
+        context = get_context("spawn")
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._processes = []
+        self._closing = False
+        self._failure: Optional[str] = None
+        
+        for worker_index in range(self.num_workers):
+            cpu_set = None
+            first_cpu = worker_index * self.threads_per_worker
+            if self.config.asr_pin_workers and first_cpu + self.threads_per_worker <= len(cpus):
+                cpu_set = cpus[first_cpu:first_cpu + self.threads_per_worker]
+            
+            process = context.Process(
+                target=_worker_main,
+                args=(worker_settings, self.threads_per_worker, cpu_set, self._tasks, self._results),
+                name=f"asr-worker-{worker_index}",
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+        
+        self._finalizer = weakref.finalize(self, _shutdown, self._tasks, self._processes)
+        self._wait_ready()
+        
+        self._job_ids = itertools.count()
+        self._pending: Dict[int, "queue.Queue[Tuple[int, Any]]"] = {}
+        self._pending_lock = threading.Lock()
+        self._collector = threading.Thread(target=self._collect, name="asr-pool-collector", daemon=True)
+        self._collector.start()
+        
+        logger.info(
+            f"Started {self.num_workers} ASR workers with {self.threads_per_worker} threads each"
+        )
+    
+    def _dead_worker(self) -> Optional[str]:
+        """Describe a worker process that has exited, or None while all are alive"""
+        for process in self._processes:
+            if not process.is_alive():
+                return f"ASR worker {process.pid} exited unexpectedly (exit code {process.exitcode})"
+        return None
+    
+    def _wait_ready(self) -> None:
+        """Block until all workers report that their model is loaded"""
+        ready = 0
+        while ready < len(self._processes):
+            try:
+                status, pid, error = self._results.get(timeout=self.poll_interval_s)
+            except queue.Empty:
+                error = self._dead_worker()
+                if error is None:
+                    continue
+                self.close()
+                raise ASRError(f"{error} while loading the model")
+            
+            if status != "ready":
+                self.close()
+                raise ASRError(f"ASR worker {pid} failed to initialize: {error}")
+            ready += 1
+    
+    def _collect(self) -> None:
+        """Route worker results to the call that submitted the batch"""
+        while True:
+            try:
+                result = self._results.get(timeout=self.poll_interval_s)
+            except queue.Empty:
+                if self._failure is None and not self._closing:
+                    failure = self._dead_worker()
+                    if failure is not None:
+                        self._fail_pending(failure)
+                continue
+            except (OSError, EOFError, ValueError):
+                break  # Queue closed at interpreter exit
+            if result is None:
+                break
+            
+            job_id, batch_index, payload = result
+            with self._pending_lock:
+                job_queue = self._pending.get(job_id)
+            if job_queue is not None:
+                job_queue.put((batch_index, payload))
+    
+    def _fail_pending(self, failure: str) -> None:
+        """Mark the pool unusable and fail every call waiting on it"""
+        logger.error(f"{failure}; failing pending ASR calls")
+        with self._pending_lock:
+            self._failure = failure
+            job_queues = list(self._pending.values())
+        for job_queue in job_queues:
+            job_queue.put((None, ASRError(failure)))
+    
+    def transcribe_batch(self, speech_segments: List[Tuple[np.ndarray, float]]) -> List[str]:
+        """
+        Transcribe speech segments on the worker processes
+        
+        Segments are grouped under the same sample budget as ``ASRService``,
+        each group is dispatched to whichever worker is free, and results are
+        gathered back into input order.
+        
+        Args:
+            speech_segments: List of (audio_array, duration) tuples
+            
+        Returns:
+            List of transcriptions, in the same order as the input segments
+            
+        Raises:
+            ASRError: If transcription fails
+        """
+        if not speech_segments:
+            return []
+        if self._failure is not None:
+            raise ASRError(f"ASR worker pool is unusable: {self._failure}")
+        
+        batches = plan_batches(
+            [len(segment[0]) for segment in speech_segments],
+            max_samples=self.config.asr_batch_max_samples,
+            max_size=self.config.asr_batch_max_size
+        )
+        
+        job_id = next(self._job_ids)
+        job_queue: "queue.Queue[Tuple[int, Any]]" = queue.Queue()
+        with self._pending_lock:
+            self._pending[job_id] = job_queue
+        
+        try:
+            for batch_index, batch_indices in enumerate(batches):
+                # Memory-mapped views are copied into the task message here
+                segments = [(np.asarray(speech_segments[i][0]), speech_segments[i][1]) for i in batch_indices]
+                self._tasks.put((job_id, batch_index, segments))
+            
+            transcriptions: List[Optional[str]] = [None] * len(speech_segments)
+            for _ in batches:
+                batch_index, payload = self._next_result(job_queue)
+                if isinstance(payload, Exception):
+                    raise ASRError(f"ASR transcription failed: {str(payload)}")
+                for index, text in zip(batches[batch_index], payload):
+                    transcriptions[index] = text
+            
+            return transcriptions
+        finally:
+            with self._pending_lock:
+                del self._pending[job_id]
+    
+    def _next_result(self, job_queue: "queue.Queue[Tuple[int, Any]]") -> Tuple[Any, Any]:
+        """Wait for one batch result, giving up once the pool has failed"""
+        while True:
+            try:
+                return job_queue.get(timeout=self.poll_interval_s)
+            except queue.Empty:
+                if self._failure is not None:
+                    return None, ASRError(self._failure)
+    
+    def transcribe_single(self, audio_array: np.ndarray) -> str:
+        """Transcribe a single audio segment"""
+        return self.transcribe_batch([(audio_array, 0.0)])[0]
+    
+    def close(self) -> None:
+        """Stop the worker processes"""
+        self._closing = True
+        self._finalizer()
+        if getattr(self, "_collector", None) is not None:
+            self._results.put(None)
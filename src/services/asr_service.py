@@ -1,41 +1,128 @@
+import logging
+import time
 import torch
 import numpy as np
-from typing import List, Tuple, Optional
-from multiprocessing import get_context
-from transformers import Wav2Vec2Processor, Wav2Vec2ForCTC
+from typing import List, Dict, Tuple, Optional
+from concurrent.futures import Future
+from transformers import Wav2Vec2Processor
 
-from src.core.config import config
+from src.core.config import Config, config
 from src.core.exceptions import ASRError
+from src.services.asr_backends import load_backend
+from src.services.ctc_decoder import CTCBeamDecoder
+from src.services.model_snapshot import resolve_asr_source
+from src.utils.audio_utils import as_float_audio
+from src.utils.metrics import STAGE_SECONDS
+from src.utils.text_utils import combine_transcripts
+
+
+logger = logging.getLogger(__name__)
+
+
+def plan_batches(lengths: List[int], max_samples: int, max_size: int) -> List[List[int]]:
+    """
+    Group segment indices into length-sorted batches under a padding budget
+    
+    Args:
+        lengths: Length of each segment in samples
+        max_samples: Maximum padded samples (batch size x longest segment) per batch
+        max_size: Maximum number of segments per batch
+        
+    Returns:
+        List of batches, each a list of indices into ``lengths``
+    """
+    # Longest first, so an oversized batch fails early rather than at the end
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    
+    batches: List[List[int]] = []
+    current: List[int] = []
+    
+    for index in order:
+        if current:
+            longest = lengths[current[0]]
+            if len(current) >= max_size or (len(current) + 1) * longest > max_samples:
+                batches.append(current)
+                current = []
+        current.append(index)
+    
+    if current:
+        batches.append(current)
+    
+    return batches
+
+
+def chunk_windows(num_samples: int, chunk_samples: int, stride_left: int,
+                  stride_right: int) -> List[Tuple[int, int, int, int]]:
+    """
+    Split a segment into overlapping fixed-size windows
+    
+    Args:
+        num_samples: Segment length in samples
+        chunk_samples: Window length in samples
+        stride_left: Left context overlap in samples
+        stride_right: Right context overlap in samples
+        
+    Returns:
+        List of (start, end, left_stride, right_stride) tuples. The strides are
+        the number of samples at each edge of the window that belong to a
+        neighbouring window and should be discarded after inference.
+    """
+    step = chunk_samples - stride_left - stride_right
+    if step <= 0:
+        raise ValueError("ASR chunk length must be larger than the sum of its strides")
+    
+    windows = []
+    start = 0
+    while True:
+        end = min(start + chunk_samples, num_samples)
+        left = stride_left if start > 0 else 0
+        right = stride_right if end < num_samples else 0
+        windows.append((start, end, left, right))
+        if end >= num_samples:
+            break
+        start += step
+    
+    return windows
 
 
 class ASRService:
-    def __init__(self):
-        self.config = config
+    def __init__(self, settings: Optional[Config] = None):
+        """
+        Initialize the ASR service
+        
+        Args:
+            settings: Configuration to use instead of the global config
+        """
+        self.config = settings or config
         self.processor = None
         self.model = None
+        self.backend = None
         self.decoder = None
+        self.last_batch_stats: List[Dict[str, float]] = []
         self._initialize_model()
         
     def _initialize_model(self):
         """Initialize the ASR model and processor"""
         try:
             # Load processor and model
-            self.processor = Wav2Vec2Processor.from_pretrained(self.config.asr_model)
-            self.model = Wav2Vec2ForCTC.from_pretrained(self.config.asr_model)
+            model_source, load_kwargs = resolve_asr_source(self.config)
+            self.processor = Wav2Vec2Processor.from_pretrained(model_source, **load_kwargs)
+            
+            # The beam decoder forks its worker pool, so build it before the model
+            if self.config.asr_decoder == "beam":
+                self.decoder = CTCBeamDecoder(self.processor.tokenizer, self.config)
+            
+            if self.config.torch_num_threads > 0:
+                torch.set_num_threads(self.config.torch_num_threads)
+            self.backend = load_backend(self.config)
+            self.model = getattr(self.backend, "model", None)
             
             # Set target language
             # self.processor.tokenizer.set_target_lang(self.config.asr_language)
             # self.model.load_adapter(self.config.asr_language)
             
-            # Move model to GPU if available
-            if torch.cuda.is_available():
-                self.model = self.model.to("cuda")
-            
-            self.model.eval()
-            
-            # Initialize decoder (you'll need to implement or import this)
-            # For now, we'll use basic decoding without beam search
-            
+        except ASRError:
+            raise
         except Exception as e:
             raise ASRError(f"Failed to initialize ASR model: {str(e)}")
     
@@ -43,11 +130,17 @@ class ASRService:
         """
         Transcribe a batch of speech segments
         
+        Segments are sorted by length and grouped into sub-batches whose padded
+        size stays within ``asr_batch_max_samples``, so one long segment does not
+        force every other segment to be padded to its length. Segments longer
+        than ``asr_chunk_length_s`` are transcribed with overlapping windows
+        (see ``_transcribe_strided``).
+        
         Args:
             speech_segments: List of (audio_array, duration) tuples
             
         Returns:
-            List of transcriptions
+            List of transcriptions, in the same order as the input segments
             
         Raises:
             ASRError: If transcription fails
@@ -59,63 +152,202 @@ class ASRService:
             # Extract audio arrays from segments
             speech_batch = [segment[0] for segment in speech_segments]
             
-            # Process inputs
-            inputs = self.processor(
-                speech_batch, 
-                return_tensors="pt", 
-                padding="longest",
-                sampling_rate=self.config.sample_rate
+            chunk_samples = int(self.config.asr_chunk_length_s * self.config.sample_rate)
+            long_indices = [
+                i for i, audio in enumerate(speech_batch)
+                if chunk_samples and len(audio) > chunk_samples
+            ]
+            long_set = set(long_indices)
+            short_indices = [i for i in range(len(speech_batch)) if i not in long_set]
+            
+            transcriptions: List[Optional[str]] = [None] * len(speech_batch)
+            pending: List[Tuple[List[int], Future]] = []
+            self.last_batch_stats = []
+            
+            batches = plan_batches(
+                [len(speech_batch[i]) for i in short_indices],
+                max_samples=self.config.asr_batch_max_samples,
+                max_size=self.config.asr_batch_max_size
             )
             
-            # Move to GPU if available
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            inputs = {k: v.to(device) for k, v in inputs.items()}
-            
-            # Get logits
-            with torch.no_grad():
-                logits = self.model(**inputs).logits
-            
-            # Decode predictions
-            if hasattr(self, 'decoder') and self.decoder:
-                # Use beam search decoder if available
-                logits_cpu = logits.cpu().numpy()
-                with get_context("fork").Pool(processes=self.config.num_processes) as pool:
-                    results = self.decoder.decode_beams_batch(
-                        logits_list=logits_cpu, 
-                        pool=pool, 
-                        beam_width=self.config.beam_width
-                    )
-                transcriptions = [result[0][0] for result in results]
-            else:
-                # Use simple argmax decoding
-                predicted_ids = torch.argmax(logits, dim=-1)
-                transcriptions = self.processor.batch_decode(predicted_ids)
+            for batch_positions in batches:
+                start_time = time.perf_counter()
+                batch_indices = [short_indices[p] for p in batch_positions]
+                batch_audio = [speech_batch[i] for i in batch_indices]
+                
+                # Decoding of this batch overlaps the forward pass of the next
+                logits = self._forward(batch_audio)
+                pending.append((batch_indices, self._submit_decode(
+                    logits, self._frame_lengths(batch_audio, logits.shape[1])
+                )))
+                
+                self.last_batch_stats.append(
+                    self._batch_stats(batch_audio, time.perf_counter() - start_time)
+                )
+            
+            if long_indices:
+                long_transcriptions = self._transcribe_strided(
+                    [speech_batch[i] for i in long_indices]
+                )
+                for index, text in zip(long_indices, long_transcriptions):
+                    transcriptions[index] = text
+            
+            for batch_indices, future in pending:
+                for index, text in zip(batch_indices, future.result()):
+                    transcriptions[index] = text
             
             return transcriptions
             
         except Exception as e:
             raise ASRError(f"ASR transcription failed: {str(e)}")
     
-    def transcribe_single(self, audio_array: np.ndarray) -> str:
+    def _transcribe_strided(self, segments: List[np.ndarray]) -> List[str]:
         """
-        Transcribe a single audio segment
+        Transcribe long segments with overlapping fixed-size windows
+        
+        Each segment is cut into windows of ``asr_chunk_length_s`` that overlap
+        by the configured left/right strides. The windows of all segments are
+        run through the model together, the logits covering the strides are
+        dropped and the rest is concatenated per segment before CTC decoding,
+        so words crossing a window boundary are still decoded from full context.
         
         Args:
-            audio_array: Audio data as numpy array
+            segments: Audio arrays longer than one window
             
         Returns:
-            Transcription text
+            List of transcriptions, one per segment
         """
-        return self.transcribe_batch([(audio_array, 0.0)])[0]
+        sample_rate = self.config.sample_rate
+        windows = []  # (segment index, audio, left stride, right stride)
+        for segment_index, audio in enumerate(segments):
+            for start, end, left, right in chunk_windows(
+                len(audio),
+                chunk_samples=int(self.config.asr_chunk_length_s * sample_rate),
+                stride_left=int(self.config.asr_stride_left_s * sample_rate),
+                stride_right=int(self.config.asr_stride_right_s * sample_rate)
+            ):
+                windows.append((segment_index, audio[start:end], left, right))
+        
+        window_logits: List[Optional[torch.Tensor]] = [None] * len(windows)
+        batches = plan_batches(
+            [len(window[1]) for window in windows],
+            max_samples=self.config.asr_batch_max_samples,
+            max_size=self.config.asr_batch_max_size
+        )
+        
+        for batch_indices in batches:
+            start_time = time.perf_counter()
+            batch_audio = [windows[i][1] for i in batch_indices]
+            logits = self._forward(batch_audio).cpu()
+            
+            # Logit frames per input sample, taken from the padded batch
+            frames_per_sample = logits.shape[1] / max(len(audio) for audio in batch_audio)
+            num_frames = self._frame_lengths(batch_audio, logits.shape[1])
+            
+            for row, index in enumerate(batch_indices):
+                _, audio, left, right = windows[index]
+                first = int(round(left * frames_per_sample))
+                last = num_frames[row] - int(round(right * frames_per_sample))
+                window_logits[index] = logits[row, first:last]
+            
+            self.last_batch_stats.append(
+                self._batch_stats(batch_audio, time.perf_counter() - start_time)
+            )
+        
+        stitched = [
+            torch.cat([
+                window_logits[i] for i, window in enumerate(windows)
+                if window[0] == segment_index
+            ])
+            for segment_index in range(len(segments))
+        ]
+        
+        if self.decoder is not None:
+            return self.decoder.decode_batch(
+                [torch.log_softmax(logits, dim=-1).numpy() for logits in stitched]
+            )
+        with STAGE_SECONDS.labels(stage="decode").time():
+            return [self.processor.decode(torch.argmax(logits, dim=-1)) for logits in stitched]
+    
+    def _forward(self, speech_batch: List[np.ndarray]) -> torch.Tensor:
+        """Run the acoustic model on one padded batch and return its logits"""
+        # Process inputs (int16 views are converted here, one batch at a time)
+        inputs = self.processor(
+            [as_float_audio(audio) for audio in speech_batch], 
+            return_tensors="pt", 
+            padding="longest",
+            sampling_rate=self.config.sample_rate
+        )
+        
+        # Get logits (the backend handles device placement)
+        return self.backend(inputs["input_values"], inputs.get("attention_mask"))
+    
+    @staticmethod
+    def _frame_lengths(batch_audio: List[np.ndarray], num_frames: int) -> List[int]:
+        """Number of unpadded logit frames for each item of a padded batch"""
+        frames_per_sample = num_frames / max(len(audio) for audio in batch_audio)
+        return [int(round(len(audio) * frames_per_sample)) for audio in batch_audio]
     
-    def combine_transcripts(self, transcripts: List[str]) -> str:
+    def _submit_decode(self, logits: torch.Tensor, frame_lengths: List[int]) -> Future:
         """
-        Combine individual transcripts into a single text
+        Decode a batch of logits into text
+        
+        With the beam-search decoder the work is queued on the decoder's
+        background thread; greedy decoding is cheap and done immediately.
+        
+        Returns:
+            Future resolving to the list of transcriptions
+        """
+        if self.decoder is not None:
+            log_probs = torch.log_softmax(logits, dim=-1).cpu().numpy()
+            return self.decoder.submit(
+                [log_probs[row, :length] for row, length in enumerate(frame_lengths)]
+            )
+        
+        # Use simple argmax decoding
+        future: Future = Future()
+        with STAGE_SECONDS.labels(stage="decode").time():
+            predicted_ids = torch.argmax(logits, dim=-1)
+            future.set_result(self.processor.batch_decode(predicted_ids))
+        return future
+    
+    def _batch_stats(self, batch_audio: List[np.ndarray], elapsed: float) -> Dict[str, float]:
+        """Compute padding and throughput figures for one forward batch"""
+        lengths = [len(audio) for audio in batch_audio]
+        padded_samples = max(lengths) * len(lengths)
+        audio_seconds = sum(lengths) / self.config.sample_rate
+        
+        stats = {
+            "batch_size": len(lengths),
+            "padded_samples": padded_samples,
+            "padding_ratio": 1.0 - sum(lengths) / padded_samples if padded_samples else 0.0,
+            "audio_seconds": audio_seconds,
+            "elapsed_seconds": elapsed,
+            "throughput": audio_seconds / elapsed if elapsed > 0 else 0.0,
+        }
+        
+        logger.info(
+            f"ASR batch: {stats['batch_size']} segments, "
+            f"padding {stats['padding_ratio']:.1%}, "
+            f"{stats['throughput']:.1f}x real-time"
+        )
+        return stats
+    
+    def transcribe_single(self, audio_array: np.ndarray) -> str:
+        """
+        Transcribe a single audio segment
         
         Args:
-            transcripts: List of transcript segments
+            audio_array: Audio data as numpy array
             
         Returns:
-            Combined transcript text
+            Transcription text
         """
-        return ". ".join(transcript.strip() for transcript in transcripts if transcript.strip())
\ No newline at end of file
+        return self.transcribe_batch([(audio_array, 0.0)])[0]
+    
+    def close(self):
+        """Release the decoder's background thread and pool"""
+        if self.decoder is not None:
+            self.decoder.close()
+    
+    combine_transcripts = staticmethod(combine_transcripts)
\ No newline at end of file
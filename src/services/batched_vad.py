@@ -0,0 +1,178 @@
+import logging
+import math
+import time
+from typing import Any, Dict, List, Sequence, Union
+
+import numpy as np
+import torch
+
+from src.utils.audio_utils import AudioStore, pcm16_to_float
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Track:
+    """
+    One row of a batched VAD run: windows ``[first, last)`` of an audio source
+    
+    The model is started ``first - run_from`` windows early so that its
+    recurrent state has settled by the first window whose probability is kept.
+    """
+    
+    def __init__(self, audio: Union[AudioStore, np.ndarray], first: int, last: int, run_from: int,
+                 window_size: int):
+        self.audio = audio
+        self.first = first
+        self.last = last
+        self.run_from = run_from
+        self.window_size = window_size
+    
+    @property
+    def num_steps(self) -> int:
+        return self.last - self.run_from
+    
+    def read(self, step: int, num_windows: int) -> np.ndarray:
+        """Float samples of ``num_windows`` windows starting at run step ``step`` (short at the end)"""
+        start = (self.run_from + step) * self.window_size
+        end = min((self.run_from + min(step + num_windows, self.num_steps)) * self.window_size, len(self.audio))
+        if end <= start:
+            return np.zeros(0, dtype=np.float32)
+        samples = self.audio[start:end]
+        if samples.dtype == np.int16:
+            return pcm16_to_float(samples)
+        return np.asarray(samples, dtype=np.float32)
+
+
+class BatchedVAD:
+    """
+    Run the silero model over many audio streams at once
+    
+    ``VADService`` walks one file window by window, so each 32 ms window
+    costs a full Python-to-model round trip. This engine lines up one window
+    from each of up to ``batch_size`` streams and runs them as a single
+    ``(batch, window)`` tensor per step; silero keeps a separate recurrent
+    state for every row.
+    
+    With ``shard_s > 0`` long files are also cut into time shards that run
+    side by side. Each shard starts ``warmup_s`` early and the probabilities
+    of that lead-in are dropped, so silero's state has mostly settled by the
+    shard's first kept window. The probabilities only approximate the
+    sequential pass, though, so a boundary near a shard start can move and
+    sharding is off by default. The per-window probabilities are then
+    stitched back in order and segmented with ``SpeechSegmenter``, exactly as
+    ``VADService.iter_speech_timestamps`` does.
+    """
+    
+    def __init__(self, model: Any, sample_rate: int = 16000, batch_size: int = 16,
+                 shard_s: float = 0.0, warmup_s: float = 5.0, block_windows: int = 32):
+        """
+        Args:
+            model: Silero VAD model (or a stand-in with the same batched call)
+            sample_rate: Sample rate of the audio
+            batch_size: Streams or shards run together per step
+            shard_s: Audio longer than this is split into shards (0 never splits)
+            warmup_s: Audio run before each shard to settle the model state
+            block_windows: Windows read and converted per stream at a time
+        """
+        self.model = model
+        self.sample_rate = sample_rate
+        self.window_size = 512 if sample_rate == 16000 else 256
+        self.batch_size = max(1, batch_size)
+        self.shard_windows = int(shard_s * sample_rate) // self.window_size if shard_s > 0 else 0
+        self.warmup_windows = int(math.ceil(warmup_s * sample_rate / self.window_size))
+        self.block_windows = max(1, block_windows)
+    
+    def detect(self, audios: Sequence[Union[AudioStore, np.ndarray]]) -> List[List[Dict[str, int]]]:
+        """
+        Detect speech in several audio sources together
+        
+        Args:
+            audios: Audio stores or arrays (int16 or float) at ``sample_rate``
+        
+        Returns:
+            Speech timestamps ({"start": int, "end": int}) for each source, in order
+        """
+        # Deferred: vad_service imports this module
+        from src.services.vad_service import SpeechSegmenter
+        
+        start_time = time.perf_counter()
+        tracks: List[List[_Track]] = [self._shard(audio) for audio in audios]
+        probabilities = self.speech_probabilities([track for shards in tracks for track in shards])
+        
+        results = []
+        position = 0
+        for audio, shards in zip(audios, tracks):
+            segmenter = SpeechSegmenter(sample_rate=self.sample_rate)
+            timestamps = []
+            for track_probs in probabilities[position:position + len(shards)]:
+                for prob in track_probs.tolist():
+                    timestamps.extend(segmenter.push(prob))
+            timestamps.extend(segmenter.finish(len(audio)))
+            results.append(timestamps)
+            position += len(shards)
+        
+        audio_seconds = sum(len(audio) for audio in audios) / self.sample_rate
+        elapsed = time.perf_counter() - start_time
+        logger.info(
+            f"Batched VAD: {len(audios)} streams in {position} rows, {audio_seconds:.1f}s of audio "
+            f"in {elapsed:.1f}s ({audio_seconds / elapsed if elapsed > 0 else 0.0:.1f}x real-time)"
+        )
+        return results
+    
+    def speech_probabilities(self, tracks: List[_Track]) -> List[np.ndarray]:
+        """
+        Run the model over tracks in groups of ``batch_size``
+        
+        Tracks are grouped longest first so the rows of a group end at about
+        the same step and little work goes into padding.
+        
+        Returns:
+            Speech probability of every kept window, one array per track
+        """
+        results: List[np.ndarray] = [np.zeros(0, dtype=np.float32)] * len(tracks)
+        order = sorted(range(len(tracks)), key=lambda i: tracks[i].num_steps, reverse=True)
+        for group_start in range(0, len(order), self.batch_size):
+            group = order[group_start:group_start + self.batch_size]
+            probs = self._run_group([tracks[i] for i in group])
+            for row, index in enumerate(group):
+                track = tracks[index]
+                results[index] = probs[row, track.first - track.run_from:track.num_steps]
+        return results
+    
+    def _shard(self, audio: Union[AudioStore, np.ndarray]) -> List[_Track]:
+        """Cut one source into tracks of at most ``shard_windows`` kept windows"""
+        num_windows = int(math.ceil(len(audio) / self.window_size))
+        shard_windows = self.shard_windows or num_windows
+        # Splitting only pays off when each shard outweighs its warm-up
+        if num_windows <= shard_windows or shard_windows <= self.warmup_windows:
+            return [_Track(audio, 0, num_windows, 0, self.window_size)]
+        
+        num_shards = int(math.ceil(num_windows / shard_windows))
+        bounds = [round(i * num_windows / num_shards) for i in range(num_shards + 1)]
+        return [
+            _Track(audio, first, last, max(0, first - self.warmup_windows), self.window_size)
+            for first, last in zip(bounds[:-1], bounds[1:])
+        ]
+    
+    def _run_group(self, group: List[_Track]) -> np.ndarray:
+        """Step the model over a group of tracks with one fresh state per row"""
+        steps = max(track.num_steps for track in group)
+        probs = np.zeros((len(group), steps), dtype=np.float32)
+        self.model.reset_states()
+        
+        with torch.no_grad():
+            for block_start in range(0, steps, self.block_windows):
+                num_windows = min(self.block_windows, steps - block_start)
+                # Rows that ran out are fed silence; their outputs are discarded
+                block = np.zeros((len(group), num_windows * self.window_size), dtype=np.float32)
+                for row, track in enumerate(group):
+                    samples = track.read(block_start, num_windows)
+                    block[row, :len(samples)] = samples
+                
+                windows = torch.from_numpy(block).view(len(group), num_windows, self.window_size)
+                for k in range(num_windows):
+                    output = self.model(windows[:, k].contiguous(), self.sample_rate)
+                    probs[:, block_start + k] = output.reshape(-1).numpy()
+        
+        return probs
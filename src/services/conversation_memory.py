@@ -0,0 +1,212 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from src.core.config import config
+from src.services.llm_service import BaseLLMService
+from src.utils.text_utils import count_tokens, truncate_tokens
+
+
+logger = logging.getLogger(__name__)
+
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a concise running summary of a conversation between a user and an "
+    "assistant about a YouTube video. Merge the new turns into the existing summary. "
+    "Keep facts, names, numbers and open questions; drop pleasantries. "
+    "Reply with the updated summary only."
+)
+
+
+Turn = Tuple[Dict[str, str], Dict[str, str]]
+
+
+class ConversationMemory:
+    """
+    Token-budgeted conversation history with a rolling summary
+    
+    The most recent turns are kept verbatim; older turns are folded into a
+    running summary by the LLM on a background thread after the answer has
+    been returned, so summarization never delays a response. ``messages()``
+    always fits the token budget, even while a summary is still being written.
+    """
+    
+    def __init__(self, llm_service: BaseLLMService, token_budget: Optional[int] = None,
+                 recent_turns: Optional[int] = None, summary_max_tokens: Optional[int] = None):
+        """
+        Args:
+            llm_service: Service used to write summaries
+            token_budget: Maximum tokens of history sent with a question
+            recent_turns: Number of most recent turns kept verbatim
+            summary_max_tokens: Maximum length of the running summary
+        """
+        self.config = config
+        self.llm_service = llm_service
+        self.token_budget = token_budget or self.config.memory_token_budget
+        self.recent_turns = recent_turns or self.config.memory_recent_turns
+        self.summary_max_tokens = summary_max_tokens or self.config.memory_summary_max_tokens
+        
+        self._summary = ""
+        self._turns: List[Turn] = []
+        self._generation = 0  # bumped on reset so stale summaries are discarded
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-summarizer")
+        self._pending: Optional[Future] = None  # the queued or running summary, under _lock
+        self._closed = False
+    
+    def messages(self) -> List[Dict[str, str]]:
+        """
+        History messages to send with the next question
+        
+        Returns:
+            The summary (as a user/assistant exchange, which every chat
+            template accepts) followed by as many recent turns as fit. A
+            newest turn that alone exceeds the budget is shortened to fit.
+        """
+        with self._lock:
+            summary = self._summary
+            turns = list(self._turns)
+        
+        prefix: List[Dict[str, str]] = []
+        if summary:
+            prefix = [
+                {"role": "user", "content": f"Summary of our conversation so far: {summary}"},
+                {"role": "assistant", "content": "Understood."},
+            ]
+        
+        budget = self.token_budget - sum(count_tokens(m["content"]) for m in prefix)
+        kept: List[Turn] = []
+        for turn in reversed(turns):
+            tokens = self._turn_tokens(turn)
+            if tokens > budget:
+                if not kept and budget > 0:
+                    kept.append(self._shorten_turn(turn, budget))
+                break
+            kept.append(turn)
+            budget -= tokens
+        
+        history = list(prefix)
+        for user_message, assistant_message in reversed(kept):
+            history.extend([user_message, assistant_message])
+        return history
+    
+    def add_turn(self, question: str, answer: str) -> None:
+        """Record a completed turn and schedule summarization if needed"""
+        with self._lock:
+            self._turns.append((
+                {"role": "user", "content": question},
+                {"role": "assistant", "content": answer},
+            ))
+        self._schedule_compaction()
+    
+    def reset(self) -> None:
+        """Forget all turns and the summary"""
+        with self._lock:
+            self._summary = ""
+            self._turns = []
+            self._generation += 1
+    
+    def token_count(self) -> int:
+        """Tokens currently held (summary plus all unsummarized turns)"""
+        with self._lock:
+            return count_tokens(self._summary) + sum(self._turn_tokens(turn) for turn in self._turns)
+    
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until in-flight summarization, including follow-up jobs, has finished"""
+        while True:
+            with self._lock:
+                pending = self._pending
+            if pending is None:
+                return
+            pending.result(timeout=timeout)
+    
+    def close(self) -> None:
+        """Stop the summarizer thread (an in-flight summary is discarded)"""
+        with self._lock:
+            self._generation += 1
+            self._closed = True
+            self._executor.shutdown(wait=False)
+    
+    def _turn_tokens(self, turn: Turn) -> int:
+        return sum(count_tokens(message["content"]) for message in turn)
+    
+    @staticmethod
+    def _shorten_turn(turn: Turn, budget: int) -> Turn:
+        """Truncate a turn to ``budget`` tokens, giving the question up to half"""
+        question, answer = turn
+        question_text = truncate_tokens(question["content"], min(count_tokens(question["content"]), budget // 2))
+        answer_text = truncate_tokens(answer["content"], budget - count_tokens(question_text))
+        return {**question, "content": question_text}, {**answer, "content": answer_text}
+    
+    def _schedule_compaction(self) -> None:
+        with self._lock:
+            # A queued or running job re-checks when it finishes
+            if self._pending is None and not self._closed and self._needs_compaction():
+                self._pending = self._executor.submit(self._compact)
+    
+    def _needs_compaction(self) -> bool:
+        """Whether old turns should be folded into the summary (call with ``_lock`` held)"""
+        if len(self._turns) > self.recent_turns:
+            return True
+        tokens = count_tokens(self._summary) + sum(self._turn_tokens(turn) for turn in self._turns)
+        return tokens > self.token_budget and len(self._turns) > 1
+    
+    def _compact(self) -> None:
+        """Run one summarization job and chain another if turns arrived meanwhile"""
+        folded = False
+        try:
+            folded = self._fold_oldest_turns()
+        finally:
+            with self._lock:
+                self._pending = None
+                # A failed summary is retried on the next turn rather than in a loop
+                if folded and not self._closed and self._needs_compaction():
+                    self._pending = self._executor.submit(self._compact)
+    
+    def _fold_oldest_turns(self) -> bool:
+        """
+        Fold the oldest turns into the summary (runs on the background thread)
+        
+        Returns:
+            Whether a new summary replaced the old turns
+        """
+        with self._lock:
+            generation = self._generation
+            summary = self._summary
+            fold = max(len(self._turns) - self.recent_turns, 0)
+            
+            # Fold further if the remaining verbatim turns alone exceed the budget
+            remaining = sum(self._turn_tokens(turn) for turn in self._turns[fold:])
+            while remaining > self.token_budget - self.summary_max_tokens and fold < len(self._turns) - 1:
+                remaining -= self._turn_tokens(self._turns[fold])
+                fold += 1
+            turns = self._turns[:fold]
+        
+        if not turns:
+            return False
+        
+        transcript = "\n".join(
+            f"User: {user['content']}\nAssistant: {assistant['content']}" for user, assistant in turns
+        )
+        try:
+            new_summary = self.llm_service.complete(
+                [
+                    {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                    {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"},
+                ],
+                max_tokens=self.summary_max_tokens,
+                internal=True
+            ).strip()
+        except Exception as e:
+            logger.warning(f"Conversation summarization failed: {str(e)}")
+            return False
+        
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._summary = new_summary
+            del self._turns[:len(turns)]
+        
+        logger.info(f"Folded {len(turns)} conversation turns into the running summary")
+        return True
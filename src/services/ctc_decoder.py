@@ -0,0 +1,126 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import get_context
+from typing import Any, List
+
+import numpy as np
+
+from src.core.config import Config
+from src.core.exceptions import ASRError
+from src.utils.metrics import STAGE_SECONDS
+
+
+logger = logging.getLogger(__name__)
+
+
+def vocabulary_labels(tokenizer: Any) -> List[str]:
+    """
+    Build the CTC label list from a Wav2Vec2 tokenizer
+    
+    Labels are ordered by token id; the word delimiter becomes a space and
+    the pad token (the CTC blank) becomes the empty string, as pyctcdecode
+    expects.
+    
+    Args:
+        tokenizer: Wav2Vec2CTCTokenizer (or compatible)
+        
+    Returns:
+        List of labels indexed by token id
+    """
+    vocab = tokenizer.get_vocab()
+    labels = [""] * len(vocab)
+    for token, index in vocab.items():
+        labels[index] = token
+    
+    delimiter = getattr(tokenizer, "word_delimiter_token", "|")
+    pad = getattr(tokenizer, "pad_token", "<pad>")
+    return [" " if label == delimiter else "" if label == pad else label for label in labels]
+
+
+def _read_unigrams(path: str) -> List[str]:
+    """Read a whitespace-separated word list (one or more words per line)"""
+    with open(path, encoding="utf-8") as f:
+        return sorted({word for line in f for word in line.split()})
+
+
+class CTCBeamDecoder:
+    """
+    CTC beam-search decoder with an optional n-gram language model
+    
+    Wraps pyctcdecode. The multiprocessing pool used for batch decoding is
+    forked once, when the decoder is built, and reused; decoding runs on a
+    background thread so the caller can run the next acoustic forward pass
+    in the meantime. Build the decoder before the acoustic model starts its
+    torch / OpenMP threads: forking a process that runs them can deadlock.
+    """
+    
+    def __init__(self, tokenizer: Any, settings: Config):
+        """
+        Build the decoder from the tokenizer vocabulary
+        
+        Args:
+            tokenizer: Wav2Vec2 tokenizer providing the vocabulary
+            settings: Configuration (beam width, pool size, LM settings)
+            
+        Raises:
+            ASRError: If pyctcdecode (or kenlm, when an LM is set) is missing
+                or the LM cannot be loaded
+        """
+        self.config = settings
+        self._pool = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ctc-decode")
+        
+        try:
+            from pyctcdecode import build_ctcdecoder
+        except ImportError:
+            raise ASRError("pyctcdecode package not installed. Please install with: pip install pyctcdecode")
+        
+        unigrams = _read_unigrams(self.config.lm_unigrams_path) if self.config.lm_unigrams_path else None
+        try:
+            self.decoder = build_ctcdecoder(
+                vocabulary_labels(tokenizer),
+                kenlm_model_path=self.config.lm_path or None,
+                unigrams=unigrams,
+                alpha=self.config.lm_alpha,
+                beta=self.config.lm_beta
+            )
+        except Exception as e:
+            raise ASRError(f"Failed to build CTC beam-search decoder: {str(e)}")
+        
+        if self.config.lm_path:
+            logger.info(f"Loaded n-gram language model from {self.config.lm_path}")
+        
+        # pyctcdecode only parallelizes over fork pools: the workers inherit
+        # the decoder and language model instead of pickling them
+        if self.config.num_processes > 1:
+            self._pool = get_context("fork").Pool(processes=self.config.num_processes)
+    
+    def decode_batch(self, log_probs: List[np.ndarray]) -> List[str]:
+        """
+        Beam-search decode a batch of per-segment log-probability matrices
+        
+        Args:
+            log_probs: List of (frames, vocab) arrays, already trimmed to
+                each segment's true length
+                
+        Returns:
+            List of decoded texts
+        """
+        with STAGE_SECONDS.labels(stage="decode").time():
+            return self.decoder.decode_batch(
+                self._pool,
+                log_probs,
+                beam_width=self.config.beam_width
+            )
+    
+    def submit(self, log_probs: List[np.ndarray]) -> "Future[List[str]]":
+        """Decode a batch on the background decode thread"""
+        return self._executor.submit(self.decode_batch, log_probs)
+    
+    def close(self) -> None:
+        """Shut down the decode thread and pool"""
+        self._executor.shutdown(wait=True)
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
@@ -1,26 +1,35 @@
 import os
 import subprocess
-from typing import Optional
-import yt_dlp
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional, Set, Tuple
 
 from src.core.config import config
-from src.core.exceptions import DownloadError
+from src.core.exceptions import DownloadError, AudioProcessingError
+from src.utils.audio_utils import ffmpeg_pcm_command, pcm_pipe
 
 
 class YouTubeDownloader:
     def __init__(self):
         self.config = config
+        self._job_files: Set[str] = set()
+        self._lock = threading.Lock()
         
     def download(self, url: str, output_dir: Optional[str] = None) -> str:
         """
         Download YouTube video and convert to mono 16kHz audio
         
+        The source is decoded by a single ffmpeg process straight into a WAV
+        file unique to this call, so there is no intermediate download on disk
+        and concurrent downloads never overwrite each other.
+        
         Args:
-            url: YouTube URL
+            url: YouTube URL (or a local media file / direct media URL)
             output_dir: Directory to save files (optional)
             
         Returns:
-            Path to the processed audio file
+            Path to the processed audio file; pass it to ``cleanup`` when done
             
         Raises:
             DownloadError: If download or conversion fails
@@ -28,35 +37,24 @@ class YouTubeDownloader:
         if output_dir is None:
             output_dir = self.config.download_dir
             
+        output_file = None
         try:
-            # Clean up previous audio file
-            if os.path.exists(self.config.temp_audio_file):
-                os.remove(self.config.temp_audio_file)
-            
             # Create output directory if it doesn't exist
             os.makedirs(output_dir, exist_ok=True)
             
-            # Configure yt-dlp options
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': self.config.audio_format,
-                }],
-                'quiet': True,
-                'no_warnings': True
-            }
-
-            # Download audio using yt-dlp
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=True)
-                downloaded_file = ydl.prepare_filename(info).replace('.webm', f'.{self.config.audio_format}')
-                
+            stem, ext = os.path.splitext(os.path.basename(self.config.temp_audio_file))
+            fd, output_file = tempfile.mkstemp(prefix=f"{stem}-", suffix=ext or ".wav", dir=output_dir)
+            os.close(fd)
+            with self._lock:
+                self._job_files.add(output_file)
+            
+            source, input_args = self._resolve_source(url)
+            
             # Convert to specified format and sample rate
-            output_file = self.config.temp_audio_file
             conversion_command = [
-                'ffmpeg', '-i', downloaded_file,
+                'ffmpeg', '-nostdin',
+                *input_args,
+                '-i', source,
                 '-acodec', 'pcm_s16le',
                 '-ac', str(self.config.channels),
                 '-ar', str(self.config.sample_rate),
@@ -66,18 +64,142 @@ class YouTubeDownloader:
             
             subprocess.run(conversion_command, check=True, capture_output=True)
             
-            # Clean up original downloaded file
-            if os.path.exists(downloaded_file):
-                os.remove(downloaded_file)
-            
             return output_file
             
         except subprocess.CalledProcessError as e:
+            self.cleanup(output_file)
             raise DownloadError(f"Audio conversion failed: {e.stderr.decode()}")
         except Exception as e:
+            self.cleanup(output_file)
             raise DownloadError(f"Download failed: {str(e)}")
     
-    def cleanup(self):
-        """Clean up temporary files"""
-        if os.path.exists(self.config.temp_audio_file):
-            os.remove(self.config.temp_audio_file)
\ No newline at end of file
+    @contextmanager
+    def open_stream(self, url: str) -> Iterator[BinaryIO]:
+        """
+        Stream a video's audio as raw PCM without touching the disk
+        
+        The media bytes are fetched and decoded by ffmpeg, and its stdout
+        carries s16le samples at ``config.sample_rate``.
+        
+        Args:
+            url: YouTube URL (or a local media file / direct media URL)
+            
+        Yields:
+            Binary stream of raw PCM bytes
+            
+        Raises:
+            DownloadError: If the source cannot be resolved or decoded
+        """
+        try:
+            source, input_args = self._resolve_source(url)
+        except Exception as e:
+            raise DownloadError(f"Download failed: {str(e)}")
+        
+        command = ffmpeg_pcm_command(
+            source,
+            sample_rate=self.config.sample_rate,
+            channels=self.config.channels,
+            input_args=input_args
+        )
+        try:
+            with pcm_pipe(command) as stream:
+                yield stream
+        except AudioProcessingError as e:
+            raise DownloadError(f"Audio streaming failed: {str(e)}")
+    
+    def expand_playlist(self, url: str) -> List[str]:
+        """
+        List the video URLs of a playlist or channel without downloading
+        
+        Args:
+            url: Playlist, channel or single video URL
+            
+        Returns:
+            Video URLs in playlist order; a single-video URL is returned as-is
+            
+        Raises:
+            DownloadError: If the playlist cannot be read
+        """
+        if os.path.exists(url):
+            return [url]
+        
+        ydl_opts = {
+            'extract_flat': 'in_playlist',
+            'quiet': True,
+            'no_warnings': True
+        }
+        
+        try:
+            import yt_dlp
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=False)
+        except Exception as e:
+            raise DownloadError(f"Failed to expand playlist: {str(e)}")
+        
+        entries = info.get('entries')
+        if entries is None:
+            return [url]
+        
+        urls = []
+        for entry in entries:
+            if not entry:
+                continue
+            video_url = entry.get('url') or entry.get('webpage_url')
+            if entry.get('id') and (not video_url or not video_url.startswith('http')):
+                video_url = f"https://www.youtube.com/watch?v={entry['id']}"
+            if video_url:
+                urls.append(video_url)
+        return urls
+    
+    def _resolve_source(self, url: str) -> Tuple[str, List[str]]:
+        """
+        Resolve a URL to a media location ffmpeg can read directly
+        
+        Returns:
+            Tuple of (media path or URL, extra ffmpeg input arguments)
+        """
+        if os.path.exists(url):
+            return url, []
+        
+        ydl_opts = {
+            'format': 'bestaudio/best',
+            'quiet': True,
+            'no_warnings': True
+        }
+        
+        import yt_dlp  # Deferred: slow to import and only needed for remote URLs
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+        
+        formats = info.get('requested_formats') or [info]
+        media = formats[0]
+        if not media.get('url'):
+            raise DownloadError(f"No downloadable audio stream found for {url}")
+        
+        input_args = []
+        headers = media.get('http_headers') or info.get('http_headers')
+        if headers:
+            input_args = ['-headers', ''.join(f"{key}: {value}\r\n" for key, value in headers.items())]
+        
+        return media['url'], input_args
+    
+    def cleanup(self, audio_file: Optional[str] = None):
+        """
+        Clean up temporary files
+        
+        Args:
+            audio_file: File returned by ``download``; all files created by
+                this downloader are removed when omitted
+        """
+        with self._lock:
+            if audio_file is None:
+                files = list(self._job_files)
+                self._job_files.clear()
+            else:
+                files = [audio_file]
+                self._job_files.discard(audio_file)
+        
+        for path in files:
+            if os.path.exists(path):
+                os.remove(path)
+
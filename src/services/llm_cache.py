@@ -0,0 +1,192 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from src.core.config import config
+from src.services.llm_service import BaseLLMService
+from src.utils.disk_cache import DiskCache
+from src.utils.text_utils import normalize_words
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    return " ".join(normalize_words(question))
+
+
+def _hash(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# Words that change what a question asks no matter how similar the rest is
+NEGATIONS = frozenset(("not", "no", "never", "nor", "none", "nothing", "without", "cannot"))
+QUESTION_WORDS = frozenset(("who", "whom", "whose", "what", "when", "where", "which", "why", "how"))
+
+
+def _guard_words(words: Set[str]) -> Set[str]:
+    """Negations, question words and numbers of a question"""
+    return {
+        word for word in words
+        if word in NEGATIONS or word in QUESTION_WORDS or word.endswith("n't") or any(c.isdigit() for c in word)
+    }
+
+
+def token_similarity(a: str, b: str) -> float:
+    """
+    Jaccard similarity of the word sets of two normalized questions
+    
+    Questions that differ in a negation, a number or a question word
+    ("is it safe" / "is it not safe", "top 5" / "top 10") score 0.
+    """
+    words_a, words_b = set(a.split()), set(b.split())
+    if not words_a or not words_b or _guard_words(words_a) != _guard_words(words_b):
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+class CachedLLMService(BaseLLMService):
+    """
+    Persistent answer cache in front of another LLM service
+    
+    Answers are keyed by the context, the normalized question, the
+    conversation history and the model settings. With a similarity threshold
+    set, a question whose normalized words are close enough to a cached
+    question for the same context and history is also served from the cache.
+    """
+    
+    def __init__(self, service: BaseLLMService, cache_dir: Optional[str] = None,
+                 max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None,
+                 similarity_threshold: Optional[float] = None):
+        self.config = config
+        self.service = service
+        self.similarity_threshold = (
+            similarity_threshold if similarity_threshold is not None else self.config.llm_cache_similarity
+        )
+        self.near_duplicate_hits = 0
+        self._stats_lock = threading.Lock()
+        self.cache = DiskCache(
+            cache_dir=cache_dir or self.config.cache_dir,
+            max_bytes=max_bytes if max_bytes is not None else self.config.llm_cache_max_bytes,
+            name="llm_answers",
+            ttl_seconds=ttl_seconds if ttl_seconds is not None else self.config.llm_cache_ttl_s
+        )
+    
+    @property
+    def last_request_stats(self) -> Dict[str, float]:
+        return self.service.last_request_stats
+    
+    def __getattr__(self, name: str) -> Any:
+        # Expose the wrapped service's settings (model, prefers_stable_context, ...)
+        if name == "service":
+            raise AttributeError(name)
+        return getattr(self.service, name)
+    
+    def complete(self, messages: List[Dict[str, str]], max_tokens: int = 1000, internal: bool = False) -> str:
+        """Uncached passthrough (used e.g. for conversation summaries)"""
+        return self.service.complete(messages, max_tokens=max_tokens, internal=internal)
+    
+    def complete_stream(self, messages: List[Dict[str, str]], max_tokens: int = 1000) -> Iterator[str]:
+        return self.service.complete_stream(messages, max_tokens=max_tokens)
+    
+    def build_messages(self, prompt: str, context: str, conversation_history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        return self.service.build_messages(prompt, context, conversation_history)
+    
+    def chat(self, prompt: str, context: str, conversation_history: List[Dict[str, str]]) -> tuple[str, List[Dict[str, str]]]:
+        """Answer from the cache when possible, otherwise ask the wrapped service and store the answer"""
+        key, tag, question = self._keys(prompt, context, conversation_history)
+        
+        answer = self._lookup(key, tag, question)
+        if answer is None:
+            answer, _ = self.service.chat(prompt, context, conversation_history)
+            self._store(key, tag, question, answer)
+        
+        updated_history = conversation_history.copy()
+        updated_history.append({"role": "user", "content": prompt})
+        updated_history.append({"role": "assistant", "content": answer})
+        return answer, updated_history
+    
+    def chat_stream(self, prompt: str, context: str, conversation_history: List[Dict[str, str]]) -> Iterator[str]:
+        """Stream a cached answer at once, or stream from the wrapped service and store the result"""
+        key, tag, question = self._keys(prompt, context, conversation_history)
+        
+        answer = self._lookup(key, tag, question)
+        if answer is not None:
+            yield answer
+            return
+        
+        pieces = []
+        for piece in self.service.chat_stream(prompt, context, conversation_history):
+            pieces.append(piece)
+            yield piece
+        self._store(key, tag, question, "".join(pieces))
+    
+    def close(self) -> None:
+        """Close the wrapped service and the cache index"""
+        self.service.close()
+        self.cache.close()
+    
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters (including near-duplicate hits) and cache size"""
+        stats = self.cache.stats()
+        stats["near_duplicate_hits"] = self.near_duplicate_hits
+        return stats
+    
+    def _keys(self, prompt: str, context: str, conversation_history: List[Dict[str, str]]) -> Tuple[str, str, str]:
+        """Build (exact key, near-duplicate group tag, normalized question)"""
+        question = normalize_question(prompt)
+        model_params = {
+            "service": type(self.service).__name__,
+            "model": getattr(self.service, "model", None),
+        }
+        tag = _hash({
+            "context": hashlib.sha256(context.encode("utf-8")).hexdigest(),
+            "history": conversation_history,
+            "model": model_params,
+        })
+        return _hash({"group": tag, "question": question}), tag, question
+    
+    def _lookup(self, key: str, tag: str, question: str) -> Optional[str]:
+        # With near-duplicate matching a request counts one hit or miss in total
+        near_duplicates = self.similarity_threshold > 0
+        value = self.cache.get(key, count_miss=not near_duplicates)
+        if value is not None:
+            logger.info("LLM answer cache hit")
+            return json.loads(value)["answer"]
+        
+        if not near_duplicates:
+            return None
+        
+        best_key, best_score = None, 0.0
+        for candidate_key in self.cache.keys_with_tag(tag):
+            candidate = self.cache.peek(candidate_key)
+            if candidate is None:
+                continue
+            score = token_similarity(question, json.loads(candidate)["question"])
+            if score > best_score:
+                best_key, best_score = candidate_key, score
+        
+        if best_key is None or best_score < self.similarity_threshold:
+            self.cache.count_miss()
+            return None
+        
+        # The entry can expire or be evicted between the scan and this read
+        value = self.cache.get(best_key, count_miss=False)
+        if value is None:
+            self.cache.count_miss()
+            return None
+        
+        with self._stats_lock:
+            self.near_duplicate_hits += 1
+        logger.info(f"LLM answer cache near-duplicate hit (similarity {best_score:.2f})")
+        return json.loads(value)["answer"]
+    
+    def _store(self, key: str, tag: str, question: str, answer: str) -> None:
+        try:
+            payload = json.dumps({"question": question, "answer": answer}).encode("utf-8")
+            self.cache.put(key, payload, tag=tag)
+        except Exception as e:
+            logger.warning(f"Failed to cache LLM answer: {str(e)}")
@@ -1,82 +1,228 @@
+import hashlib
+import itertools
+import json
+import logging
+import threading
+import time
 import requests
-from typing import List, Dict, Optional, Any
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+from typing import List, Dict, Iterator, Optional, Any
 from abc import ABC, abstractmethod
 
 from src.core.config import config
 from src.core.exceptions import LLMError
+from src.utils.metrics import LLM_FIRST_TOKEN_SECONDS, LLM_TOKENS, STAGE_SECONDS
+from src.utils.text_utils import count_tokens
+
+
+logger = logging.getLogger(__name__)
 
 
 class BaseLLMService(ABC):
     """Abstract base class for LLM services"""
     
+    def __init__(self):
+        self.last_request_stats: Dict[str, float] = {}
+    
     @abstractmethod
-    def chat(self, prompt: str, context: str, conversation_history: List[Dict[str, str]]) -> tuple[str, List[Dict[str, str]]]:
-        """Generate response given prompt, context, and conversation history"""
+    def complete(self, messages: List[Dict[str, str]], max_tokens: int = 1000, internal: bool = False) -> str:
+        """
+        Generate a completion for a list of chat messages
+        
+        Implementations record the request with ``_record_stats``. Internal
+        requests (e.g. conversation summaries) update the metrics but leave
+        ``last_request_stats`` describing the last answer.
+        """
         pass
-
-
-class LocalLLMService(BaseLLMService):
-    """Service for interacting with local LLM via API"""
     
-    def __init__(self, base_url: Optional[str] = None, model: Optional[str] = None):
-        self.config = config
-        self.base_url = base_url or self.config.llm_base_url or "http://localhost:8080"
-        self.model = model or self.config.llm_model or "local-model"
+    def complete_stream(self, messages: List[Dict[str, str]], max_tokens: int = 1000) -> Iterator[str]:
+        """
+        Generate a completion and yield it in pieces as they are produced
+        
+        Services without a streaming transport yield the whole completion once.
+        """
+        yield self.complete(messages, max_tokens=max_tokens)
+    
+    def chat_stream(self, prompt: str, context: str, conversation_history: List[Dict[str, str]]) -> Iterator[str]:
+        """
+        Stream a response given prompt, context, and conversation history
+        
+        Yields:
+            Response text pieces as they arrive
+            
+        Raises:
+            LLMError: If the request fails
+        """
+        yield from self.complete_stream(self.build_messages(prompt, context, conversation_history))
+    
+    def _stream_with_stats(self, pieces: Iterator[str],
+                           messages: Optional[List[Dict[str, str]]] = None) -> Iterator[str]:
+        """Pass streamed pieces through while timing the first token and the throughput"""
+        start_time = time.perf_counter()
+        first_token_time = None
+        text = []
+        for piece in pieces:
+            if first_token_time is None:
+                first_token_time = time.perf_counter()
+            text.append(piece)
+            yield piece
+        self._record_stats(start_time, first_token_time, "".join(text), messages)
+    
+    def _record_stats(self, start_time: float, first_token_time: Optional[float], text: str,
+                      messages: Optional[List[Dict[str, str]]] = None, internal: bool = False) -> None:
+        """
+        Store time-to-first-token and tokens/sec for the last request and update the metrics
+        
+        Without a ``first_token_time`` (non-streamed requests) the first token
+        arrives with the whole answer; it is then left out of the
+        time-to-first-token histogram.
+        """
+        end_time = time.perf_counter()
+        streamed = first_token_time is not None
+        first_token_time = first_token_time or end_time
+        tokens = count_tokens(text)
+        generation_time = end_time - first_token_time
+        
+        STAGE_SECONDS.labels(stage="llm").observe(end_time - start_time)
+        if streamed:
+            LLM_FIRST_TOKEN_SECONDS.observe(first_token_time - start_time)
+        LLM_TOKENS.labels(kind="completion").inc(tokens)
+        if messages:
+            LLM_TOKENS.labels(kind="prompt").inc(sum(count_tokens(m["content"]) for m in messages))
         
+        stats = {
+            "time_to_first_token": first_token_time - start_time,
+            "total_seconds": end_time - start_time,
+            "completion_tokens": tokens,
+            "tokens_per_second": tokens / generation_time if generation_time > 0 else 0.0,
+        }
+        if not internal:
+            self.last_request_stats = stats
+        logger.info(
+            f"LLM {'internal ' if internal else ''}request: first token after {stats['time_to_first_token']:.2f}s, "
+            f"{tokens} tokens at {stats['tokens_per_second']:.1f} tokens/s"
+        )
+    
     def chat(self, prompt: str, context: str, conversation_history: List[Dict[str, str]]) -> tuple[str, List[Dict[str, str]]]:
         """
-        Generate response using local LLM
+        Generate response given prompt, context, and conversation history
         
         Args:
             prompt: User's question
-            context: Video transcript context
+            context: Video transcript context (the full transcript or retrieved excerpts)
             conversation_history: Previous conversation messages
             
         Returns:
             Tuple of (response, updated_conversation_history)
             
         Raises:
-            LLMError: If API call fails
+            LLMError: If the request fails
         """
-        try:
-            # Build system message with context
-            system_message = f"""You are a helpful assistant that answers questions about a YouTube video based on its transcript.
+        assistant_response = self.complete(self.build_messages(prompt, context, conversation_history))
+        
+        # Update conversation history
+        updated_history = conversation_history.copy()
+        updated_history.append({"role": "user", "content": prompt})
+        updated_history.append({"role": "assistant", "content": assistant_response})
+        
+        return assistant_response, updated_history
+    
+    def close(self) -> None:
+        """Release connections held by the service"""
+        pass
+    
+    def build_messages(self, prompt: str, context: str, conversation_history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Build the chat messages for a question about the video"""
+        # Build system message with context
+        system_message = f"""You are a helpful assistant that answers questions about a YouTube video based on its transcript.
 
 Video transcript:
 {context}
 
 Please answer questions based solely on the information provided in the transcript. If the answer is not in the transcript, say so."""
 
-            # Build messages for the API
-            messages = [{"role": "system", "content": system_message}]
-            messages.extend(conversation_history)
-            messages.append({"role": "user", "content": prompt})
+        messages = [{"role": "system", "content": system_message}]
+        messages.extend(conversation_history)
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+
+def canonical_context(context: str) -> str:
+    """Normalize line endings and trailing whitespace so equal transcripts give identical bytes"""
+    return "\n".join(line.rstrip() for line in context.strip().splitlines())
+
+
+class LocalLLMService(BaseLLMService):
+    """Service for interacting with local LLM via API"""
+    
+    # Servers with a KV cache (llama.cpp) can reuse a stable prompt prefix,
+    # so callers should prefer sending the same context on every turn
+    prefers_stable_context = True
+    _slot_counter = itertools.count()
+    
+    def __init__(self, base_url: Optional[str] = None, model: Optional[str] = None,
+                 prefix_cache: Optional[bool] = None, slot_id: Optional[int] = None):
+        super().__init__()
+        self.config = config
+        self.base_url = base_url or self.config.llm_base_url or "http://localhost:8080"
+        self.model = model or self.config.llm_model or "local-model"
+        self.prefix_cache = self.config.llm_prefix_cache if prefix_cache is None else prefix_cache
+        self.prefers_stable_context = self.prefix_cache
+        self.last_server_timings: Dict[str, float] = {}
+        self._system_messages: Dict[str, str] = {}
+        
+        # Pin every conversation context to one server slot so its KV cache
+        # survives between turns; without a fixed slot, contexts share the
+        # service's slots least-recently-used first
+        self.slot_id = slot_id if slot_id is not None else (
+            self.config.llm_slot_id if self.config.llm_slot_id >= 0 else None
+        )
+        self._first_slot = next(self._slot_counter)
+        self._context_slots: "OrderedDict[str, int]" = OrderedDict()
+        self._slot_lock = threading.Lock()
+        
+        # Reuse keep-alive connections across questions
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.config.llm_pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+    def complete(self, messages: List[Dict[str, str]], max_tokens: int = 1000, internal: bool = False) -> str:
+        """
+        Generate a completion using local LLM
+        
+        Args:
+            messages: Chat messages to send
+            max_tokens: Maximum number of tokens to generate
+            internal: Leave ``last_request_stats`` unchanged and the pinned
+                slot's KV cache untouched (e.g. for summaries)
+            
+        Returns:
+            Assistant's response
+            
+        Raises:
+            LLMError: If API call fails
+        """
+        try:
+            start_time = time.perf_counter()
             
             # Make API call
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/v1/chat/completions",
-                json={
-                    "model": self.model,
-                    "messages": messages,
-                    "temperature": 0.7,
-                    "max_tokens": 1000
-                },
+                json=self._payload(messages, max_tokens, internal=internal),
                 headers={"Content-Type": "application/json"},
                 timeout=30
             )
             
             response.raise_for_status()
             data = response.json()
+            self.last_server_timings = data.get("timings") or {}
             
             # Extract response
-            assistant_response = data["choices"][0]["message"]["content"]
-            
-            # Update conversation history
-            updated_history = conversation_history.copy()
-            updated_history.append({"role": "user", "content": prompt})
-            updated_history.append({"role": "assistant", "content": assistant_response})
-            
-            return assistant_response, updated_history
+            content = data["choices"][0]["message"]["content"]
+            self._record_stats(start_time, None, content, messages, internal=internal)
+            return content
             
         except requests.RequestException as e:
             raise LLMError(f"API request failed: {str(e)}")
@@ -86,10 +232,133 @@ Please answer questions based solely on the information provided in the transcri
             raise LLMError(f"LLM processing failed: {str(e)}")
 
 
+    def complete_stream(self, messages: List[Dict[str, str]], max_tokens: int = 1000) -> Iterator[str]:
+        """
+        Stream a completion from the local LLM via server-sent events
+        
+        Args:
+            messages: Chat messages to send
+            max_tokens: Maximum number of tokens to generate
+            
+        Yields:
+            Content deltas as they arrive
+            
+        Raises:
+            LLMError: If API call fails
+        """
+        yield from self._stream_with_stats(self._stream_deltas(messages, max_tokens), messages)
+    
+    def _stream_deltas(self, messages: List[Dict[str, str]], max_tokens: int) -> Iterator[str]:
+        try:
+            payload = self._payload(messages, max_tokens)
+            payload["stream"] = True
+            
+            with self.session.post(
+                f"{self.base_url}/v1/chat/completions",
+                json=payload,
+                headers={"Content-Type": "application/json", "Accept": "text/event-stream"},
+                timeout=30,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    
+                    event = json.loads(data)
+                    if event.get("timings"):
+                        self.last_server_timings = event["timings"]
+                    choices = event.get("choices") or [{}]
+                    content = (choices[0].get("delta") or {}).get("content")
+                    if content:
+                        yield content
+                        
+        except requests.RequestException as e:
+            raise LLMError(f"API request failed: {str(e)}")
+        except (KeyError, ValueError) as e:
+            raise LLMError(f"Invalid API response format: {str(e)}")
+    
+    def build_messages(self, prompt: str, context: str, conversation_history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Build chat messages with a byte-stable system prefix per video
+        
+        The system message for a given transcript is built once and reused
+        verbatim, so the server sees an identical prompt prefix on every turn
+        and can skip re-processing it.
+        """
+        if not self.prefix_cache:
+            return super().build_messages(prompt, context, conversation_history)
+        
+        context = canonical_context(context)
+        key = hashlib.sha256(context.encode("utf-8")).hexdigest()
+        system_messages = self._system_messages  # replaced, never mutated: safe across threads
+        if key not in system_messages:
+            system_messages = {key: super().build_messages("", context, [])[0]["content"]}
+            self._system_messages = system_messages
+        
+        messages = [{"role": "system", "content": system_messages[key]}]
+        messages.extend(conversation_history)
+        messages.append({"role": "user", "content": prompt})
+        return messages
+    
+    def close(self) -> None:
+        """Close the pooled keep-alive connections"""
+        self.session.close()
+    
+    def slot_for(self, messages: List[Dict[str, str]]) -> int:
+        """
+        Server slot for a conversation, keyed by its system message
+        
+        Each transcript keeps its slot while it stays in use; once every slot
+        is taken, a new transcript takes over the least recently used one.
+        """
+        if self.slot_id is not None:
+            return self.slot_id
+        
+        # The transcript sits in the system message, so equal system messages share a slot
+        prefix = messages[0]["content"] if messages and messages[0]["role"] == "system" else ""
+        num_slots = max(self.config.llm_num_slots, 1)
+        with self._slot_lock:
+            slot = self._context_slots.pop(prefix, None)
+            if slot is None:
+                if len(self._context_slots) < num_slots:
+                    used = set(self._context_slots.values())
+                    slot = next(
+                        candidate for candidate in
+                        ((self._first_slot + offset) % num_slots for offset in range(num_slots))
+                        if candidate not in used
+                    )
+                else:
+                    _, slot = self._context_slots.popitem(last=False)
+            self._context_slots[prefix] = slot
+        return slot
+    
+    def _payload(self, messages: List[Dict[str, str]], max_tokens: int,
+                 internal: bool = False) -> Dict[str, Any]:
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.7,
+            "max_tokens": max_tokens
+        }
+        # Internal requests (summaries) would overwrite a conversation's cached
+        # prefix, so they go to whichever slot the server picks, uncached
+        if self.prefix_cache and not internal:
+            # llama.cpp server extensions; other servers ignore unknown fields
+            payload["cache_prompt"] = True
+            payload["id_slot"] = self.slot_for(messages)
+        return payload
+
+
 class OpenAILLMService(BaseLLMService):
     """Service for interacting with OpenAI API"""
     
     def __init__(self, api_key: Optional[str] = None, model: str = "gpt-3.5-turbo"):
+        super().__init__()
         self.config = config
         self.api_key = api_key or self.config.llm_api_key
         self.model = model
@@ -105,53 +374,57 @@ class OpenAILLMService(BaseLLMService):
         except ImportError:
             raise LLMError("OpenAI package not installed. Please install with: pip install openai")
     
-    def chat(self, prompt: str, context: str, conversation_history: List[Dict[str, str]]) -> tuple[str, List[Dict[str, str]]]:
+    def complete(self, messages: List[Dict[str, str]], max_tokens: int = 1000, internal: bool = False) -> str:
         """
-        Generate response using OpenAI API
+        Generate a completion using OpenAI API
         
         Args:
-            prompt: User's question
-            context: Video transcript context
-            conversation_history: Previous conversation messages
+            messages: Chat messages to send
+            max_tokens: Maximum number of tokens to generate
+            internal: Leave ``last_request_stats`` unchanged (e.g. for summaries)
             
         Returns:
-            Tuple of (response, updated_conversation_history)
+            Assistant's response
         """
         
         try:
-            # Build system message with context
-            system_message = f"""You are a helpful assistant that answers questions about a YouTube video based on its transcript.
-
-Video transcript:
-{context}
-
-Please answer questions based solely on the information provided in the transcript. If the answer is not in the transcript, say so."""
-
-            # Build messages
-            messages = [{"role": "system", "content": system_message}]
-            messages.extend(conversation_history)
-            messages.append({"role": "user", "content": prompt})
+            start_time = time.perf_counter()
             
             # Make API call using new client format
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=0.7,
-                max_tokens=1000
+                max_tokens=max_tokens
             )
             
             # Extract response
-            assistant_response = response.choices[0].message.content
-            
-            # Update conversation history
-            updated_history = conversation_history.copy()
-            updated_history.append({"role": "user", "content": prompt})
-            updated_history.append({"role": "assistant", "content": assistant_response})
-            
-            return assistant_response, updated_history
+            content = response.choices[0].message.content
+            self._record_stats(start_time, None, content, messages, internal=internal)
+            return content
             
         except Exception as e:
             raise LLMError(f"OpenAI API call failed: {str(e)}")
+    
+    def complete_stream(self, messages: List[Dict[str, str]], max_tokens: int = 1000) -> Iterator[str]:
+        """Stream a completion from the OpenAI API"""
+        yield from self._stream_with_stats(self._stream_deltas(messages, max_tokens), messages)
+    
+    def _stream_deltas(self, messages: List[Dict[str, str]], max_tokens: int) -> Iterator[str]:
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                    
+        except Exception as e:
+            raise LLMError(f"OpenAI API call failed: {str(e)}")
 
 
 def create_llm_service(service_type: str = "local", **kwargs) -> BaseLLMService:
@@ -166,8 +439,13 @@ def create_llm_service(service_type: str = "local", **kwargs) -> BaseLLMService:
         LLM service instance
     """
     if service_type.lower() == "local":
-        return LocalLLMService(**kwargs)
+        service = LocalLLMService(**kwargs)
     elif service_type.lower() == "openai":
-        return OpenAILLMService(**kwargs)
+        service = OpenAILLMService(**kwargs)
     else:
-        raise ValueError(f"Unsupported LLM service type: {service_type}")
\ No newline at end of file
+        raise ValueError(f"Unsupported LLM service type: {service_type}")
+    
+    if config.llm_cache_enabled:
+        from src.services.llm_cache import CachedLLMService
+        return CachedLLMService(service)
+    return service
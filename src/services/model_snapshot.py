@@ -0,0 +1,138 @@
+import glob
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from src.core.config import Config, config
+from src.core.exceptions import ASRError, VADError, YouTubeAssistantError
+
+
+logger = logging.getLogger(__name__)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "--", name)
+
+
+def vad_snapshot_path(settings: Config) -> str:
+    """Snapshot directory of the configured silero-vad repository"""
+    return os.path.join(settings.model_snapshot_dir, "vad", _slug(settings.vad_model))
+
+
+def asr_snapshot_path(settings: Config) -> str:
+    """Snapshot directory of the configured ASR model and processor"""
+    return os.path.join(settings.model_snapshot_dir, "asr", _slug(settings.asr_model))
+
+
+def _hub_cache_path(repo: str) -> Optional[str]:
+    """torch.hub's cached checkout of a GitHub repo ("owner/name[:ref]"), if any"""
+    import torch
+    owner, name = repo.split(":", 1)[0].split("/", 1)
+    checkouts = glob.glob(os.path.join(torch.hub.get_dir(), f"{owner}_{name}_*"))
+    return max(checkouts, key=os.path.getmtime) if checkouts else None
+
+
+def resolve_vad_source(settings: Optional[Config] = None) -> Tuple[str, str]:
+    """
+    Decide where ``torch.hub.load`` reads the VAD model from
+    
+    A snapshot directory is used without any network access. Offline mode
+    falls back to torch.hub's own cached checkout; only online mode lets
+    torch.hub contact GitHub.
+    
+    Returns:
+        Tuple of (repo_or_dir, source) for ``torch.hub.load``
+    
+    Raises:
+        VADError: If offline and no local copy exists
+    """
+    settings = settings or config
+    path = vad_snapshot_path(settings)
+    if os.path.isfile(os.path.join(path, "hubconf.py")):
+        return path, "local"
+    if os.path.isfile(os.path.join(settings.vad_model, "hubconf.py")):
+        return settings.vad_model, "local"
+    
+    if settings.model_offline:
+        cached = _hub_cache_path(settings.vad_model)
+        if cached is None:
+            raise VADError(
+                f"No local copy of {settings.vad_model} in offline mode. "
+                f"Create one with: python -m src.main snapshot"
+            )
+        return cached, "local"
+    
+    return settings.vad_model, "github"
+
+
+def resolve_asr_source(settings: Optional[Config] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Decide where ``from_pretrained`` reads the ASR model and processor from
+    
+    Returns:
+        Tuple of (model name or directory, extra ``from_pretrained`` kwargs).
+        Snapshots and offline mode pass ``local_files_only`` so the Hugging
+        Face hub is never contacted.
+    """
+    settings = settings or config
+    path = asr_snapshot_path(settings)
+    if os.path.isfile(os.path.join(path, "config.json")):
+        return path, {"local_files_only": True}
+    if settings.model_offline:
+        return settings.asr_model, {"local_files_only": True}
+    return settings.asr_model, {}
+
+
+def create_snapshot(settings: Optional[Config] = None) -> Dict[str, str]:
+    """
+    Download the configured VAD and ASR models into ``model_snapshot_dir``
+    
+    Later starts load from the snapshot without network access.
+    
+    Returns:
+        Mapping of "vad" / "asr" to the snapshot directories
+    
+    Raises:
+        YouTubeAssistantError: If a model cannot be fetched or saved
+    """
+    import torch
+    from transformers import Wav2Vec2ForCTC, Wav2Vec2Processor
+    
+    settings = settings or config
+    vad_path = vad_snapshot_path(settings)
+    asr_path = asr_snapshot_path(settings)
+    
+    try:
+        logger.info(f"Snapshotting VAD model {settings.vad_model} to {vad_path}")
+        if os.path.isdir(settings.vad_model):
+            source = settings.vad_model
+        else:
+            torch.hub.load(repo_or_dir=settings.vad_model, model="silero_vad", trust_repo=True)
+            source = _hub_cache_path(settings.vad_model)
+            if source is None:
+                raise VADError(f"torch.hub did not leave a checkout of {settings.vad_model}")
+        shutil.copytree(source, vad_path, dirs_exist_ok=True, ignore=shutil.ignore_patterns(".git"))
+    except YouTubeAssistantError:
+        raise
+    except Exception as e:
+        raise VADError(f"Failed to snapshot VAD model: {str(e)}")
+    
+    try:
+        logger.info(f"Snapshotting ASR model {settings.asr_model} to {asr_path}")
+        Wav2Vec2Processor.from_pretrained(settings.asr_model).save_pretrained(asr_path)
+        Wav2Vec2ForCTC.from_pretrained(settings.asr_model).save_pretrained(asr_path)
+    except Exception as e:
+        raise ASRError(f"Failed to snapshot ASR model: {str(e)}")
+    
+    with open(os.path.join(settings.model_snapshot_dir, "snapshot.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "created": time.time(),
+            "vad_model": settings.vad_model,
+            "asr_model": settings.asr_model,
+        }, f, indent=2)
+    
+    return {"vad": vad_path, "asr": asr_path}
@@ -0,0 +1,197 @@
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from src.utils.text_utils import count_tokens, normalize_words
+
+
+logger = logging.getLogger(__name__)
+
+
+# Query words that say nothing about where the answer is
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being between both but by
+can could did do does doing during each few for from further had has have having he her here hers him his how
+i if in into is it its itself just me more most my no nor not of off on once only or other our out over own
+said same say says she should so some such than that the their them then there these they this those through
+to too under until up very was we were what when where which while who whom why will with would you your
+""".split())
+# Words that describe the request rather than what to look for
+REQUEST_WORDS = frozenset((
+    "video", "clip", "summarize", "summarise", "summary", "overview", "explain", "describe", "tell", "talk",
+    "talks", "talked", "discuss", "discussed", "mention", "mentioned", "main", "points",
+))
+
+
+@dataclass
+class TranscriptChunk:
+    """A span of transcript text with its position in the video"""
+    text: str
+    start: float  # seconds
+    end: float  # seconds
+    tokens: int
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format seconds as [h:]mm:ss"""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+def chunk_segments(segments: List[Dict[str, Any]], sample_rate: int, chunk_tokens: int,
+                   overlap_tokens: int) -> List[TranscriptChunk]:
+    """
+    Split timestamped transcript segments into overlapping chunks
+    
+    Args:
+        segments: Dicts with "start"/"end" sample offsets and "text"
+        sample_rate: Sample rate of the offsets
+        chunk_tokens: Target tokens per chunk
+        overlap_tokens: Tokens shared between consecutive chunks
+        
+    Returns:
+        List of chunks in time order
+    """
+    # Flatten into words, each carrying the time span of its segment
+    words: List[Tuple[str, float, float, int]] = []
+    for segment in segments:
+        start = segment["start"] / sample_rate
+        end = segment["end"] / sample_rate
+        for word in segment["text"].split():
+            words.append((word, start, end, count_tokens(word)))
+    
+    chunks = []
+    first = 0
+    while first < len(words):
+        last = first
+        tokens = 0
+        while last < len(words) and (tokens < chunk_tokens or last == first):
+            tokens += words[last][3]
+            last += 1
+        
+        chunks.append(TranscriptChunk(
+            text=" ".join(word[0] for word in words[first:last]),
+            start=words[first][1],
+            end=words[last - 1][2],
+            tokens=tokens
+        ))
+        if last >= len(words):
+            break
+        
+        # Step back far enough to share roughly overlap_tokens with the next chunk
+        next_first = last
+        shared = 0
+        while next_first > first + 1 and shared < overlap_tokens:
+            next_first -= 1
+            shared += words[next_first][3]
+        first = next_first
+    
+    return chunks
+
+
+class TranscriptIndex:
+    """
+    BM25 index over transcript chunks
+    
+    Postings are stored as flat NumPy arrays (term-major, CSR style) so a
+    query is scored with a handful of vectorized operations per query term.
+    Stop words, request words ("summarize", "video") and terms found in
+    more than ``max_df`` of the chunks do not count as matches.
+    """
+    
+    def __init__(self, chunks: List[TranscriptChunk], k1: float = 1.5, b: float = 0.75, max_df: float = 0.5):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.max_df = max_df
+        self.total_tokens = sum(chunk.tokens for chunk in chunks)
+        
+        vocabulary: Dict[str, int] = {}
+        term_ids = []
+        doc_ids = []
+        doc_lengths = np.zeros(len(chunks), dtype=np.float32)
+        for doc_id, chunk in enumerate(chunks):
+            words = normalize_words(chunk.text)
+            doc_lengths[doc_id] = len(words)
+            for word in words:
+                term_ids.append(vocabulary.setdefault(word, len(vocabulary)))
+                doc_ids.append(doc_id)
+        
+        self.vocabulary = vocabulary
+        self.doc_lengths = doc_lengths
+        self.avg_doc_length = float(doc_lengths.mean()) if len(chunks) else 0.0
+        
+        # Collapse (term, doc) occurrences into term frequencies, sorted by term
+        pairs = np.array(term_ids, dtype=np.int64) * max(len(chunks), 1) + np.array(doc_ids, dtype=np.int64)
+        unique_pairs, frequencies = np.unique(pairs, return_counts=True)
+        posting_terms = unique_pairs // max(len(chunks), 1)
+        self.posting_docs = (unique_pairs % max(len(chunks), 1)).astype(np.int64)
+        self.posting_tf = frequencies.astype(np.float32)
+        self.term_offsets = np.searchsorted(posting_terms, np.arange(len(vocabulary) + 1))
+        
+        document_frequency = np.diff(self.term_offsets).astype(np.float32)
+        self.common = document_frequency > max_df * len(chunks)
+        self.idf = np.log(1.0 + (len(chunks) - document_frequency + 0.5) / (document_frequency + 0.5))
+    
+    @classmethod
+    def from_segments(cls, segments: List[Dict[str, Any]], sample_rate: int, chunk_tokens: int,
+                      overlap_tokens: int) -> "TranscriptIndex":
+        """Build an index from timestamped transcript segments"""
+        return cls(chunk_segments(segments, sample_rate, chunk_tokens, overlap_tokens))
+    
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every chunk for a query"""
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths / max(self.avg_doc_length, 1e-6))
+        
+        for word in set(normalize_words(query)) - STOP_WORDS - REQUEST_WORDS:
+            term = self.vocabulary.get(word)
+            if term is None or self.common[term]:
+                continue
+            start, end = self.term_offsets[term], self.term_offsets[term + 1]
+            docs = self.posting_docs[start:end]
+            tf = self.posting_tf[start:end]
+            scores[docs] += self.idf[term] * tf * (self.k1 + 1.0) / (tf + norm[docs])
+        
+        return scores
+    
+    def select(self, query: str, top_k: int, token_budget: int) -> List[TranscriptChunk]:
+        """
+        Pick the most relevant chunks for a query within a token budget
+        
+        When nothing matches (e.g. "summarize this video"), chunks spread
+        evenly over the video are used instead so the answer still covers it.
+        
+        Returns:
+            Selected chunks in time order
+        """
+        if not self.chunks:
+            return []
+        
+        scores = self.scores(query)
+        if scores.max() > 0:
+            candidates = [int(i) for i in np.argsort(-scores, kind="stable") if scores[i] > 0][:top_k]
+        else:
+            step = max(1, len(self.chunks) // max(top_k, 1))
+            candidates = list(range(0, len(self.chunks), step))[:top_k]
+        
+        selected = []
+        used = 0
+        for index in candidates:
+            if used + self.chunks[index].tokens > token_budget:
+                continue
+            selected.append(index)
+            used += self.chunks[index].tokens
+        
+        return [self.chunks[i] for i in sorted(selected)]
+    
+    @staticmethod
+    def format_context(chunks: List[TranscriptChunk]) -> str:
+        """Render chunks as timestamped transcript excerpts"""
+        return "\n\n".join(
+            f"[{format_timestamp(chunk.start)} - {format_timestamp(chunk.end)}] {chunk.text}"
+            for chunk in chunks
+        )
@@ -0,0 +1,166 @@
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from src.core.config import Config, config
+from src.utils.audio_utils import AudioStore, pcm16_to_float
+from src.utils.metrics import SEGMENT_SECONDS
+
+
+logger = logging.getLogger(__name__)
+
+
+# Length buckets (seconds) of the reported distribution
+LENGTH_BUCKETS = (1.0, 2.0, 5.0, 10.0, 20.0, 30.0)
+
+
+def describe_lengths(timestamps: List[Dict[str, int]], sample_rate: int) -> Dict[str, Any]:
+    """
+    Summarize the length distribution of speech segments
+    
+    Returns:
+        Count, total / min / mean / median / p90 / max seconds and a histogram
+        keyed by bucket ("<1s", "1-2s", ..., ">=30s")
+    """
+    lengths = np.array([(ts["end"] - ts["start"]) / sample_rate for ts in timestamps], dtype=np.float64)
+    labels = [f"<{LENGTH_BUCKETS[0]:g}s"] + [
+        f"{low:g}-{high:g}s" for low, high in zip(LENGTH_BUCKETS[:-1], LENGTH_BUCKETS[1:])
+    ] + [f">={LENGTH_BUCKETS[-1]:g}s"]
+    counts = np.bincount(np.searchsorted(LENGTH_BUCKETS, lengths, side="right"), minlength=len(labels))
+    
+    if not len(lengths):
+        return {"count": 0, "total_s": 0.0, "histogram": dict.fromkeys(labels, 0)}
+    return {
+        "count": len(lengths),
+        "total_s": float(lengths.sum()),
+        "min_s": float(lengths.min()),
+        "mean_s": float(lengths.mean()),
+        "median_s": float(np.median(lengths)),
+        "p90_s": float(np.percentile(lengths, 90)),
+        "max_s": float(lengths.max()),
+        "histogram": {label: int(count) for label, count in zip(labels, counts)},
+    }
+
+
+class SegmentShaper:
+    """
+    Reshape VAD speech regions into segments of a length that suits ASR
+    
+    Raw VAD output mixes sub-second fragments, each paying a full model call
+    (or padding a batch), with multi-minute runs that force padding on their
+    batch mates. Adjacent regions are merged while the segment is shorter
+    than ``min_s`` and the silence between them is at most ``merge_gap_s``;
+    regions longer than ``max_s`` are split at the quietest frame that
+    leaves both parts at least ``min_s`` long.
+    
+    Shaped segments keep sample offsets into the original audio (a merged
+    segment also spans the short pauses it absorbed) and list the indices
+    of the VAD regions they came from under "sources".
+    """
+    
+    frame_s = 0.02  # energy frame used to find split points
+    
+    def __init__(self, settings: Optional[Config] = None, min_s: Optional[float] = None,
+                 max_s: Optional[float] = None, merge_gap_s: Optional[float] = None):
+        """
+        Args:
+            settings: Configuration to use instead of the global config
+            min_s: Merge segments shorter than this (default: config.segment_min_s)
+            max_s: Split segments longer than this, 0 never splits (default: config.segment_max_s)
+            merge_gap_s: Longest pause merged over (default: config.segment_merge_gap_s)
+        """
+        self.config = settings or config
+        self.sample_rate = self.config.sample_rate
+        self.min_samples = int((self.config.segment_min_s if min_s is None else min_s) * self.sample_rate)
+        self.max_samples = int((self.config.segment_max_s if max_s is None else max_s) * self.sample_rate)
+        self.merge_gap_samples = int(
+            (self.config.segment_merge_gap_s if merge_gap_s is None else merge_gap_s) * self.sample_rate
+        )
+        self.frame_samples = int(self.frame_s * self.sample_rate)
+        self.last_stats: Dict[str, Any] = {}
+    
+    def shape(self, audio: Union[AudioStore, np.ndarray],
+              timestamps: List[Dict[str, int]]) -> List[Dict[str, Any]]:
+        """
+        Merge short and split long speech regions
+        
+        Args:
+            audio: The audio the timestamps refer to (used to find quiet split points)
+            timestamps: VAD speech timestamps in sample offsets, in time order
+        
+        Returns:
+            Shaped timestamps ({"start", "end", "sources"}) in time order.
+            Their length distribution, before and after, is kept in
+            ``last_stats``.
+        """
+        shaped = []
+        for segment in self._merge(timestamps):
+            shaped.extend(self._split(audio, segment))
+        
+        self.last_stats = {
+            "before": describe_lengths(timestamps, self.sample_rate),
+            "after": describe_lengths(shaped, self.sample_rate),
+        }
+        for segment in shaped:
+            SEGMENT_SECONDS.observe((segment["end"] - segment["start"]) / self.sample_rate)
+        
+        before, after = self.last_stats["before"], self.last_stats["after"]
+        if after["count"]:
+            logger.info(
+                f"Shaped {before['count']} speech regions into {after['count']} segments "
+                f"(median {after['median_s']:.1f}s, p90 {after['p90_s']:.1f}s, max {after['max_s']:.1f}s)"
+            )
+        return shaped
+    
+    def _merge(self, timestamps: List[Dict[str, int]]) -> List[Dict[str, Any]]:
+        """Join neighbours across short pauses while the segment is still short"""
+        merged: List[Dict[str, Any]] = []
+        for index, timestamp in enumerate(timestamps):
+            if merged:
+                current = merged[-1]
+                if (current["end"] - current["start"] < self.min_samples
+                        and timestamp["start"] - current["end"] <= self.merge_gap_samples
+                        and (not self.max_samples or timestamp["end"] - current["start"] <= self.max_samples)):
+                    current["end"] = timestamp["end"]
+                    current["sources"].append(index)
+                    continue
+            merged.append({"start": timestamp["start"], "end": timestamp["end"], "sources": [index]})
+        return merged
+    
+    def _split(self, audio: Union[AudioStore, np.ndarray], segment: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Cut a segment longer than ``max_samples`` at its quietest points"""
+        if not self.max_samples or segment["end"] - segment["start"] <= self.max_samples:
+            return [segment]
+        
+        parts = []
+        start, end = segment["start"], segment["end"]
+        while end - start > self.max_samples:
+            split = self._quietest_point(audio, start, end)
+            parts.append({"start": start, "end": split, "sources": list(segment["sources"])})
+            start = split
+        parts.append({"start": start, "end": end, "sources": list(segment["sources"])})
+        return parts
+    
+    def _quietest_point(self, audio: Union[AudioStore, np.ndarray], start: int, end: int) -> int:
+        """
+        Pick where to end the part starting at ``start``
+        
+        Searches [start + min_s, start + max_s], narrowed so the rest is at
+        least ``min_s`` long when possible, for the frame with the least
+        energy and returns its centre.
+        """
+        low = start + self.min_samples
+        high = min(start + self.max_samples, end - self.min_samples)
+        if high - low < self.frame_samples:
+            low, high = start + self.max_samples // 2, start + self.max_samples
+        
+        region = audio[low:high]
+        region = pcm16_to_float(region) if region.dtype == np.int16 else np.asarray(region, dtype=np.float32)
+        num_frames = len(region) // self.frame_samples
+        if num_frames == 0:
+            return start + self.max_samples
+        
+        frames = region[:num_frames * self.frame_samples].reshape(num_frames, self.frame_samples)
+        energy = np.einsum("ij,ij->i", frames, frames)
+        return low + int(np.argmin(energy)) * self.frame_samples + self.frame_samples // 2
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import logging
+import re
+from typing import Any, Dict, Optional
+
+from src.core.config import config
+from src.utils.disk_cache import DiskCache
+from src.utils.segment_store import SegmentStore
+
+
+logger = logging.getLogger(__name__)
+
+
+# Config fields that change the transcript produced for a given video
+CACHE_KEY_FIELDS = (
+    "sample_rate",
+    "vad_model",
+    "asr_model",
+    "asr_language",
+    "asr_backend",
+    "beam_width",
+    "asr_decoder",
+    "lm_path",
+    "lm_unigrams_path",
+    "lm_alpha",
+    "lm_beta",
+    "asr_chunk_length_s",
+    "asr_stride_left_s",
+    "asr_stride_right_s",
+    "segment_shaping",
+    "segment_min_s",
+    "segment_max_s",
+    "segment_merge_gap_s",
+    "vad_shard_s",
+    "vad_shard_warmup_s",
+)
+
+_VIDEO_ID_PATTERN = re.compile(
+    r"(?:youtube\.com/(?:watch\?(?:.*&)?v=|embed/|shorts/|live/|v/)|youtu\.be/)([A-Za-z0-9_-]{11})"
+)
+_PLAYLIST_PATTERN = re.compile(r"[?&]list=")
+
+
+def extract_video_id(url: str) -> str:
+    """
+    Extract the canonical YouTube video ID from a URL
+    
+    Different URL forms of the same video (watch, youtu.be, shorts, extra
+    query parameters) map to the same ID. Anything else falls back to a hash
+    of the stripped URL.
+    
+    Args:
+        url: YouTube video URL
+        
+    Returns:
+        Video ID string
+    """
+    match = _VIDEO_ID_PATTERN.search(url)
+    if match:
+        return match.group(1)
+    return "url-" + hashlib.sha256(url.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def is_video_url(url: str) -> bool:
+    """
+    Whether a URL names a single YouTube video
+    
+    A video URL that also carries a playlist (``&list=``) is not one, since
+    yt-dlp expands it to the whole playlist.
+    """
+    return bool(_VIDEO_ID_PATTERN.search(url)) and not _PLAYLIST_PATTERN.search(url)
+
+
+def config_fingerprint(cfg: Any) -> str:
+    """Hash the config fields that affect transcription output"""
+    fields = {name: getattr(cfg, name, None) for name in CACHE_KEY_FIELDS}
+    payload = json.dumps(fields, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+class TranscriptCache:
+    """Persistent transcript cache keyed by video ID and model configuration"""
+    
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.config = config
+        self.cache = DiskCache(
+            cache_dir=cache_dir or self.config.cache_dir,
+            max_bytes=max_bytes if max_bytes is not None else self.config.transcript_cache_max_bytes,
+            name="transcripts"
+        )
+    
+    def key_for(self, url: str) -> str:
+        """Build the cache key for a URL under the current configuration"""
+        return f"{extract_video_id(url)}-{config_fingerprint(self.config)}"
+    
+    def get(self, url: str) -> Optional[SegmentStore]:
+        """
+        Look up a processed video
+        
+        Returns:
+            The video's timestamped segments, or None on a miss
+        """
+        value = self.cache.get(self.key_for(url))
+        if value is None:
+            return None
+        
+        logger.info(f"Transcript cache hit for {url}")
+        return SegmentStore.from_bytes(value)
+    
+    def put(self, url: str, segments: SegmentStore) -> None:
+        """
+        Store a processed video
+        
+        Args:
+            url: YouTube video URL
+            segments: The video's timestamped segments
+        """
+        self.cache.put(self.key_for(url), segments.to_bytes())
+    
+    def stats(self) -> Dict[str, float]:
+        """Return cache size and hit/miss counters"""
+        return self.cache.stats()
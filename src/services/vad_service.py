@@ -1,69 +1,308 @@
+import logging
+import time
 import torch
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, BinaryIO, Iterable, Iterator, Optional, Union
 import numpy as np
 
-from src.core.config import config
+from src.core.config import Config, config
 from src.core.exceptions import VADError
+from src.services.batched_vad import BatchedVAD
+from src.services.model_snapshot import resolve_vad_source
+from src.utils.audio_utils import AudioStore, RollingAudioBuffer, iter_pcm_chunks, pcm16_to_float
+
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechSegmenter:
+    """
+    Incremental version of silero's ``get_speech_timestamps`` post-processing
+    
+    Speech probabilities are pushed one window at a time and finished speech
+    timestamps are returned as soon as their padding is known, which is when
+    the next speech region starts, the silence after it has grown to twice
+    the padding, or the stream ends. Given the same probabilities the output
+    matches ``get_speech_timestamps`` exactly.
+    """
+    
+    def __init__(self, sample_rate: int = 16000, threshold: float = 0.5,
+                 min_speech_duration_ms: int = 250, max_speech_duration_s: float = float("inf"),
+                 min_silence_duration_ms: int = 100, speech_pad_ms: int = 30):
+        self.window_size_samples = 512 if sample_rate == 16000 else 256
+        self.threshold = threshold
+        self.neg_threshold = max(threshold - 0.15, 0.01)
+        self.min_speech_samples = sample_rate * min_speech_duration_ms / 1000
+        self.speech_pad_samples = sample_rate * speech_pad_ms / 1000
+        self.max_speech_samples = (
+            sample_rate * max_speech_duration_s - self.window_size_samples - 2 * self.speech_pad_samples
+        )
+        self.min_silence_samples = sample_rate * min_silence_duration_ms / 1000
+        self.min_silence_samples_at_max_speech = sample_rate * 98 / 1000
+        
+        self._window_index = 0
+        self._triggered = False
+        self._current: Dict[str, int] = {}
+        self._temp_end = 0
+        self._prev_end = 0
+        self._next_start = 0
+        self._pending: Optional[Dict[str, int]] = None
+        self._pad_next_start = True  # no earlier speech is held back to share the silence with
+    
+    @property
+    def triggered(self) -> bool:
+        """Whether the segmenter is currently inside a speech region"""
+        return self._triggered
+    
+    def keep_from(self) -> int:
+        """Earliest sample offset that a timestamp not returned yet can cover"""
+        start = self._current.get("start", self.window_size_samples * self._window_index)
+        start = int(max(0, start - self.speech_pad_samples))
+        if self._pending is not None:
+            start = min(start, self._pending["start"])
+        return start
+    
+    def push(self, speech_prob: float) -> List[Dict[str, int]]:
+        """
+        Consume the speech probability of the next window
+        
+        Returns:
+            Speech timestamps finalized by this window (usually empty)
+        """
+        position = self.window_size_samples * self._window_index
+        self._window_index += 1
+        return self._pad(self._step(position, speech_prob)) + self._release_pending(position)
+    
+    def finish(self, num_samples: int) -> List[Dict[str, int]]:
+        """
+        Flush remaining speech at the end of the stream
+        
+        Args:
+            num_samples: Total number of samples in the stream
+            
+        Returns:
+            Remaining speech timestamps
+        """
+        completed = []
+        if self._current and (num_samples - self._current["start"]) > self.min_speech_samples:
+            self._current["end"] = num_samples
+            completed.append(self._current)
+        self._current = {}
+        
+        finished = self._pad(completed)
+        if self._pending is not None:
+            self._pending["end"] = int(min(num_samples, self._pending["end"] + self.speech_pad_samples))
+            finished.append(self._pending)
+            self._pending = None
+        return finished
+    
+    def _step(self, position: int, speech_prob: float) -> List[Dict[str, int]]:
+        """Advance the trigger state machine by one window"""
+        completed = []
+        
+        if speech_prob >= self.threshold and self._temp_end:
+            self._temp_end = 0
+            if self._next_start < self._prev_end:
+                self._next_start = position
+        
+        if speech_prob >= self.threshold and not self._triggered:
+            self._triggered = True
+            self._current["start"] = position
+            return completed
+        
+        if self._triggered and position - self._current["start"] > self.max_speech_samples:
+            if self._prev_end:
+                self._current["end"] = self._prev_end
+                completed.append(self._current)
+                self._current = {}
+                if self._next_start < self._prev_end:
+                    self._triggered = False
+                else:
+                    self._current["start"] = self._next_start
+                self._prev_end = self._next_start = self._temp_end = 0
+            else:
+                self._current["end"] = position
+                completed.append(self._current)
+                self._current = {}
+                self._prev_end = self._next_start = self._temp_end = 0
+                self._triggered = False
+                return completed
+        
+        if speech_prob < self.neg_threshold and self._triggered:
+            if not self._temp_end:
+                self._temp_end = position
+            if position - self._temp_end > self.min_silence_samples_at_max_speech:
+                self._prev_end = self._temp_end
+            if position - self._temp_end < self.min_silence_samples:
+                return completed
+            
+            self._current["end"] = self._temp_end
+            if self._current["end"] - self._current["start"] > self.min_speech_samples:
+                completed.append(self._current)
+            self._current = {}
+            self._prev_end = self._next_start = self._temp_end = 0
+            self._triggered = False
+        
+        return completed
+    
+    def _release_pending(self, position: int) -> List[Dict[str, int]]:
+        """Return the held-back speech once no successor can start close enough to share its padding"""
+        if (self._pending is None or self._triggered
+                or position - self._pending["end"] < 2 * self.speech_pad_samples):
+            return []
+        
+        released, self._pending = self._pending, None
+        released["end"] = int(released["end"] + self.speech_pad_samples)
+        self._pad_next_start = True
+        return [released]
+    
+    def _pad(self, completed: List[Dict[str, int]]) -> List[Dict[str, int]]:
+        """Apply speech padding, holding back the last speech until its successor is known"""
+        finished = []
+        for speech in completed:
+            if self._pad_next_start and self._pending is None:
+                speech["start"] = int(max(0, speech["start"] - self.speech_pad_samples))
+                self._pad_next_start = False
+            
+            if self._pending is not None:
+                silence_duration = speech["start"] - self._pending["end"]
+                if silence_duration < 2 * self.speech_pad_samples:
+                    self._pending["end"] += int(silence_duration // 2)
+                    speech["start"] = int(max(0, speech["start"] - silence_duration // 2))
+                else:
+                    self._pending["end"] = int(self._pending["end"] + self.speech_pad_samples)
+                    speech["start"] = int(max(0, speech["start"] - self.speech_pad_samples))
+                finished.append(self._pending)
+            
+            self._pending = speech
+        return finished
 
 
 class VADService:
-    def __init__(self):
-        self.config = config
-        self.model = None
+    def __init__(self, model: Optional[Any] = None, settings: Optional[Config] = None):
+        """
+        Initialize the VAD service
+        
+        Args:
+            model: Already loaded VAD model to use instead of silero (called as
+                ``model(windows, sample_rate)`` on one window or a batch of
+                them, and reset with ``reset_states()``)
+            settings: Configuration to use instead of the global config
+        """
+        self.config = settings or config
+        self.model = model
         self.utils = None
-        self._initialize_model()
+        if model is None:
+            self._initialize_model()
+        
+        self.batched: Optional[BatchedVAD] = None
+        if self.config.vad_batch_size > 1:
+            self.batched = BatchedVAD(
+                self.model,
+                sample_rate=self.config.sample_rate,
+                batch_size=self.config.vad_batch_size,
+                shard_s=self.config.vad_shard_s,
+                warmup_s=self.config.vad_shard_warmup_s
+            )
         
     def _initialize_model(self):
         """Initialize the VAD model"""
         try:
-            torch.set_num_threads(1)
+            # No torch.set_num_threads here: it is process-wide and would also
+            # cap the ASR forward pass. See Config.torch_num_threads.
+            repo_or_dir, source = resolve_vad_source(self.config)
             self.model, self.utils = torch.hub.load(
-                repo_or_dir=self.config.vad_model, 
-                model="silero_vad"
+                repo_or_dir=repo_or_dir, 
+                model="silero_vad",
+                source=source
             )
+        except VADError:
+            raise
         except Exception as e:
             raise VADError(f"Failed to load VAD model: {str(e)}")
     
-    def process_audio(self, filepath: str) -> Tuple[np.ndarray, List[Dict[str, int]]]:
+    def process_audio(self, filepath: str) -> Tuple[AudioStore, List[Dict[str, int]]]:
         """
         Process audio file to detect speech segments
         
+        The file is memory-mapped rather than loaded, and VAD reads it one
+        chunk at a time, so only a small float window is ever materialized.
+        With ``vad_batch_size`` > 1, long files are split into shards that
+        run through the model together (see ``BatchedVAD``).
+        
         Args:
-            filepath: Path to the audio file
+            filepath: Path to a 16-bit mono WAV file
             
         Returns:
-            Tuple of (audio_array, speech_timestamps)
+            Tuple of (audio_store, speech_timestamps)
             
         Raises:
             VADError: If processing fails
         """
         try:
-            if self.utils is None:
-                raise VADError("VAD model not initialized")
-                
-            get_speech_timestamps, _, read_audio, _, _ = self.utils
+            audio = AudioStore(filepath)
+            if self.batched is not None:
+                return audio, self.batched.detect([audio])[0]
+            
+            speech_timestamps = list(
+                self.iter_speech_timestamps(audio.iter_chunks(self.config.sample_rate))
+            )
+            return audio, speech_timestamps
             
-            # Read audio file
-            wav = read_audio(filepath)
+        except VADError:
+            raise
+        except Exception as e:
+            raise VADError(f"VAD processing failed: {str(e)}")
+    
+    def detect_speech_batch(self, audios: List[Union[AudioStore, np.ndarray]]) -> List[List[Dict[str, int]]]:
+        """
+        Detect speech in several audio sources with one batched model pass
+        
+        Windows of all sources (and shards of long ones) are stacked into one
+        tensor per step, which is several times faster than running the
+        sources one after another. Without batching (``vad_batch_size`` 1)
+        the sources are processed sequentially.
+        
+        Args:
+            audios: Audio stores or 16 kHz audio arrays
+            
+        Returns:
+            Speech timestamps for each source, in the same order
             
-            # Get speech timestamps
-            speech_timestamps = get_speech_timestamps(wav, self.model)
+        Raises:
+            VADError: If processing fails
+        """
+        try:
+            if self.model is None:
+                raise VADError("VAD model not initialized")
+            if self.batched is not None:
+                return self.batched.detect(audios)
             
-            return wav, speech_timestamps
+            return [
+                list(self.iter_speech_timestamps(
+                    audio.iter_chunks(self.config.sample_rate) if isinstance(audio, AudioStore)
+                    else [pcm16_to_float(audio) if audio.dtype == np.int16 else audio]
+                ))
+                for audio in audios
+            ]
             
+        except VADError:
+            raise
         except Exception as e:
             raise VADError(f"VAD processing failed: {str(e)}")
     
-    def extract_speech_segments(self, wav: np.ndarray, timestamps: List[Dict[str, int]]) -> List[Tuple[np.ndarray, float]]:
+    def extract_speech_segments(self, wav: Union[AudioStore, np.ndarray],
+                                timestamps: List[Dict[str, int]]) -> List[Tuple[np.ndarray, float]]:
         """
         Extract speech segments with durations
         
         Args:
-            wav: Audio array
+            wav: Audio store (or in-memory audio array)
             timestamps: List of speech timestamps
             
         Returns:
-            List of (speech_segment, duration) tuples
+            List of (speech_segment, duration) tuples. For an AudioStore the
+            segments are int16 views into the mapped file; ASRService converts
+            them to float one batch at a time.
         """
         speech_segments = []
         
@@ -72,11 +311,160 @@ class VADService:
             end_idx = timestamp["end"]
             
             # Extract segment
-            segment = wav[start_idx:end_idx]
+            if isinstance(wav, AudioStore):
+                segment = wav.segment(start_idx, end_idx)
+            else:
+                segment = np.asarray(wav[start_idx:end_idx])
             
             # Calculate duration in seconds
             duration = (end_idx - start_idx) / self.config.sample_rate
             
-            speech_segments.append((segment.numpy(), duration))
+            speech_segments.append((segment, duration))
+            
+        return speech_segments
+    
+    def iter_speech_timestamps(self, audio_chunks: Iterable[Any]) -> Iterator[Dict[str, int]]:
+        """
+        Detect speech incrementally over a stream of audio chunks
+        
+        Chunks may have any length; they are re-cut into the model's window
+        size and the model state is carried across chunk boundaries. Each
+        timestamp is yielded as soon as it is final, so callers can start
+        working on early speech before the rest of the audio has been read.
+        
+        Args:
+            audio_chunks: Iterable of float audio arrays or tensors
+            
+        Yields:
+            Speech timestamps ({"start": int, "end": int}) in sample offsets
+            
+        Raises:
+            VADError: If processing fails
+        """
+        for kind, payload in self._run_vad(audio_chunks):
+            if kind == "speech":
+                yield payload
+    
+    def stream_speech_events(self, pcm_stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+        """
+        Run VAD over raw 16-bit mono PCM read from a pipe
+        
+        The stream is read in windows of ``vad_stream_chunk_samples``, so
+        memory use depends on the window size and not on the stream length.
+        
+        Args:
+            pcm_stream: Binary stream of s16le samples at ``config.sample_rate``
+            
+        Yields:
+            {"event": "start", "sample": int} when speech is first detected
+            (before padding), then {"event": "end", "start": int, "end": int}
+            with the final padded bounds once the speech region is complete
+            
+        Raises:
+            VADError: If processing fails
+        """
+        start_time = time.perf_counter()
+        num_samples = 0
+        
+        def counted_chunks():
+            nonlocal num_samples
+            for chunk in iter_pcm_chunks(pcm_stream, self.config.vad_stream_chunk_samples):
+                num_samples += len(chunk)
+                yield chunk
+        
+        for kind, payload in self._run_vad(counted_chunks()):
+            if kind == "start":
+                yield {"event": "start", "sample": payload}
+            else:
+                yield {"event": "end", "start": payload["start"], "end": payload["end"]}
+        
+        elapsed = time.perf_counter() - start_time
+        audio_seconds = num_samples / self.config.sample_rate
+        logger.info(
+            f"Streaming VAD processed {audio_seconds:.1f}s of audio in {elapsed:.1f}s "
+            f"({audio_seconds / elapsed if elapsed > 0 else 0.0:.1f}x real-time)"
+        )
+    
+    def _run_vad(self, audio_chunks: Iterable[Any],
+                 segmenter: Optional[SpeechSegmenter] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        Core streaming VAD loop
+        
+        Args:
+            audio_chunks: Iterable of float audio arrays or tensors
+            segmenter: Fresh segmenter to use, for callers that follow its state
+            
+        Yields:
+            ("start", sample) when speech is triggered and ("speech", timestamp)
+            when a speech region is final
+        """
+        try:
+            if self.model is None:
+                raise VADError("VAD model not initialized")
+            
+            if segmenter is None:
+                segmenter = SpeechSegmenter(sample_rate=self.config.sample_rate)
+            window_size = segmenter.window_size_samples
+            self.model.reset_states()
+            
+            def push(window: torch.Tensor, position: int):
+                was_triggered = segmenter.triggered
+                finished = segmenter.push(self.model(window, self.config.sample_rate).item())
+                if segmenter.triggered and not was_triggered:
+                    yield "start", position
+                for timestamp in finished:
+                    yield "speech", timestamp
+            
+            remainder = torch.zeros(0)
+            num_samples = 0
+            position = 0
+            for chunk in audio_chunks:
+                chunk = torch.as_tensor(chunk, dtype=torch.float32)
+                num_samples += len(chunk)
+                remainder = torch.cat([remainder, chunk])
+                
+                num_windows = len(remainder) // window_size
+                for i in range(num_windows):
+                    window = remainder[i * window_size:(i + 1) * window_size]
+                    yield from push(window, position)
+                    position += window_size
+                remainder = remainder[num_windows * window_size:]
             
-        return speech_segments
\ No newline at end of file
+            if len(remainder):
+                window = torch.nn.functional.pad(remainder, (0, window_size - len(remainder)))
+                yield from push(window, position)
+            
+            for timestamp in segmenter.finish(num_samples):
+                yield "speech", timestamp
+            
+        except VADError:
+            raise
+        except Exception as e:
+            raise VADError(f"VAD processing failed: {str(e)}")
+    
+    def iter_speech_segments(self, audio_chunks: Iterable[np.ndarray]) -> Iterator[Tuple[Dict[str, int], np.ndarray]]:
+        """
+        Detect and extract speech incrementally over a stream of audio chunks
+        
+        Audio is dropped as soon as no later segment can cover it, so outside
+        speech only the current chunk and the padding are kept in memory.
+        
+        Args:
+            audio_chunks: Iterable of float audio arrays
+            
+        Yields:
+            (timestamp, speech_segment) tuples
+        """
+        buffer = RollingAudioBuffer()
+        segmenter = SpeechSegmenter(sample_rate=self.config.sample_rate)
+        
+        def buffered_chunks():
+            for chunk in audio_chunks:
+                # Every timestamp up to here has been sliced out already
+                buffer.discard_before(segmenter.keep_from())
+                buffer.append(np.asarray(chunk, dtype=np.float32))
+                yield chunk
+        
+        for kind, timestamp in self._run_vad(buffered_chunks(), segmenter):
+            if kind == "speech":
+                yield timestamp, buffer.slice(timestamp["start"], timestamp["end"])
\ No newline at end of file
@@ -0,0 +1,244 @@
+import struct
+import subprocess
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.exceptions import AudioProcessingError
+
+
+def pcm16_to_float(samples: np.ndarray) -> np.ndarray:
+    """
+    Convert 16-bit PCM samples to float32 in [-1, 1)
+    
+    Args:
+        samples: int16 sample array
+        
+    Returns:
+        float32 sample array
+    """
+    return samples.astype(np.float32) / 32768.0
+
+
+def as_float_audio(samples: np.ndarray) -> np.ndarray:
+    """Return float32 audio, converting int16 PCM views on demand"""
+    if samples.dtype == np.int16:
+        return pcm16_to_float(samples)
+    return samples
+
+
+def find_wav_data(filepath: str) -> Tuple[int, int]:
+    """
+    Locate the PCM payload of a 16-bit mono WAV file
+    
+    Args:
+        filepath: Path to the WAV file
+        
+    Returns:
+        Tuple of (byte offset of the sample data, number of samples)
+        
+    Raises:
+        ValueError: If the file is not a 16-bit mono PCM WAV file
+    """
+    with open(filepath, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"Not a WAV file: {filepath}")
+        
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"No data chunk in WAV file: {filepath}")
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+                audio_format, channels, _, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+                if audio_format != 1 or channels != 1 or bits != 16:
+                    raise ValueError(f"Expected 16-bit mono PCM WAV, got {filepath}")
+            elif chunk_id == b"data":
+                offset = f.tell()
+                # ffmpeg writes 0xFFFFFFFF for unknown sizes when streaming
+                file_size = f.seek(0, 2)
+                data_size = min(chunk_size, file_size - offset)
+                return offset, data_size // 2
+            else:
+                f.seek(chunk_size + (chunk_size & 1), 1)
+
+
+def ffmpeg_pcm_command(source: str, sample_rate: int, channels: int = 1,
+                       input_args: Optional[List[str]] = None) -> List[str]:
+    """
+    Build an ffmpeg command that decodes any input to raw s16le PCM on stdout
+    
+    Args:
+        source: Input path or URL ("pipe:0" to read from stdin)
+        sample_rate: Output sample rate
+        channels: Output channel count
+        input_args: Extra options placed before ``-i`` (e.g. HTTP headers)
+        
+    Returns:
+        ffmpeg argument list
+    """
+    return [
+        'ffmpeg', '-nostdin', '-loglevel', 'error',
+        *(input_args or []),
+        '-i', source,
+        '-f', 's16le',
+        '-acodec', 'pcm_s16le',
+        '-ac', str(channels),
+        '-ar', str(sample_rate),
+        'pipe:1'
+    ]
+
+
+@contextmanager
+def pcm_pipe(command: List[str], stdin: Optional[BinaryIO] = None) -> Iterator[BinaryIO]:
+    """
+    Run a decoder process and expose its stdout as a PCM byte stream
+    
+    Args:
+        command: Decoder command line (see ``ffmpeg_pcm_command``)
+        stdin: Optional stream to connect to the decoder's stdin
+        
+    Yields:
+        Binary stream of raw PCM bytes
+        
+    Raises:
+        AudioProcessingError: If the decoder exits with an error
+    """
+    process = subprocess.Popen(
+        command,
+        stdin=stdin if stdin is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    completed = False
+    try:
+        yield process.stdout
+        completed = True
+    finally:
+        if not completed and process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        returncode = process.wait()
+    
+    if returncode != 0:
+        raise AudioProcessingError(f"Audio decoding failed: {stderr.decode(errors='replace').strip()}")
+
+
+def iter_pcm_chunks(stream: BinaryIO, chunk_samples: int) -> Iterator[np.ndarray]:
+    """
+    Read raw 16-bit mono PCM from a byte stream in fixed-size float chunks
+    
+    Args:
+        stream: Binary stream (e.g. a pipe from ffmpeg)
+        chunk_samples: Number of samples per chunk
+        
+    Yields:
+        float32 chunks of ``chunk_samples``; the last one may be shorter
+    """
+    chunk_bytes = chunk_samples * 2
+    pending = b""
+    while True:
+        data = stream.read(chunk_bytes - len(pending))
+        if not data:
+            break
+        pending += data
+        if len(pending) == chunk_bytes:
+            yield pcm16_to_float(np.frombuffer(pending, dtype="<i2"))
+            pending = b""
+    
+    usable = len(pending) - len(pending) % 2
+    if usable:
+        yield pcm16_to_float(np.frombuffer(pending[:usable], dtype="<i2"))
+
+
+class AudioStore:
+    """
+    Read-only, memory-mapped view of a 16-bit mono WAV file
+    
+    The samples stay in the page cache as int16 and are only converted to
+    float for the window being processed, so memory use does not grow with
+    the length of the video.
+    """
+    
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        offset, num_samples = find_wav_data(filepath)
+        if num_samples:
+            self.samples = np.memmap(filepath, dtype="<i2", mode="r", offset=offset, shape=(num_samples,))
+        else:
+            self.samples = np.zeros(0, dtype=np.int16)
+    
+    def __len__(self) -> int:
+        return len(self.samples)
+    
+    def __getitem__(self, index):
+        return self.samples[index]
+    
+    def segment(self, start: int, end: int) -> np.ndarray:
+        """Return an int16 view of samples [start, end) without copying"""
+        return self.samples[start:end]
+    
+    def iter_chunks(self, chunk_samples: int) -> Iterator[np.ndarray]:
+        """
+        Iterate over the audio as float chunks
+        
+        Yields:
+            float32 copies of consecutive chunks; the last one may be shorter
+        """
+        for start in range(0, len(self.samples), chunk_samples):
+            yield pcm16_to_float(self.samples[start:start + chunk_samples])
+
+
+class RollingAudioBuffer:
+    """Append-only audio buffer addressed by absolute sample offsets"""
+    
+    def __init__(self):
+        self._chunks: list = []
+        self._offset = 0  # absolute offset of the first buffered sample
+        self._length = 0
+    
+    @property
+    def end(self) -> int:
+        """Absolute offset one past the last buffered sample"""
+        return self._offset + self._length
+    
+    def append(self, chunk: np.ndarray) -> None:
+        """Append a chunk of samples"""
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+    
+    def slice(self, start: int, end: int) -> np.ndarray:
+        """
+        Copy out samples [start, end) in absolute offsets
+        
+        Raises:
+            ValueError: If the range was already discarded
+        """
+        if start < self._offset:
+            raise ValueError(f"Samples before {self._offset} have been discarded")
+        
+        if len(self._chunks) > 1:
+            self._chunks = [np.concatenate(self._chunks)]
+        buffered = self._chunks[0] if self._chunks else np.zeros(0, dtype=np.float32)
+        return buffered[start - self._offset:end - self._offset].copy()
+    
+    def discard_before(self, offset: int) -> None:
+        """Drop buffered samples before an absolute offset"""
+        drop = min(max(0, offset - self._offset), self._length)
+        self._offset += drop
+        self._length -= drop
+        while drop:
+            first = self._chunks[0]
+            if len(first) <= drop:
+                self._chunks.pop(0)
+                drop -= len(first)
+            else:
+                # Copy so the dropped part of the chunk can be freed
+                self._chunks[0] = first[drop:].copy()
+                drop = 0
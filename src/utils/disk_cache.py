@@ -0,0 +1,176 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class DiskCache:
+    """
+    Size-bounded key/value store backed by SQLite and blob files
+    
+    The SQLite database only holds the index (key, size, access times); values
+    are written as individual files so large payloads never pass through the
+    database. Entries are evicted least-recently-used first once the total
+    size exceeds ``max_bytes``, and expire after ``ttl_seconds`` when set.
+    Entries can carry a tag so related keys can be listed together.
+    """
+    
+    def __init__(self, cache_dir: str, max_bytes: int, name: str = "cache",
+                 ttl_seconds: Optional[float] = None):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, "blobs", name)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._db = sqlite3.connect(
+            os.path.join(cache_dir, f"{name}.sqlite3"),
+            check_same_thread=False,
+            isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL,
+                tag TEXT
+            )"""
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(entries)")}
+        if "tag" not in columns:
+            self._db.execute("ALTER TABLE entries ADD COLUMN tag TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_tag ON entries (tag)")
+    
+    def get(self, key: str, count_miss: bool = True) -> Optional[bytes]:
+        """
+        Look up a value and mark it as recently used
+        
+        Args:
+            key: Entry key
+            count_miss: Whether a miss is counted; callers with a fallback
+                lookup pass False and count the outcome themselves
+        
+        Returns:
+            The stored bytes, or None on a miss
+        """
+        with self._lock:
+            row = self._db.execute("SELECT created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += count_miss
+                return None
+            
+            if self._expired(row[0]):
+                self._remove(key)
+                self.misses += count_miss
+                return None
+            
+            try:
+                with open(self._blob_path(key), "rb") as f:
+                    value = f.read()
+            except OSError:
+                # Blob removed behind our back; drop the stale index entry
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += count_miss
+                return None
+            
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return value
+    
+    def put(self, key: str, value: bytes, tag: Optional[str] = None) -> None:
+        """Store a value, evicting old entries if the cache grows past its budget"""
+        with self._lock:
+            path = self._blob_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            
+            # Write atomically so a concurrent reader never sees a partial blob
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+            
+            now = time.time()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, size, created, last_access, tag) VALUES (?, ?, ?, ?, ?)",
+                (key, len(value), now, now, tag)
+            )
+            self._evict()
+    
+    def count_miss(self) -> None:
+        """Count a miss for a lookup that did not go through ``get``"""
+        with self._lock:
+            self.misses += 1
+    
+    def keys_with_tag(self, tag: str) -> List[str]:
+        """List the unexpired keys stored with a tag"""
+        with self._lock:
+            rows = self._db.execute("SELECT key, created FROM entries WHERE tag = ?", (tag,)).fetchall()
+        return [key for key, created in rows if not self._expired(created)]
+    
+    def peek(self, key: str) -> Optional[bytes]:
+        """Read a value without touching counters or recency"""
+        try:
+            with open(self._blob_path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def delete(self, key: str) -> None:
+        """Remove an entry if present"""
+        with self._lock:
+            self._remove(key)
+    
+    def stats(self) -> Dict[str, float]:
+        """Return entry count, total size and hit/miss counters"""
+        with self._lock:
+            entries, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+    
+    def close(self) -> None:
+        """Close the index database"""
+        with self._lock:
+            self._db.close()
+    
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created > self.ttl_seconds
+    
+    def _blob_path(self, key: str) -> str:
+        return os.path.join(self.blob_dir, key[:2], key)
+    
+    def _remove(self, key: str) -> None:
+        self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        try:
+            os.remove(self._blob_path(key))
+        except OSError:
+            pass
+    
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until the total size fits the budget"""
+        (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+        
+        for key, size in self._db.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            self.evictions += 1
@@ -0,0 +1,360 @@
+import bisect
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Seconds, from a few milliseconds (LLM first token, decode) to ten minutes (long downloads)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 2 ** 53:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _CounterValue:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self._value += amount
+    
+    def samples(self) -> Iterator[Tuple[str, Tuple, float]]:
+        yield "", (), self._value
+
+
+class _GaugeValue:
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+    
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._function = None
+            self._value = float(value)
+    
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+    
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+    
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from ``function`` at scrape time instead of storing it"""
+        with self._lock:
+            self._function = function
+    
+    def samples(self) -> Iterator[Tuple[str, Tuple, float]]:
+        function = self._function
+        if function is None:
+            yield "", (), self._value
+            return
+        try:
+            yield "", (), float(function())
+        except Exception:
+            yield "", (), math.nan
+
+
+class _Timer:
+    """Context manager observing its elapsed time into a histogram"""
+    
+    __slots__ = ("_histogram", "_start")
+    
+    def __init__(self, histogram: "_HistogramValue"):
+        self._histogram = histogram
+    
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._start)
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Sequence[float]):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+    
+    def time(self) -> _Timer:
+        return _Timer(self)
+    
+    def samples(self) -> Iterator[Tuple[str, Tuple, float]]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = 0
+        for bound, count in zip(list(self._buckets) + [math.inf], counts):
+            cumulative += count
+            yield "_bucket", (("le", _format_value(bound)),), cumulative
+        yield "_sum", (), total
+        yield "_count", (), cumulative
+
+
+class _Metric(ABC):
+    """A named metric family with optional labels; children hold the values"""
+    
+    type_name = ""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+    
+    def labels(self, *values: str, **labels: str):
+        """The child for one combination of label values"""
+        if labels:
+            values = tuple(labels[name] for name in self.labelnames)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+    
+    @property
+    def family_name(self) -> str:
+        """Name used in the HELP and TYPE lines"""
+        return self.name
+    
+    def samples(self) -> Iterator[Sample]:
+        for key, child in list(self._children.items()):
+            labels = tuple(zip(self.labelnames, key))
+            for suffix, extra, value in child.samples():
+                yield self.family_name + suffix, labels + extra, value
+    
+    @abstractmethod
+    def _new_child(self):
+        """A value holder for one combination of label values"""
+        pass
+    
+    def _unlabelled(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels; use .labels(...)")
+        return self._children[()]
+
+
+class Counter(_Metric):
+    """Monotonically increasing total; exposed as ``<name>_total``"""
+    
+    type_name = "counter"
+    
+    @property
+    def family_name(self) -> str:
+        return f"{self.name}_total"
+    
+    def _new_child(self) -> _CounterValue:
+        return _CounterValue()
+    
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a function at scrape time"""
+    
+    type_name = "gauge"
+    
+    def _new_child(self) -> _GaugeValue:
+        return _GaugeValue()
+    
+    def set(self, value: float) -> None:
+        self._unlabelled().set(value)
+    
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+    
+    def dec(self, amount: float = 1.0) -> None:
+        self._unlabelled().dec(amount)
+    
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._unlabelled().set_function(function)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    
+    type_name = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+    
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+    
+    def observe(self, value: float) -> None:
+        self._unlabelled().observe(value)
+    
+    def time(self) -> _Timer:
+        return self._unlabelled().time()
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together in the Prometheus text format
+    
+    Updates take one uncontended lock and no allocation beyond the first use
+    of a label combination, so instrumentation can stay on under load;
+    function-backed gauges are only evaluated when scraped.
+    """
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric, or return the already registered one of the same name and type"""
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.family_name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.family_name} {metric.type_name}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    rendered = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+                    name = f"{name}{{{rendered}}}"
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+    
+    def write_textfile(self, path: str) -> None:
+        """
+        Write the current metrics to a file atomically
+        
+        Suits node_exporter's textfile collector for runs too short to scrape.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+metrics = MetricsRegistry()
+
+# Pipeline
+STAGE_SECONDS = metrics.histogram(
+    "yva_stage_duration_seconds",
+    "Wall time of pipeline stages (download, vad, shape, extract, asr, asr_draft, asr_refine, decode, stream_vad, llm)",
+    ("stage",)
+)
+AUDIO_SECONDS = metrics.counter("yva_audio_seconds", "Seconds of audio run through VAD")
+SPEECH_SECONDS = metrics.counter("yva_speech_seconds", "Seconds of speech transcribed")
+SEGMENTS = metrics.counter("yva_segments", "Speech segments transcribed")
+SEGMENT_SECONDS = metrics.histogram(
+    "yva_segment_duration_seconds", "Length of speech segments sent to ASR after shaping",
+    buckets=(0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+)
+PIPELINE_RUNS = metrics.counter("yva_pipeline_runs", "Videos processed, by result", ("result",))
+TRANSCRIPT_READY_SECONDS = metrics.histogram(
+    "yva_transcript_ready_seconds",
+    "Time from request until the transcript can be used, by tier (draft, final)",
+    ("tier",)
+)
+
+# LLM
+LLM_FIRST_TOKEN_SECONDS = metrics.histogram(
+    "yva_llm_time_to_first_token_seconds", "Time until the first piece of an LLM answer"
+)
+LLM_TOKENS = metrics.counter("yva_llm_tokens", "LLM tokens sent and generated", ("kind",))
+
+# Service
+JOBS_REJECTED = metrics.counter("yva_jobs_rejected", "Job submissions refused because the queue was full")
+
+# Resources
+QUEUE_DEPTH = metrics.gauge("yva_queue_depth", "Items waiting in work queues", ("queue",))
+MODEL_MEMORY_BYTES = metrics.gauge("yva_model_memory_bytes", "Estimated memory of loaded models")
+MODELS_LOADED = metrics.gauge("yva_models_loaded", "Loaded model instances")
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> Any:
+    """
+    Serve ``GET /metrics`` from a background thread
+    
+    For modes without the HTTP service (cli, batch), so Prometheus can
+    scrape them while they run.
+    
+    Returns:
+        The running ``ThreadingHTTPServer``
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
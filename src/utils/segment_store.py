@@ -0,0 +1,200 @@
+import io
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+from src.utils.text_utils import combine_transcripts
+
+
+class SegmentStore:
+    """
+    Timestamped transcript segments in parallel arrays
+    
+    Segment ``i`` spans samples ``starts[i]:ends[i]`` and its text is
+    ``text[offsets[i]:offsets[i + 1]]`` of one UTF-8 buffer. Segments are kept
+    in time order, so time lookups are binary searches, contiguous slices are
+    views, and the whole store saves to and loads from a single ``.npz``
+    without per-segment objects.
+    """
+    
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, text: np.ndarray, offsets: np.ndarray,
+                 sample_rate: int):
+        """
+        Args:
+            starts: Start sample of each segment (int64, ascending)
+            ends: End sample of each segment (int64)
+            text: UTF-8 bytes of all segment texts (uint8)
+            offsets: ``len(starts) + 1`` byte offsets into ``text`` (int64)
+            sample_rate: Sample rate of the offsets
+        """
+        if not (len(starts) == len(ends) == len(offsets) - 1):
+            raise ValueError("starts, ends and offsets do not describe the same segments")
+        self.starts = starts
+        self.ends = ends
+        self.text = text
+        self.offsets = offsets
+        self.sample_rate = sample_rate
+    
+    @classmethod
+    def from_segments(cls, segments: Iterable[Dict[str, Any]], sample_rate: int) -> "SegmentStore":
+        """
+        Build a store from dicts with "start" and "end" sample offsets and "text"
+        
+        Segments are sorted by start time.
+        """
+        segments = sorted(segments, key=lambda segment: segment["start"])
+        encoded = [segment["text"].encode("utf-8") for segment in segments]
+        offsets = np.zeros(len(segments) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in encoded], out=offsets[1:])
+        return cls(
+            starts=np.array([segment["start"] for segment in segments], dtype=np.int64),
+            ends=np.array([segment["end"] for segment in segments], dtype=np.int64),
+            text=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            offsets=offsets,
+            sample_rate=sample_rate
+        )
+    
+    @classmethod
+    def empty(cls, sample_rate: int) -> "SegmentStore":
+        return cls.from_segments([], sample_rate)
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        """A segment dict for an integer index, a store view for a contiguous slice"""
+        if isinstance(index, slice):
+            first, last, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("SegmentStore slices must be contiguous")
+            last = max(first, last)
+            return SegmentStore(
+                starts=self.starts[first:last],
+                ends=self.ends[first:last],
+                text=self.text[self.offsets[first]:self.offsets[last]],
+                offsets=self.offsets[first:last + 1] - self.offsets[first],
+                sample_rate=self.sample_rate
+            )
+        
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return {"start": int(self.starts[index]), "end": int(self.ends[index]), "text": self.text_at(index)}
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self)):
+            yield self[index]
+    
+    def replace_texts(self, first: int, texts: List[str]) -> "SegmentStore":
+        """
+        A store with the texts of segments ``first:first + len(texts)`` replaced
+        
+        Timestamps are shared with this store and the text buffer is spliced
+        in one copy, without building per-segment objects.
+        """
+        last = first + len(texts)
+        if not 0 <= first <= last <= len(self):
+            raise IndexError("segment range out of range")
+        
+        encoded = [text.encode("utf-8") for text in texts]
+        start, end = int(self.offsets[first]), int(self.offsets[last])
+        offsets = self.offsets.copy()
+        np.cumsum([len(text) for text in encoded], out=offsets[first + 1:last + 1])
+        offsets[first + 1:last + 1] += start
+        offsets[last + 1:] += offsets[last] - end
+        return SegmentStore(
+            starts=self.starts,
+            ends=self.ends,
+            text=np.concatenate([
+                self.text[:start], np.frombuffer(b"".join(encoded), dtype=np.uint8), self.text[end:]
+            ]),
+            offsets=offsets,
+            sample_rate=self.sample_rate
+        )
+    
+    def text_at(self, index: int) -> str:
+        """Text of one segment"""
+        return self.text[self.offsets[index]:self.offsets[index + 1]].tobytes().decode("utf-8")
+    
+    def texts(self) -> List[str]:
+        """Texts of all segments, in time order"""
+        data = self.text.tobytes()
+        bounds = self.offsets.tolist()
+        return [data[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(self))]
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Segments as plain dicts (e.g. for JSON)"""
+        return [
+            {"start": start, "end": end, "text": text}
+            for start, end, text in zip(self.starts.tolist(), self.ends.tolist(), self.texts())
+        ]
+    
+    def transcript(self) -> str:
+        """The combined transcript text"""
+        return combine_transcripts(self.texts())
+    
+    @property
+    def duration(self) -> float:
+        """Seconds up to the end of the last segment"""
+        return float(self.ends[-1]) / self.sample_rate if len(self) else 0.0
+    
+    def index_at(self, seconds: float) -> Optional[int]:
+        """
+        Find the segment playing at a time
+        
+        Args:
+            seconds: Time from the start of the audio
+        
+        Returns:
+            Index of the segment containing that time, or None in a pause
+        """
+        sample = int(seconds * self.sample_rate)
+        index = int(np.searchsorted(self.starts, sample, side="right")) - 1
+        if index >= 0 and sample < self.ends[index]:
+            return index
+        return None
+    
+    def between(self, start_s: float, end_s: float) -> "SegmentStore":
+        """
+        Segments overlapping a time range, as a view
+        
+        Args:
+            start_s: Range start in seconds
+            end_s: Range end in seconds
+        """
+        first = int(np.searchsorted(self.ends, int(start_s * self.sample_rate), side="right"))
+        last = int(np.searchsorted(self.starts, int(end_s * self.sample_rate), side="left"))
+        return self[first:max(first, last)]
+    
+    def save(self, file: Union[str, BinaryIO]) -> None:
+        """Write the store as an uncompressed ``.npz``"""
+        np.savez(
+            file,
+            starts=self.starts,
+            ends=self.ends,
+            text=self.text,
+            offsets=self.offsets,
+            sample_rate=np.array(self.sample_rate, dtype=np.int64)
+        )
+    
+    @classmethod
+    def load(cls, file: Union[str, BinaryIO]) -> "SegmentStore":
+        """Read a store written by ``save``"""
+        with np.load(file) as data:
+            return cls(
+                starts=data["starts"],
+                ends=data["ends"],
+                text=data["text"],
+                offsets=data["offsets"],
+                sample_rate=int(data["sample_rate"])
+            )
+    
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        self.save(buffer)
+        return buffer.getvalue()
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SegmentStore":
+        return cls.load(io.BytesIO(data))
@@ -0,0 +1,112 @@
+import re
+from typing import List
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase a text and split it into words, dropping punctuation"""
+    return re.findall(r"[\w']+", text.lower())
+
+
+def combine_transcripts(transcripts: List[str]) -> str:
+    """
+    Combine individual transcripts into a single text
+    
+    Args:
+        transcripts: List of transcript segments
+        
+    Returns:
+        Combined transcript text
+    """
+    return ". ".join(transcript.strip() for transcript in transcripts if transcript.strip())
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Compute the word error rate of a hypothesis against a reference
+    
+    Args:
+        reference: Reference text
+        hypothesis: Recognized text
+        
+    Returns:
+        (substitutions + deletions + insertions) / reference word count
+    """
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    
+    # Single-row Levenshtein distance over words
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    
+    return previous[-1] / len(ref)
+
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_encoder = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count LLM tokens in a text
+    
+    Uses tiktoken's cl100k_base encoding when the package is installed and
+    falls back to counting words and punctuation marks, which tracks BPE
+    token counts closely enough for budgeting.
+    
+    Args:
+        text: Text to count
+        
+    Returns:
+        Number of tokens
+    """
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoder = False
+    
+    if _encoder:
+        return len(_encoder.encode(text, disallowed_special=()))
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def truncate_tokens(text: str, max_tokens: int, marker: str = " ...") -> str:
+    """
+    Shorten a text to at most ``max_tokens`` tokens, cutting between words
+    
+    Args:
+        text: Text to shorten
+        max_tokens: Token limit, including the marker
+        marker: Appended when the text was cut
+        
+    Returns:
+        The text itself if it fits, otherwise its longest word prefix that
+        fits with the marker (empty if not even the marker fits)
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    
+    words = text.split(" ")
+    low, high = 0, len(words)  # the longest fitting prefix has between low and high words
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:middle]) + marker) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    
+    if low == 0:
+        return marker.strip() if count_tokens(marker) <= max_tokens else ""
+    return " ".join(words[:low]) + marker
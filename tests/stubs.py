@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional
+
+from src.core.exceptions import DownloadError
+from src.services.downloader import YouTubeDownloader
+from src.utils.audio_utils import find_wav_data
+
+
+class LocalStubDownloader(YouTubeDownloader):
+    """
+    Downloader stand-in that serves one local 16-bit mono WAV for every URL
+    
+    Needs neither network access nor ffmpeg, so tests can run the full
+    pipeline.
+    """
+    
+    def __init__(self, audio_file: str):
+        """
+        Args:
+            audio_file: WAV file at ``config.sample_rate`` returned for every URL
+        """
+        super().__init__()
+        self.audio_file = audio_file
+        self.downloads: List[str] = []
+        find_wav_data(audio_file)  # Fail early on unusable fixtures
+    
+    def download(self, url: str, output_dir: Optional[str] = None) -> str:
+        """Copy the fixture to a per-call file, like ``YouTubeDownloader.download``"""
+        output_dir = output_dir or self.config.download_dir
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            fd, output_file = tempfile.mkstemp(prefix="stub-", suffix=".wav", dir=output_dir)
+            os.close(fd)
+            with self._lock:
+                self._job_files.add(output_file)
+                self.downloads.append(url)
+            shutil.copyfile(self.audio_file, output_file)
+            return output_file
+        except Exception as e:
+            raise DownloadError(f"Download failed: {str(e)}")
+    
+    @contextmanager
+    def open_stream(self, url: str) -> Iterator[BinaryIO]:
+        """Yield the fixture's raw PCM samples"""
+        offset, _ = find_wav_data(self.audio_file)
+        with open(self.audio_file, "rb") as stream:
+            stream.seek(offset)
+            yield stream
+    
+    def expand_playlist(self, url: str) -> List[str]:
+        """Every URL is a single video"""
+        return [url]
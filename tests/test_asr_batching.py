@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from src.services.asr_service import chunk_windows, plan_batches
+
+
+def test_batches_cover_every_segment_once_within_limits():
+    lengths = [16000, 48000, 8000, 160000, 32000, 24000, 4000, 96000]
+    
+    batches = plan_batches(lengths, max_samples=200000, max_size=3)
+    
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    for batch in batches:
+        assert len(batch) <= 3
+        assert len(batch) * max(lengths[i] for i in batch) <= 200000 or len(batch) == 1
+        assert [lengths[i] for i in batch] == sorted((lengths[i] for i in batch), reverse=True)
+    assert batches[0] == [3]  # longest first; 160000 leaves no room for a second segment
+
+
+def test_oversized_segment_gets_its_own_batch():
+    assert plan_batches([500000, 1000, 1000], max_samples=100000, max_size=8) == [[0], [1, 2]]
+    assert plan_batches([], max_samples=100000, max_size=8) == []
+
+
+def test_windows_overlap_by_the_strides():
+    windows = chunk_windows(100, chunk_samples=40, stride_left=5, stride_right=5)
+    
+    assert windows == [(0, 40, 0, 5), (30, 70, 5, 5), (60, 100, 5, 0)]
+    # Dropping each window's strides tiles the segment exactly
+    kept = [(start + left, end - right) for start, end, left, right in windows]
+    assert kept[0][0] == 0 and kept[-1][1] == 100
+    assert all(a[1] == b[0] for a, b in zip(kept, kept[1:]))
+
+
+def test_short_segment_is_one_window():
+    assert chunk_windows(10, chunk_samples=40, stride_left=5, stride_right=5) == [(0, 10, 0, 0)]
+
+
+def test_strides_must_leave_a_step():
+    with pytest.raises(ValueError):
+        chunk_windows(100, chunk_samples=10, stride_left=5, stride_right=5)
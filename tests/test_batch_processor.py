@@ -0,0 +1,118 @@
+import dataclasses
+import json
+import wave
+
+import numpy as np
+import pytest
+
+import src.core.batch_processor as batch_processor
+from src.core.config import config
+from src.core.exceptions import DownloadError
+from tests.stubs import LocalStubDownloader
+
+
+class FakeVADService:
+    """Treats the whole file as one speech region"""
+    
+    def __init__(self):
+        self.batch_sizes = []
+    
+    def detect_speech_batch(self, audios):
+        self.batch_sizes.append(len(audios))
+        return [[{"start": 0, "end": len(audio)}] for audio in audios]
+    
+    def extract_speech_segments(self, audio, timestamps):
+        return [(audio[ts["start"]:ts["end"]], (ts["end"] - ts["start"]) / 16000) for ts in timestamps]
+
+
+class FakeASRService:
+    def transcribe_batch(self, speech_segments):
+        return [f"{len(segment)} samples" for segment, _ in speech_segments]
+
+
+@pytest.fixture
+def fixture_wav(tmp_path):
+    path = tmp_path / "fixture.wav"
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(np.zeros(16000, dtype=np.int16).tobytes())
+    return str(path)
+
+
+@pytest.fixture
+def make_processor(monkeypatch, tmp_path, fixture_wav):
+    vad_service = FakeVADService()
+    monkeypatch.setattr(batch_processor, "acquire_vad_service", lambda settings: vad_service)
+    monkeypatch.setattr(batch_processor, "acquire_asr_service", lambda settings: FakeASRService())
+    monkeypatch.setattr(batch_processor, "release_vad_service", lambda service, settings: None)
+    monkeypatch.setattr(batch_processor, "release_asr_service", lambda service, settings: None)
+    monkeypatch.chdir(tmp_path)  # downloads go to config.download_dir
+    
+    def make(**overrides):
+        settings = dataclasses.replace(config, transcript_cache_enabled=False, **overrides)
+        processor = batch_processor.BatchProcessor(settings=settings, downloader=LocalStubDownloader(fixture_wav))
+        processor.fake_vad = vad_service
+        return processor
+    
+    return make
+
+
+@pytest.mark.parametrize("vad_batch_size", [1, 4])
+def test_run_transcribes_every_video(make_processor, tmp_path, vad_batch_size):
+    processor = make_processor(vad_batch_size=vad_batch_size)
+    urls = [f"https://www.youtube.com/watch?v=video{i:06d}" for i in range(5)]
+    output = str(tmp_path / "out.jsonl")
+    
+    summary = processor.run(urls, output)
+    processor.close()
+    
+    assert summary["done"] == 5 and summary["failed"] == 0
+    with open(output, encoding="utf-8") as f:
+        results = [json.loads(line) for line in f]
+    assert sorted(result["url"] for result in results) == urls
+    assert all(result["transcript"] == "16000 samples" for result in results)
+    assert max(processor.fake_vad.batch_sizes) <= vad_batch_size
+
+
+def test_transcribe_single_video(make_processor):
+    processor = make_processor(vad_batch_size=1)
+    
+    result = processor.transcribe("https://www.youtube.com/watch?v=video000000")
+    processor.close()
+    
+    assert result["transcript"] == "16000 samples"
+    assert set(result["timings"]) == {"download_s", "vad_s", "asr_s"}
+
+
+def test_expand_skips_video_urls_and_reports_bad_sources(make_processor, tmp_path):
+    processor = make_processor()
+    expanded = []
+    
+    def expand_playlist(url):
+        expanded.append(url)
+        if "broken" in url:
+            raise DownloadError("Failed to expand playlist: private")
+        return ["https://youtu.be/video000001", "https://youtu.be/video000002"]
+    
+    processor.downloader.expand_playlist = expand_playlist
+    sources = [
+        "https://www.youtube.com/watch?v=video000001",
+        "https://www.youtube.com/playlist?list=broken",
+        "https://www.youtube.com/watch?v=video000000&list=PLgood",
+    ]
+    
+    urls, errors = processor.expand(sources)
+    
+    assert expanded == sources[1:]
+    assert urls == ["https://www.youtube.com/watch?v=video000001", "https://youtu.be/video000002"]
+    assert list(errors) == ["https://www.youtube.com/playlist?list=broken"]
+    
+    output = str(tmp_path / "out.jsonl")
+    summary = processor.run(urls, output, source_errors=errors)
+    processor.close()
+    
+    assert summary["done"] == 2 and summary["failed"] == 1
+    manifest = batch_processor.BatchManifest(f"{output}.manifest.jsonl")
+    assert manifest.status(sources[1]) == "failed"
@@ -0,0 +1,47 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from src.benchmarks.pipeline import EnergyVADModel, synthesize_speech
+from src.core.config import config
+from src.services.batched_vad import BatchedVAD
+from src.services.vad_service import VADService
+from src.utils.audio_utils import pcm16_to_float
+
+
+def sequential_timestamps(audio):
+    """Timestamps of the window-by-window path (``VADService.iter_speech_timestamps``)"""
+    service = VADService(model=EnergyVADModel(), settings=dataclasses.replace(config, vad_batch_size=1))
+    chunks = [pcm16_to_float(audio[i:i + 8192]) for i in range(0, len(audio), 8192)]
+    return list(service.iter_speech_timestamps(chunks))
+
+
+@pytest.fixture(scope="module")
+def audios():
+    return [
+        synthesize_speech(90.0, 0.6, seed=1),
+        synthesize_speech(7.3, 0.8, seed=2),
+        synthesize_speech(0.01, 0.5, seed=3),
+        synthesize_speech(45.0, 0.3, seed=4),
+    ]
+
+
+@pytest.mark.parametrize("batch_size, shard_s", [(4, 0), (2, 0), (4, 20.0), (3, 11.0)])
+def test_detect_matches_sequential_path(audios, batch_size, shard_s):
+    vad = BatchedVAD(EnergyVADModel(), batch_size=batch_size, shard_s=shard_s, warmup_s=2.0)
+    
+    assert vad.detect(audios) == [sequential_timestamps(audio) for audio in audios]
+
+
+def test_long_audio_is_sharded(audios):
+    vad = BatchedVAD(EnergyVADModel(), shard_s=20.0, warmup_s=2.0)
+    tracks = vad._shard(audios[0])
+    
+    assert len(tracks) == 5
+    assert tracks[0].first == 0 and tracks[-1].last == int(np.ceil(len(audios[0]) / 512))
+    assert all(a.last == b.first for a, b in zip(tracks, tracks[1:]))
+    assert all(b.first - b.run_from == vad.warmup_windows for b in tracks[1:])
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from src.services.conversation_memory import ConversationMemory
+from src.utils.text_utils import count_tokens, truncate_tokens
+
+
+class SummaryLLMService:
+    def complete(self, messages, max_tokens=1000, internal=False):
+        return "they asked about the intro"
+
+
+def history_tokens(messages):
+    return sum(count_tokens(message["content"]) for message in messages)
+
+
+def test_long_newest_turn_is_shortened_to_the_budget():
+    memory = ConversationMemory(SummaryLLMService(), token_budget=50, recent_turns=4)
+    memory.add_turn("short question", "short answer")
+    memory.add_turn("what happens " * 10, "a long answer " * 100)
+    
+    memory.wait(timeout=5)  # the first turn is folded into the summary
+    
+    messages = memory.messages()
+    memory.close()
+    
+    assert history_tokens(messages) <= 50
+    assert messages[-2]["content"].startswith("what happens what happens")
+    assert messages[-1]["content"].startswith("a long answer") and messages[-1]["content"].endswith("...")
+
+
+def test_recent_turns_are_kept_whole_while_they_fit():
+    memory = ConversationMemory(SummaryLLMService(), token_budget=50, recent_turns=4)
+    memory.add_turn("first question", "first answer")
+    memory.add_turn("second question", "second answer")
+    
+    assert [message["content"] for message in memory.messages()] == [
+        "first question", "first answer", "second question", "second answer"
+    ]
+    memory.close()
+
+
+def test_old_turns_are_folded_into_the_summary():
+    memory = ConversationMemory(SummaryLLMService(), token_budget=1000, recent_turns=1)
+    memory.add_turn("first question", "first answer")
+    memory.add_turn("second question", "second answer")
+    memory.wait(timeout=5)
+    
+    messages = memory.messages()
+    memory.close()
+    
+    assert messages[0]["content"] == "Summary of our conversation so far: they asked about the intro"
+    assert [message["content"] for message in messages[2:]] == ["second question", "second answer"]
+
+
+def test_turns_added_during_a_summary_are_folded_too():
+    class SlowSummaryLLMService(SummaryLLMService):
+        calls = 0
+        
+        def complete(self, messages, max_tokens=1000, internal=False):
+            self.calls += 1
+            time.sleep(0.01)
+            return super().complete(messages, max_tokens, internal)
+    
+    service = SlowSummaryLLMService()
+    memory = ConversationMemory(service, token_budget=1000, recent_turns=1)
+    
+    def ask(worker):
+        for turn in range(10):
+            memory.add_turn(f"question {worker} {turn}", f"answer {worker} {turn}")
+    
+    threads = [threading.Thread(target=ask, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    memory.wait(timeout=5)
+    
+    messages = memory.messages()
+    memory.close()
+    
+    assert len(messages) == 4  # the summary exchange and the newest turn
+    assert service.calls < 40  # turns that arrive together are folded in one summary
+
+def test_truncate_tokens_cuts_between_words():
+    assert truncate_tokens("one two three", 10) == "one two three"
+    assert truncate_tokens("one two three four five", 4) == "one ..."
+    assert count_tokens(truncate_tokens("word " * 100, 20)) <= 20
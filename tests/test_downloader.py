@@ -0,0 +1,122 @@
+import functools
+import os
+import shutil
+import threading
+import wave
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from src.core.exceptions import DownloadError
+from src.services.downloader import YouTubeDownloader
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+
+SOURCE_RATE = 44100
+DURATION_S = 2.0
+
+
+@pytest.fixture
+def media_dir(tmp_path):
+    """A 44.1 kHz stereo WAV, so every download has to resample and downmix"""
+    directory = tmp_path / "media"
+    directory.mkdir()
+    t = np.arange(int(SOURCE_RATE * DURATION_S)) / SOURCE_RATE
+    tone = (np.sin(2 * np.pi * 440 * t) * 10000).astype(np.int16)
+    with wave.open(str(directory / "clip.wav"), "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(SOURCE_RATE)
+        f.writeframes(np.repeat(tone, 2).tobytes())
+    return directory
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    return str(tmp_path / "downloads")
+
+
+@pytest.fixture
+def http_url(media_dir):
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=str(media_dir))
+    handler.log_message = lambda *args: None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/clip.wav"
+    server.shutdown()
+    server.server_close()
+
+
+def assert_pipeline_audio(path):
+    with wave.open(path, "rb") as f:
+        assert (f.getnchannels(), f.getsampwidth(), f.getframerate()) == (1, 2, 16000)
+        assert abs(f.getnframes() - DURATION_S * 16000) <= 160
+
+
+def test_download_converts_to_a_per_call_file(media_dir, output_dir):
+    downloader = YouTubeDownloader()
+    
+    audio_file = downloader.download(str(media_dir / "clip.wav"), output_dir=output_dir)
+    
+    assert os.path.dirname(audio_file) == output_dir
+    assert os.path.basename(audio_file) != os.path.basename(downloader.config.temp_audio_file)
+    assert_pipeline_audio(audio_file)
+    assert os.listdir(output_dir) == [os.path.basename(audio_file)]  # no intermediate files
+    
+    downloader.cleanup(audio_file)
+    assert os.listdir(output_dir) == []
+
+
+def test_concurrent_downloads_do_not_share_files(media_dir, output_dir):
+    downloader = YouTubeDownloader()
+    results = []
+    
+    def download():
+        results.append(downloader.download(str(media_dir / "clip.wav"), output_dir=output_dir))
+    
+    threads = [threading.Thread(target=download) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(set(results)) == 4
+    for audio_file in results:
+        assert_pipeline_audio(audio_file)
+    
+    downloader.cleanup()
+    assert os.listdir(output_dir) == []
+
+
+def test_failed_conversion_leaves_no_file(tmp_path, output_dir):
+    not_media = tmp_path / "notes.txt"
+    not_media.write_text("not audio")
+    
+    with pytest.raises(DownloadError):
+        YouTubeDownloader().download(str(not_media), output_dir=output_dir)
+    assert os.listdir(output_dir) == []
+
+
+def test_open_stream_yields_pcm_without_writing_files(media_dir, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    before = sorted(os.listdir(tmp_path))
+    
+    with YouTubeDownloader().open_stream(str(media_dir / "clip.wav")) as stream:
+        samples = np.frombuffer(stream.read(), dtype=np.int16)
+    
+    assert abs(len(samples) - DURATION_S * 16000) <= 160
+    assert np.abs(samples).max() > 5000
+    assert sorted(os.listdir(tmp_path)) == before
+
+
+def test_download_and_stream_over_http(http_url, output_dir):
+    pytest.importorskip("yt_dlp")
+    downloader = YouTubeDownloader()
+    
+    audio_file = downloader.download(http_url, output_dir=output_dir)
+    assert_pipeline_audio(audio_file)
+    downloader.cleanup(audio_file)
+    
+    with downloader.open_stream(http_url) as stream:
+        assert abs(len(stream.read()) // 2 - DURATION_S * 16000) <= 160
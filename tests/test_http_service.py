@@ -0,0 +1,207 @@
+import dataclasses
+import http.client
+import json
+import threading
+import time
+import wave
+
+import numpy as np
+import pytest
+
+import src.api.http_service as http_service
+import src.core.batch_processor as batch_processor
+from src.core.config import config
+from tests.stubs import LocalStubDownloader
+
+
+class FakeVADService:
+    def detect_speech_batch(self, audios):
+        return [[{"start": 0, "end": len(audio)}] for audio in audios]
+    
+    def extract_speech_segments(self, audio, timestamps):
+        return [(audio[ts["start"]:ts["end"]], (ts["end"] - ts["start"]) / 16000) for ts in timestamps]
+
+
+class FakeASRService:
+    """Transcribes once the gate is open"""
+    
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+    
+    def transcribe_batch(self, speech_segments):
+        self.gate.wait(5)
+        return ["hello world" for _ in speech_segments]
+
+
+class FakeLLMService:
+    def __init__(self):
+        self.closed = False
+    
+    def chat(self, prompt, context, conversation_history):
+        return f"{len(conversation_history) // 2} earlier turns about: {context}", []
+    
+    def complete(self, messages, max_tokens=1000, internal=False):
+        return "summary"
+    
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fixture_wav(tmp_path):
+    path = tmp_path / "fixture.wav"
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(np.zeros(16000, dtype=np.int16).tobytes())
+    return str(path)
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path, fixture_wav):
+    asr_service = FakeASRService()
+    llm_services = []
+    monkeypatch.setattr(batch_processor, "acquire_vad_service", lambda settings: FakeVADService())
+    monkeypatch.setattr(batch_processor, "acquire_asr_service", lambda settings: asr_service)
+    monkeypatch.setattr(batch_processor, "release_vad_service", lambda service, settings: None)
+    monkeypatch.setattr(batch_processor, "release_asr_service", lambda service, settings: None)
+    
+    def create_llm_service(*args, **kwargs):
+        llm_services.append(FakeLLMService())
+        return llm_services[-1]
+    
+    monkeypatch.setattr(http_service, "create_llm_service", create_llm_service)
+    monkeypatch.setattr(config, "transcript_cache_enabled", False)
+    monkeypatch.chdir(tmp_path)  # downloads go to config.download_dir
+    started = []
+    
+    def start(**overrides):
+        settings = dataclasses.replace(config, **overrides)
+        manager = http_service.JobManager(
+            num_workers=1, queue_size=1, downloader=LocalStubDownloader(fixture_wav), settings=settings
+        )
+        server = http_service.create_server(manager, "127.0.0.1", 0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        started.append((server, manager))
+        return server
+    
+    start.asr_service = asr_service
+    start.llm_services = llm_services
+    yield start
+    asr_service.gate.set()
+    for server, manager in started:
+        server.shutdown()
+        server.server_close()
+        manager.close()
+
+
+def request(server, method, path, body=None):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+    try:
+        connection.request(method, path, body=None if body is None else json.dumps(body))
+        response = connection.getresponse()
+        data = response.read().decode("utf-8")
+        if response.getheader("Content-Type", "").startswith("application/json"):
+            data = json.loads(data)
+        return response.status, data, response
+    finally:
+        connection.close()
+
+
+def wait_for(server, job_id, statuses, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        _, job, _ = request(server, "GET", f"/jobs/{job_id}")
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {statuses}")
+
+
+def test_job_lifecycle(service):
+    server = service()
+    
+    status, job, response = request(server, "POST", "/jobs", {"url": "https://youtu.be/aaaaaaaaaaa"})
+    assert status == 202
+    assert response.getheader("Location") == f"/jobs/{job['job_id']}"
+    
+    assert wait_for(server, job["job_id"], ("done", "failed"))["status"] == "done"
+    status, transcript, _ = request(server, "GET", f"/jobs/{job['job_id']}/transcript")
+    assert status == 200
+    assert transcript["transcript"] == "hello world"
+    assert transcript["segments"] == [{"start": 0, "end": 16000, "text": "hello world"}]
+    
+    status, events, _ = request(server, "GET", f"/jobs/{job['job_id']}/events")
+    assert status == 200 and '"status": "done"' in events
+    
+    status, health, _ = request(server, "GET", "/health")
+    assert status == 200 and health["jobs"] == {"done": 1}
+    status, metrics, _ = request(server, "GET", "/metrics")
+    assert status == 200 and "# TYPE" in metrics
+
+
+def test_follow_up_questions_share_a_conversation(service):
+    server = service()
+    _, job, _ = request(server, "POST", "/jobs", {"url": "https://youtu.be/aaaaaaaaaaa"})
+    wait_for(server, job["job_id"], ("done",))
+    
+    _, first, _ = request(server, "POST", f"/jobs/{job['job_id']}/ask", {"question": "What is said?"})
+    status, second, _ = request(server, "POST", f"/jobs/{job['job_id']}/ask", {"question": "And then?"})
+    
+    assert status == 200
+    assert first["answer"].startswith("0 earlier turns") and "hello world" in first["answer"]
+    assert second["answer"].startswith("1 earlier turns")
+    assert len(service.llm_services) == 1  # shared by all jobs
+
+
+def test_bad_requests(service):
+    server = service()
+    _, job, _ = request(server, "POST", "/jobs", {"url": "https://youtu.be/aaaaaaaaaaa"})
+    
+    assert request(server, "GET", "/jobs/missing")[0] == 404
+    assert request(server, "POST", "/jobs", {"link": "x"})[0] == 400
+    assert request(server, "POST", "/jobs", ["not", "an", "object"])[0] == 400
+    assert request(server, "GET", f"/jobs/{job['job_id']}/ask")[0] == 405
+    
+    wait_for(server, job["job_id"], ("done",))
+    assert request(server, "POST", f"/jobs/{job['job_id']}/ask", {"question": " "})[0] == 400
+
+
+def test_full_queue_is_rejected_with_429(service):
+    server = service()
+    service.asr_service.gate.clear()
+    
+    _, running, _ = request(server, "POST", "/jobs", {"url": "https://youtu.be/aaaaaaaaaaa"})
+    wait_for(server, running["job_id"], ("asr",))
+    status, queued, _ = request(server, "POST", "/jobs", {"url": "https://youtu.be/bbbbbbbbbbb"})
+    assert status == 202
+    
+    status, error, response = request(server, "POST", "/jobs", {"url": "https://youtu.be/ccccccccccc"})
+    assert status == 429
+    assert response.getheader("Retry-After") == "5"
+    assert request(server, "GET", f"/jobs/{queued['job_id']}/transcript")[0] == 409
+    
+    service.asr_service.gate.set()
+    assert wait_for(server, queued["job_id"], ("done",))["status"] == "done"
+    assert request(server, "POST", "/jobs", {"url": "https://youtu.be/ccccccccccc"})[0] == 202
+
+
+def test_evicted_jobs_release_their_processor(service):
+    server = service(service_max_jobs=1)
+    manager = server.manager
+    _, first, _ = request(server, "POST", "/jobs", {"url": "https://youtu.be/aaaaaaaaaaa"})
+    wait_for(server, first["job_id"], ("done",))
+    request(server, "POST", f"/jobs/{first['job_id']}/ask", {"question": "What is said?"})
+    evicted = manager.get(first["job_id"])
+    executor = evicted.processor.memory._executor
+    
+    request(server, "POST", "/jobs", {"url": "https://youtu.be/bbbbbbbbbbb"})
+    
+    assert manager.get(first["job_id"]) is None
+    assert evicted.processor is None and executor._shutdown
+    assert not service.llm_services[0].closed  # still used by the other jobs
+    manager.close()
+    assert service.llm_services[0].closed
@@ -0,0 +1,61 @@
+import pytest
+
+from src.services.llm_cache import CachedLLMService, token_similarity
+
+
+class FakeLLMService:
+    def __init__(self):
+        self.prompts = []
+    
+    def chat(self, prompt, context, conversation_history):
+        self.prompts.append(prompt)
+        return f"answer {len(self.prompts)}", []
+    
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("a, b", [
+    ("is the product safe", "is the product not safe"),
+    ("does it work", "doesn't it work"),
+    ("what are the top 5 tips", "what are the top 10 tips"),
+    ("who founded the company", "when founded the company"),
+])
+def test_questions_with_different_meaning_are_not_similar(a, b):
+    assert token_similarity(a, b) == 0.0
+
+
+def test_similarity_is_jaccard_of_words():
+    assert token_similarity("is the product safe", "is this product safe") == pytest.approx(3 / 5)
+
+
+def test_near_duplicates_count_one_lookup(tmp_path):
+    service = FakeLLMService()
+    cached = CachedLLMService(service, cache_dir=str(tmp_path), similarity_threshold=0.6)
+    
+    assert cached.chat("Is the product safe?", "context", [])[0] == "answer 1"
+    assert cached.chat("is the product safe", "context", [])[0] == "answer 1"
+    assert cached.chat("Is this product safe?", "context", [])[0] == "answer 1"
+    assert cached.chat("Is the product not safe?", "context", [])[0] == "answer 2"
+    
+    stats = cached.stats()
+    assert (stats["hits"], stats["misses"], stats["near_duplicate_hits"]) == (2, 2, 1)
+    cached.close()
+
+
+def test_near_duplicate_evicted_during_lookup_counts_a_miss(tmp_path):
+    cached = CachedLLMService(FakeLLMService(), cache_dir=str(tmp_path), similarity_threshold=0.6)
+    cached.chat("Is the product safe?", "context", [])
+    peek = cached.cache.peek
+    
+    def peek_then_evict(key):
+        value = peek(key)
+        cached.cache.delete(key)
+        return value
+    
+    cached.cache.peek = peek_then_evict
+    assert cached.chat("Is this product safe?", "context", [])[0] == "answer 2"
+    
+    stats = cached.stats()
+    assert (stats["hits"], stats["misses"], stats["near_duplicate_hits"]) == (0, 2, 0)
+    cached.close()
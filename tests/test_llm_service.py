@@ -0,0 +1,144 @@
+import json
+import time
+
+import pytest
+
+from src.benchmarks import prefix_cache
+from src.core.config import config
+from src.services.conversation_memory import ConversationMemory
+from src.services.llm_service import BaseLLMService, LocalLLMService
+from src.utils.metrics import LLM_FIRST_TOKEN_SECONDS, STAGE_SECONDS
+
+
+class EchoLLMService(BaseLLMService):
+    """Answers with the last message, streaming it word by word"""
+    
+    def complete(self, messages, max_tokens=1000, internal=False):
+        start_time = time.perf_counter()
+        content = messages[-1]["content"]
+        self._record_stats(start_time, None, content, messages, internal=internal)
+        return content
+    
+    def complete_stream(self, messages, max_tokens=1000):
+        yield from self._stream_with_stats(iter(messages[-1]["content"].split()), messages)
+
+
+def first_token_count():
+    return dict((name, value) for name, _, value in LLM_FIRST_TOKEN_SECONDS.samples())[
+        "yva_llm_time_to_first_token_seconds_count"
+    ]
+
+
+def test_only_streamed_requests_observe_time_to_first_token():
+    service = EchoLLMService()
+    before = first_token_count()
+    
+    service.chat("one two three", "context", [])
+    assert first_token_count() == before
+    
+    assert list(service.chat_stream("one two three", "context", [])) == ["one", "two", "three"]
+    assert first_token_count() == before + 1
+
+
+def llm_request_count():
+    return dict((name, value) for name, _, value in STAGE_SECONDS.labels(stage="llm").samples())["_count"]
+
+
+def test_request_stats_belong_to_each_service():
+    first, second = EchoLLMService(), EchoLLMService()
+    
+    first.chat("one two three", "context", [])
+    
+    assert first.last_request_stats["completion_tokens"] > 0
+    assert second.last_request_stats == {}
+
+
+def test_default_stream_records_one_request():
+    class PlainLLMService(EchoLLMService):
+        complete_stream = BaseLLMService.complete_stream
+    
+    before = llm_request_count()
+    
+    assert list(PlainLLMService().chat_stream("one two", "context", [])) == ["one two"]
+    assert llm_request_count() == before + 1
+
+
+def test_summaries_leave_the_answer_stats_alone():
+    service = EchoLLMService()
+    memory = ConversationMemory(service, token_budget=1000, recent_turns=1)
+    service.chat("a question", "context", [])
+    answer_stats = service.last_request_stats
+    
+    memory.add_turn("first question", "first answer")
+    memory.add_turn("second question", "second answer")
+    memory.wait(timeout=5)
+    memory.close()
+    
+    assert "Summary of our conversation" in memory.messages()[0]["content"]
+    assert service.last_request_stats is answer_stats
+
+
+
+def test_internal_requests_do_not_touch_the_pinned_slot():
+    service = LocalLLMService(prefix_cache=True, slot_id=2)
+    messages = service.build_messages("question", "transcript", [])
+    
+    answer = service._payload(messages, 100)
+    summary = service._payload(messages, 100, internal=True)
+    
+    assert answer["cache_prompt"] is True and answer["id_slot"] == 2
+    assert "cache_prompt" not in summary and "id_slot" not in summary
+    assert "id_slot" not in LocalLLMService(prefix_cache=False)._payload(messages, 100)
+
+
+def test_each_transcript_is_pinned_to_its_own_slot(monkeypatch):
+    monkeypatch.setattr(config, "llm_slot_id", -1)
+    monkeypatch.setattr(config, "llm_num_slots", 2)
+    service = LocalLLMService(prefix_cache=True)
+    
+    def slot(context):
+        return service._payload(service.build_messages("question", context, []), 100)["id_slot"]
+    
+    first, second = slot("first video"), slot("second video")
+    assert first != second
+    assert slot("first video") == first
+    assert slot("third video") == second  # takes over the least recently used slot
+    assert slot("first video") == first
+
+
+@pytest.fixture
+def stub_url():
+    server = prefix_cache.start_stub_server()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_sessions_sharing_a_service_keep_their_cached_prefix(monkeypatch, stub_url):
+    monkeypatch.setattr(config, "llm_slot_id", -1)
+    monkeypatch.setattr(config, "llm_num_slots", 4)
+    service = LocalLLMService(base_url=stub_url, prefix_cache=True)
+    histories = {"first video " * 200: [], "second video " * 200: []}
+    
+    for turn in range(3):
+        for transcript, history in histories.items():
+            _, histories[transcript] = service.chat(f"question {turn}", transcript, history)
+            if turn:
+                assert service.last_server_timings["cache_n"] > len(transcript)
+            service.complete([{"role": "user", "content": "summarize"}], internal=True)
+
+
+def test_prefix_cache_benchmark_measures_reuse(stub_url, tmp_path):
+    transcript = "sentence of the synthetic transcript. " * 500
+    questions = prefix_cache.DEFAULT_QUESTIONS[:3]
+    
+    cached = prefix_cache.run_conversation(stub_url, transcript, questions, prefix_cache=True, slot_id=0)
+    uncached = prefix_cache.run_conversation(stub_url, transcript, questions, prefix_cache=False, slot_id=1)
+    
+    assert all(turn["cached_tokens"] > len(transcript) for turn in cached[1:])
+    assert all(turn["cached_tokens"] == 0 for turn in uncached)
+    assert cached[-1]["prompt_ms"] < uncached[-1]["prompt_ms"] / 10
+    
+    results = tmp_path / "prefix_cache.json"
+    assert prefix_cache.main(["--stub", "--turns", "2", "--json", str(results)]) == 0
+    assert set(json.loads(results.read_text())) == {"prefix_cache", "no_prefix_cache"}
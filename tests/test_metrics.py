@@ -0,0 +1,50 @@
+import pytest
+
+from src.utils.metrics import Histogram, MetricsRegistry, _Metric
+
+
+def test_counter_family_is_named_like_its_samples():
+    registry = MetricsRegistry()
+    runs = registry.counter("test_runs", "Runs by result", ("result",))
+    runs.labels(result="done").inc()
+    runs.labels(result="done").inc(2)
+    
+    assert registry.render().splitlines() == [
+        "# HELP test_runs_total Runs by result",
+        "# TYPE test_runs_total counter",
+        'test_runs_total{result="done"} 3',
+    ]
+
+
+def test_histogram_and_gauge_rendering():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Durations", buckets=(0.1, 1.0))
+    histogram.observe(0.5)
+    gauge = registry.gauge("test_depth", "Depth")
+    gauge.set_function(lambda: 4)
+    
+    lines = registry.render().splitlines()
+    
+    assert "# TYPE test_seconds histogram" in lines
+    assert 'test_seconds_bucket{le="0.1"} 0' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 1' in lines
+    assert "test_seconds_count 1" in lines
+    assert "test_depth 4" in lines
+
+
+def test_metric_types_must_define_their_values():
+    with pytest.raises(TypeError):
+        _Metric("test_abstract", "Abstract")
+    
+    class Incomplete(_Metric):
+        type_name = "untyped"
+    
+    with pytest.raises(TypeError):
+        Incomplete("test_incomplete", "Incomplete")
+    assert Histogram("test_ok", "Concrete").samples()
+
+
+def test_counters_reject_decrements():
+    counter = MetricsRegistry().counter("test_events", "Events")
+    with pytest.raises(ValueError):
+        counter.inc(-1)
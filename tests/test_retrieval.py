@@ -0,0 +1,53 @@
+from src.services.retrieval import TranscriptChunk, TranscriptIndex, chunk_segments
+
+
+def make_index(texts):
+    return TranscriptIndex([
+        TranscriptChunk(text=text, start=60.0 * i, end=60.0 * (i + 1), tokens=len(text.split()))
+        for i, text in enumerate(texts)
+    ])
+
+
+TEXTS = [
+    "hi everyone in this video we look at the french revolution",
+    "the revolution began in paris with the storming of the bastille",
+    "louis the sixteenth was the king of france at the time",
+    "the revolution ended the monarchy and the king was executed",
+    "napoleon rose to power in the years that followed",
+    "thanks for watching the video and see you next time",
+]
+
+
+def test_topic_words_select_matching_chunks():
+    chunks = make_index(TEXTS).select("what happened at the bastille", top_k=2, token_budget=100)
+    
+    assert [chunk.start for chunk in chunks] == [60.0]
+
+
+def test_generic_request_falls_back_to_an_even_spread():
+    chunks = make_index(TEXTS).select("Summarize this video", top_k=3, token_budget=100)
+    
+    assert [chunk.start for chunk in chunks] == [0.0, 120.0, 240.0]
+
+
+def test_terms_in_most_chunks_do_not_count_as_matches():
+    index = make_index(TEXTS)
+    
+    assert index.scores("revolution").max() > 0
+    assert index.scores("the").max() == 0
+    assert make_index(["alpha beta", "alpha gamma", "alpha delta"]).scores("alpha").max() == 0
+
+
+def test_select_respects_the_token_budget():
+    chunks = make_index(TEXTS).select("king revolution", top_k=4, token_budget=12)
+    
+    assert sum(chunk.tokens for chunk in chunks) <= 12 and chunks
+
+
+def test_chunks_overlap_and_keep_segment_times():
+    segments = [{"start": i * 16000, "end": (i + 1) * 16000, "text": f"w{i}a w{i}b"} for i in range(6)]
+    
+    chunks = chunk_segments(segments, 16000, chunk_tokens=4, overlap_tokens=1)
+    
+    assert chunks[0].start == 0.0 and chunks[-1].end == 6.0
+    assert all(a.text.split()[-1] == b.text.split()[0] for a, b in zip(chunks, chunks[1:]))
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from src.utils.segment_store import SegmentStore
+
+SAMPLE_RATE = 16000
+
+
+@pytest.fixture
+def store():
+    # 0-1 s, 2-3 s, 3-5 s; given out of order
+    return SegmentStore.from_segments([
+        {"start": 2 * SAMPLE_RATE, "end": 3 * SAMPLE_RATE, "text": "zweite"},
+        {"start": 0, "end": SAMPLE_RATE, "text": "première"},
+        {"start": 3 * SAMPLE_RATE, "end": 5 * SAMPLE_RATE, "text": "third 🎬"},
+    ], SAMPLE_RATE)
+
+
+def test_segments_are_sorted_and_decoded(store):
+    assert store.texts() == ["première", "zweite", "third 🎬"]
+    assert store[-1] == {"start": 3 * SAMPLE_RATE, "end": 5 * SAMPLE_RATE, "text": "third 🎬"}
+    assert store.transcript() == "première. zweite. third 🎬"
+    assert store.duration == 5.0
+
+
+@pytest.mark.parametrize("save", ["file", "bytes"])
+def test_round_trip(store, tmp_path, save):
+    if save == "file":
+        path = str(tmp_path / "segments.npz")
+        store.save(path)
+        loaded = SegmentStore.load(path)
+    else:
+        loaded = SegmentStore.from_bytes(store.to_bytes())
+    
+    assert loaded.to_list() == store.to_list()
+    assert loaded.sample_rate == SAMPLE_RATE
+
+
+def test_empty_store_round_trips():
+    empty = SegmentStore.from_bytes(SegmentStore.empty(SAMPLE_RATE).to_bytes())
+    
+    assert len(empty) == 0 and empty.texts() == [] and empty.duration == 0.0
+    assert empty.index_at(1.0) is None and len(empty.between(0, 10)) == 0
+
+
+@pytest.mark.parametrize("seconds, index", [(0.0, 0), (0.99, 0), (1.0, None), (1.5, None), (2.0, 1), (3.0, 2), (4.99, 2), (5.0, None)])
+def test_index_at(store, seconds, index):
+    assert store.index_at(seconds) == index
+
+
+@pytest.mark.parametrize("start_s, end_s, texts", [
+    (0.0, 5.0, ["première", "zweite", "third 🎬"]),
+    (0.5, 2.5, ["première", "zweite"]),
+    (1.0, 2.0, []),
+    (2.9, 3.1, ["zweite", "third 🎬"]),
+    (6.0, 7.0, []),
+])
+def test_between(store, start_s, end_s, texts):
+    assert store.between(start_s, end_s).texts() == texts
+
+
+def test_slices_are_views(store):
+    view = store[1:3]
+    
+    assert view.texts() == ["zweite", "third 🎬"]
+    assert np.shares_memory(view.starts, store.starts) and np.shares_memory(view.text, store.text)
+    with pytest.raises(ValueError):
+        store[::2]
+
+
+def test_replace_texts_splices_only_the_range(store):
+    replaced = store.replace_texts(1, ["second", "drittes"])
+    
+    assert replaced.texts() == ["première", "second", "drittes"]
+    assert store.texts() == ["première", "zweite", "third 🎬"]
+    assert replaced.starts is store.starts
+    with pytest.raises(IndexError):
+        store.replace_texts(2, ["a", "b"])
@@ -0,0 +1,83 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+import src.services.vad_service as vad_service
+from src.benchmarks.pipeline import EnergyVADModel, synthesize_speech
+from src.core.config import config
+from src.services.vad_service import SpeechSegmenter, VADService
+from src.utils.audio_utils import RollingAudioBuffer, pcm16_to_float
+
+WINDOW = 512
+
+
+def segment(probabilities, **kwargs):
+    segmenter = SpeechSegmenter(**kwargs)
+    timestamps = []
+    for probability in probabilities:
+        timestamps += segmenter.push(probability)
+    return timestamps + segmenter.finish(len(probabilities) * WINDOW)
+
+
+def test_speech_regions_are_padded_and_blips_dropped():
+    probabilities = (
+        [0.0] * 20 + [0.9] * 30 + [0.0] * 20  # speech in windows 20-49
+        + [0.9] * 3 + [0.0] * 20  # 3-window blip, shorter than min_speech_duration_ms
+        + [0.9] * 20 + [0.2] * 2 + [0.9] * 20 + [0.0] * 5  # a 2-window dip is shorter than min_silence
+    )
+    
+    assert segment(probabilities) == [
+        {"start": 20 * WINDOW - 480, "end": 50 * WINDOW + 480},
+        {"start": 93 * WINDOW - 480, "end": 135 * WINDOW + 480},
+    ]
+
+
+def test_close_regions_split_the_silence_between_them():
+    # 6 windows of silence are less than twice the 100 ms padding
+    probabilities = [0.9] * 20 + [0.0] * 6 + [0.9] * 20
+    
+    assert segment(probabilities, speech_pad_ms=100, min_silence_duration_ms=100) == [
+        {"start": 0, "end": 20 * WINDOW + 3 * WINDOW},
+        {"start": 26 * WINDOW - 3 * WINDOW, "end": 46 * WINDOW},
+    ]
+
+
+def test_speech_running_to_the_end_is_flushed():
+    assert segment([0.0] * 10 + [0.9] * 20) == [{"start": 10 * WINDOW - 480, "end": 30 * WINDOW}]
+
+
+
+def test_speech_is_returned_once_the_silence_outlasts_the_padding():
+    segmenter = SpeechSegmenter()
+    timestamps = []
+    for probability in [0.0] * 10 + [0.9] * 20 + [0.0] * 10:
+        timestamps += segmenter.push(probability)
+    
+    assert timestamps == [{"start": 10 * WINDOW - 480, "end": 30 * WINDOW + 480}]
+    assert segmenter.finish(40 * WINDOW) == []
+    assert segmenter.keep_from() == 40 * WINDOW - 480
+
+
+def test_streamed_segments_keep_a_bounded_buffer(monkeypatch):
+    class TrackedBuffer(RollingAudioBuffer):
+        largest = 0
+        
+        def append(self, chunk):
+            super().append(chunk)
+            TrackedBuffer.largest = max(TrackedBuffer.largest, self._length)
+    
+    monkeypatch.setattr(vad_service, "RollingAudioBuffer", TrackedBuffer)
+    speech = synthesize_speech(2.0, 1.0)
+    audio = pcm16_to_float(np.concatenate([speech, np.zeros(60 * 16000, dtype=np.int16), speech]))
+    chunks = [audio[i:i + 8192] for i in range(0, len(audio), 8192)]
+    service = VADService(model=EnergyVADModel(), settings=dataclasses.replace(config, vad_batch_size=1))
+    
+    segments = list(service.iter_speech_segments(chunks))
+    
+    assert [timestamp for timestamp, _ in segments] == list(service.iter_speech_timestamps(chunks))
+    assert all(np.array_equal(segment, audio[t["start"]:t["end"]]) for t, segment in segments)
+    assert TrackedBuffer.largest < 4 * 16000  # about one speech burst, not the 64 s stream
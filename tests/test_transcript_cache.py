@@ -0,0 +1,24 @@
+import dataclasses
+
+from src.core.config import Config, config
+from src.services.transcript_cache import TranscriptCache, config_fingerprint
+from src.utils.segment_store import SegmentStore
+
+
+def test_vad_sharding_is_part_of_the_cache_key():
+    assert Config().vad_shard_s == 0  # sharding only approximates the sequential pass
+    
+    fingerprint = config_fingerprint(config)
+    assert config_fingerprint(dataclasses.replace(config, vad_shard_s=300.0)) != fingerprint
+    assert config_fingerprint(dataclasses.replace(config, vad_shard_warmup_s=1.0)) != fingerprint
+    assert config_fingerprint(dataclasses.replace(config, vad_batch_size=1)) == fingerprint
+
+
+def test_segments_round_trip(tmp_path):
+    cache = TranscriptCache(cache_dir=str(tmp_path), max_bytes=1 << 20)
+    segments = SegmentStore.from_segments([{"start": 0, "end": 16000, "text": "hello 🎬"}], 16000)
+    
+    assert cache.get("https://youtu.be/aaaaaaaaaaa") is None
+    cache.put("https://youtu.be/aaaaaaaaaaa", segments)
+    
+    assert cache.get("https://www.youtube.com/watch?v=aaaaaaaaaaa").to_list() == segments.to_list()
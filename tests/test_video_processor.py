@@ -0,0 +1,145 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src.core.config import config
+from src.core.video_processor import VideoProcessor
+
+SAMPLE_RATE = 16000
+
+
+class FakeDownloader:
+    def __init__(self):
+        self.cleaned = []
+    
+    def download(self, url):
+        return f"/tmp/{url[-11:]}.wav"
+    
+    def cleanup(self, audio_file=None):
+        self.cleaned.append(audio_file)
+
+
+class FakeVADService:
+    """Five 5-second speech regions in a minute of silence"""
+    
+    def process_audio(self, audio_file):
+        timestamps = [{"start": i * 6 * SAMPLE_RATE, "end": (i * 6 + 5) * SAMPLE_RATE} for i in range(5)]
+        return np.zeros(60 * SAMPLE_RATE, dtype=np.int16), timestamps
+    
+    def extract_speech_segments(self, audio, timestamps):
+        return [(audio[ts["start"]:ts["end"]], (ts["end"] - ts["start"]) / SAMPLE_RATE) for ts in timestamps]
+
+
+class FakeASRService:
+    """Answers ``<word><call number>`` per segment; can be held at a gate"""
+    
+    def __init__(self, word):
+        self.word = word
+        self.gate = threading.Event()
+        self.gate.set()
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+    
+    def transcribe_batch(self, speech_segments):
+        with self.lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            call = self.calls
+        self.gate.wait(5)
+        with self.lock:
+            self.running -= 1
+        return [f"{self.word}{call}" for _ in speech_segments]
+
+
+class FakeLLMService:
+    def __init__(self):
+        self.contexts = []
+    
+    def chat(self, prompt, context, conversation_history):
+        self.contexts.append(context)
+        return "answer", {}
+
+
+class FakeCache:
+    def __init__(self):
+        self.stored = {}
+    
+    def get(self, url):
+        return None
+    
+    def put(self, url, segments):
+        self.stored[url] = segments.texts()
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    monkeypatch.setattr(config, "asr_draft_model", "tiny-ctc")
+    monkeypatch.setattr(config, "asr_batch_max_size", 2)
+    monkeypatch.setattr(config, "transcript_cache_enabled", False)
+    processor = VideoProcessor(
+        downloader=FakeDownloader(),
+        vad_service=FakeVADService(),
+        asr_service=FakeASRService("final"),
+        draft_asr_service=FakeASRService("draft"),
+        llm_service=FakeLLMService()
+    )
+    processor.transcript_cache = FakeCache()
+    yield processor
+    processor._asr_service.gate.set()
+    processor.close()
+
+
+def test_draft_is_usable_before_refinement(processor):
+    processor._asr_service.gate.clear()
+    
+    transcript = processor.process_video("https://youtu.be/aaaaaaaaaaa")
+    
+    assert "draft" in transcript
+    status = processor.transcript_status()
+    assert status["draft"] == 5 and status["final"] == 0
+    assert status["time_to_draft_s"] is not None and status["time_to_final_s"] is None
+    assert processor.ask_question("what is said?") == "answer"
+    assert "draft" in processor.llm_service.contexts[-1]
+
+
+def test_refined_text_replaces_draft_per_segment(processor):
+    processor.process_video("https://youtu.be/aaaaaaaaaaa")
+    
+    assert processor.wait_until_final(timeout=5)
+    assert processor.segments.texts() == ["final1", "final1", "final2", "final2", "final3"]
+    status = processor.transcript_status()
+    assert status["final"] == 5 and status["time_to_final_s"] >= status["time_to_draft_s"]
+    assert processor.transcript_cache.stored == {"https://youtu.be/aaaaaaaaaaa": processor.segments.texts()}
+    assert processor.downloader.cleaned == ["/tmp/aaaaaaaaaaa.wav"]
+
+
+def test_new_video_cancels_refinement(processor):
+    asr = processor._asr_service
+    asr.gate.clear()
+    processor.process_video("https://youtu.be/aaaaaaaaaaa")
+    first_refiner = processor._refiner
+    
+    processor.process_video("https://youtu.be/bbbbbbbbbbb")
+    asr.gate.set()
+    first_refiner.join(5)
+    
+    assert processor.wait_until_final(timeout=5)
+    assert asr.max_running == 1
+    assert list(processor.transcript_cache.stored) == ["https://youtu.be/bbbbbbbbbbb"]
+
+
+def test_failed_refinement_keeps_draft(processor):
+    def fail(speech_segments):
+        raise RuntimeError("out of memory")
+    
+    processor._asr_service.transcribe_batch = fail
+    processor.process_video("https://youtu.be/aaaaaaaaaaa")
+    
+    assert not processor.wait_until_final(timeout=5)
+    assert processor.segments.texts() == ["draft1"] * 5
+    assert processor.transcript_status()["error"] == "out of memory"
+    assert processor.transcript_cache.stored == {}